@@ -0,0 +1,46 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:12
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+WON_FIELDS = (("Challenge", ("goal_amount",)), ("UserChallenge", ("target_expense", "previous_expense", "total_expense")))
+
+
+# 원 단위 정수 컬럼으로 바꾸기 전에 소수점이 있는 값만 반올림
+# (MySQL strict 모드에서 ALTER 중 잘림 오류가 나지 않도록)
+def round_won_amounts(apps, schema_editor):
+    for model_name, fields in WON_FIELDS:
+        model = apps.get_model("challenges", model_name)
+        for field in fields:
+            model.objects.exclude(**{field: Round(field)}).update(**{field: Round(field)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0009_userchallenge_created_at_userchallenge_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(round_won_amounts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='challenge',
+            name='goal_amount',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='userchallenge',
+            name='previous_expense',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userchallenge',
+            name='target_expense',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userchallenge',
+            name='total_expense',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -48,11 +48,8 @@ class Challenge(models.Model):
     )
     # 내용
     content = models.TextField()
-    # 목표 지출
-    goal_amount = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-    )
+    # 목표 지출 (원 단위 정수)
+    goal_amount = models.BigIntegerField()
     # 카테고리
     category = models.ForeignKey("expenses.Category", on_delete=models.SET_NULL, null=True, blank=True, related_name="challenges")
     # 보상 마일리지
@@ -99,22 +96,16 @@ class UserChallenge(models.Model):
         Challenge,
         on_delete=models.CASCADE,
     )
-    # 목표금액
-    target_expense = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
+    # 목표금액 (원 단위 정수)
+    target_expense = models.BigIntegerField(
         default=0,
     )
-    # 이전지출금액
-    previous_expense = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
+    # 이전지출금액 (원 단위 정수)
+    previous_expense = models.BigIntegerField(
         default=0,
     )
-    # 누적지출금액
-    total_expense = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
+    # 누적지출금액 (원 단위 정수)
+    total_expense = models.BigIntegerField(
         default=0,
     )
     # 시작일
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from expenses.serializers import DecimalWonAmountField
 from .models import Challenge, UserChallenge
 
 # 챌린지 전체 목록 조회
 class ChallengeListSerializer(serializers.ModelSerializer):
+    goal_amount = DecimalWonAmountField(read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
     computed_status = serializers.CharField(read_only=True)
 
@@ -26,6 +28,7 @@ class ChallengeListSerializer(serializers.ModelSerializer):
 
 # 챌린지 상세 조회
 class ChallengeDetailSerializer(serializers.ModelSerializer):
+    goal_amount = DecimalWonAmountField(read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
     computed_status = serializers.CharField(read_only=True)
     challenge_host_company = serializers.CharField(source='challenge_host.company_name', read_only=True)
@@ -52,11 +55,16 @@ class ChallengeDetailSerializer(serializers.ModelSerializer):
 
 # 도전중, 성공, 실패한 챌린지 목록
 class ChallengeShortSerializer(serializers.ModelSerializer):
+    goal_amount = DecimalWonAmountField(read_only=True)
+
     class Meta:
         model = Challenge
         fields = ['challenge_id', 'title', 'goal_amount', 'point']
 
 class UserChallengeListSerializer(serializers.ModelSerializer):
+    target_expense = DecimalWonAmountField(read_only=True)
+    previous_expense = DecimalWonAmountField(read_only=True)
+    total_expense = DecimalWonAmountField(read_only=True)
     challenge = ChallengeShortSerializer(read_only=True)
     computed_progress = serializers.SerializerMethodField()
 
@@ -77,6 +85,7 @@ class UserChallengeListSerializer(serializers.ModelSerializer):
         return obj.computed_progress
 
 class ChallengeSummarySerializer(serializers.ModelSerializer):
+    goal_amount = DecimalWonAmountField(read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
     challenge_host_company = serializers.CharField(source='challenge_host.company_name', read_only=True)
 
@@ -100,6 +109,9 @@ class ChallengeSummarySerializer(serializers.ModelSerializer):
         ]
 
 class UserChallengeDetailSerializer(serializers.ModelSerializer):
+    target_expense = DecimalWonAmountField(read_only=True)
+    previous_expense = DecimalWonAmountField(read_only=True)
+    total_expense = DecimalWonAmountField(read_only=True)
     user_id = serializers.IntegerField(source='user.id', read_only=True)
     challenge = ChallengeSummarySerializer(read_only=True)
     computed_progress = serializers.SerializerMethodField()
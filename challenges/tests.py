@@ -1,3 +1,231 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from expenses.models import Category, Expense, SpendingAlert
+from expenses.utils.sharding import Checkpoint, id_shards
+from .models import Challenge, UserChallenge
+
+
+class UserChallengeTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("create_categories", stdout=io.StringIO())
+        cls.user = User.objects.create(username="tester", email="tester@example.com")
+        cls.taxi = Category.objects.get(name="택시")
+        now = timezone.now()
+        cls.challenge = Challenge.objects.create(
+            title="교통비 줄이기",
+            content="일주일 동안 교통비 줄이기",
+            goal_amount=1000,
+            category=Category.objects.get(name="교통"),
+            point=100,
+            goal_days=7,
+            start_date=now - timedelta(days=3),
+            end_date=now + timedelta(days=30),
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+
+        # 참가 조건: 지난 7일 교통 지출 5000원 -> 목표금액 4000원
+        Expense.objects.create(
+            user=self.user, category=self.taxi, amount=5000, date=self.today - timedelta(days=5)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/v1/challenges/{self.challenge.pk}/join/")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user_challenge = UserChallenge.objects.get(user=self.user)
+
+    def total(self):
+        return UserChallenge.objects.get(pk=self.user_challenge.pk).total_expense
+
+    def create_expense(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/expenses/create/",
+                {"date": str(self.today), "amount": amount, "category": self.taxi.pk},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        return Expense.objects.get(pk=response.json()["data"]["expense_id"])
+
+
+# 챌린지 기간의 지출 저장/일괄 수정/일괄 삭제가 누적지출금액에 증감으로 반영되는지
+class ChallengeTotalDeltaTests(UserChallengeTestCase):
+    def test_save_applies_deltas(self):
+        expenses = [self.create_expense(100) for _ in range(3)]
+        self.assertEqual(self.total(), 300)
+        expense = expenses[0]
+        self.assertEqual(expense.user_challenge_id, self.user_challenge.pk)
+
+        expense.amount = 500
+        expense.save()
+        self.assertEqual(self.total(), 700)
+
+        # 챌린지 기간 밖으로 옮기면 빠지고 다시 옮기면 더해진다
+        expense.date = self.today + timedelta(days=60)
+        expense.save()
+        self.assertEqual(self.total(), 200)
+        expense.date = self.today
+        expense.save()
+        self.assertEqual(self.total(), 700)
+
+        expense.user_challenge = None
+        expense.save()
+        self.assertEqual(self.total(), 200)
+
+    def test_queryset_update_and_bulk_delete(self):
+        expenses = [self.create_expense(100) for _ in range(3)]
+        ids = [expense.pk for expense in expenses]
+
+        Expense.objects.filter(pk__in=ids).update(user_challenge=None)
+        self.assertEqual(self.total(), 0)
+        Expense.objects.filter(pk__in=ids).update(user_challenge=self.user_challenge)
+        self.assertEqual(self.total(), 300)
+        Expense.objects.filter(pk__in=ids).update(amount=250)
+        self.assertEqual(self.total(), 750)
+
+        Expense.objects.filter(pk__in=ids[:2]).bulk_delete()
+        self.assertEqual(self.total(), 250)
+        Expense.objects.filter(pk=ids[2]).delete()
+        self.assertEqual(self.total(), 0)
+
+    def test_reconcile_restores_total(self):
+        self.create_expense(200)
+        UserChallenge.objects.filter(pk=self.user_challenge.pk).update(total_expense=99999)
+
+        call_command("reconcile_challenge_totals", stdout=io.StringIO())
+        self.assertEqual(self.total(), 200)
+
+
+# 목표금액의 80%, 100%를 넘을 때 알림이 한 번씩만 쌓이는지
+class ChallengeAlertTests(UserChallengeTestCase):
+    def alerts(self):
+        return list(
+            SpendingAlert.objects.filter(user_challenge=self.user_challenge)
+            .order_by("threshold")
+            .values_list("threshold", "amount", "limit_amount")
+        )
+
+    def test_each_threshold_fires_once(self):
+        self.assertEqual(self.user_challenge.target_expense, 4000)
+        steps = [
+            (3000, []),
+            (300, [(80, 3300, 4000)]),
+            (100, [(80, 3300, 4000)]),
+            (1000, [(80, 3300, 4000), (100, 4400, 4000)]),
+            (500, [(80, 3300, 4000), (100, 4400, 4000)]),
+        ]
+        for amount, expected in steps:
+            self.create_expense(amount)
+            self.assertEqual(self.alerts(), expected, amount)
+
+
+# 금액 필드는 정수로 저장해도 응답은 기존처럼 "12000.00" 문자열
+class UserChallengeSerializerTests(UserChallengeTestCase):
+    def test_amounts_render_as_decimal_strings(self):
+        self.create_expense(300)
+        response = self.client.get(f"/api/v1/challenges/personal/{self.user_challenge.pk}/")
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        self.assertEqual(data["target_expense"], "4000.00")
+        self.assertEqual(data["previous_expense"], "5000.00")
+        self.assertEqual(data["total_expense"], "300.00")
+        self.assertEqual(data["challenge"]["goal_amount"], "1000.00")
+
+
+# 완료한 샤드 범위를 파일에 남기고 같은 이름의 체크포인트만 이어받는다
+class CheckpointTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "checkpoint.json")
+
+    def test_id_shards(self):
+        self.assertEqual(id_shards([5, 1, 3, 9, 7], 2), [(1, 3, [1, 3]), (5, 7, [5, 7]), (9, 9, [9])])
+
+    def test_resume_and_clear(self):
+        checkpoint = Checkpoint(self.path, "sync")
+        checkpoint.mark_done(1, 3)
+        self.assertTrue(Checkpoint(self.path, "sync").is_done(1, 3))
+        self.assertTrue(Checkpoint(self.path, "sync").is_done(2, 3))
+        self.assertFalse(Checkpoint(self.path, "sync").is_done(3, 5))
+        # 다른 명령의 체크포인트는 무시
+        self.assertFalse(Checkpoint(self.path, "other").is_done(1, 3))
+
+        checkpoint.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(Checkpoint(self.path, "sync").is_done(1, 3))
+
+
+# 샤드별로 기간 안 지출을 연결하고, 체크포인트가 있으면 완료한 샤드를 건너뛴다
+class SyncExpensesWithChallengesTests(UserChallengeTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "checkpoint.json")
+
+        self.other = User.objects.create(username="other", email="other@example.com")
+        self.other_challenge = UserChallenge.objects.create(
+            user=self.other,
+            challenge=self.challenge,
+            target_expense=4000,
+            start_date=self.user_challenge.start_date,
+            end_date=self.user_challenge.end_date,
+        )
+        self.expenses = [
+            self.create_expense(300),
+            Expense.objects.create(user=self.other, category=self.taxi, amount=700, date=self.today),
+        ]
+        Expense.objects.filter(pk__in=[expense.pk for expense in self.expenses]).update(user_challenge=None)
+
+    def sync(self, *args):
+        out = io.StringIO()
+        call_command("sync_expenses_with_challenges", "--shard-size", "1", "--checkpoint", self.path, *args, stdout=out)
+        return out.getvalue()
+
+    def linked(self):
+        return [
+            (Expense.objects.get(pk=expense.pk).user_challenge_id, UserChallenge.objects.get(user=expense.user).total_expense)
+            for expense in self.expenses
+        ]
+
+    def test_shards_link_expenses(self):
+        self.assertEqual(self.linked(), [(None, 0), (None, 0)])
+        output = self.sync("--dry-run")
+        self.assertIn("새로 연결 2개", output)
+        self.assertEqual(self.linked(), [(None, 0), (None, 0)])
+
+        output = self.sync()
+        self.assertIn(f"[1/2] 사용자 {self.user.pk}~{self.user.pk}:", output)
+        self.assertIn("유저챌린지 2개, 기간 내 지출 2개, 새로 연결 2개", output)
+        self.assertEqual(self.linked(), [(self.user_challenge.pk, 300), (self.other_challenge.pk, 700)])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["completed"]), 2)
+
+    def test_resume_skips_done_shards_until_restart(self):
+        Checkpoint(self.path, "sync_expenses_with_challenges").mark_done(self.user.pk, self.user.pk)
+        output = self.sync()
+        self.assertIn("[1/1]", output)
+        self.assertEqual(self.linked(), [(None, 0), (self.other_challenge.pk, 700)])
+
+        self.assertIn("처리할 샤드가 없습니다.", self.sync())
+
+        output = self.sync("--restart")
+        self.assertIn("[2/2]", output)
+        self.assertEqual(self.linked(), [(self.user_challenge.pk, 300), (self.other_challenge.pk, 700)])
@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from challenges.models import UserChallenge
+from expenses.models import ArchivedExpense, Expense
+from expenses.utils.alerts import LimitCheck, queue_alerts
+from expenses.utils.response_cache import bump_user_data_versions
+
+
+# 나의챌린지 기간 (현지 날짜 기준, 챌린지 매칭과 같은 기준)
+def challenge_windows(user_challenge_ids):
+    rows = UserChallenge.objects.filter(pk__in=user_challenge_ids).values_list(
+        "user_challenge_id", "start_date", "end_date"
+    )
+    return {
+        user_challenge_id: (
+            timezone.localtime(start_date).date(),
+            timezone.localtime(end_date).date(),
+        )
+        for user_challenge_id, start_date, end_date in rows
+    }
+
+
+# (나의챌린지, 지출일자)별 증감 중 기간 안의 것만 F() 갱신으로 반영
+# 금액 변경, 챌린지 변경, 기간 밖으로의 날짜 이동 모두 이전 값 차감 + 이후 값 가산으로 처리된다
+def apply_challenge_deltas(challenge_deltas):
+    if not challenge_deltas:
+        return
+    windows = challenge_windows({user_challenge_id for user_challenge_id, _ in challenge_deltas})
+    totals = defaultdict(int)
+    for (user_challenge_id, expense_date), amount in challenge_deltas.items():
+        window = windows.get(user_challenge_id)
+        if window and window[0] <= expense_date <= window[1]:
+            totals[user_challenge_id] += amount
+
+    for user_challenge_id, amount in totals.items():
+        if amount:
+            UserChallenge.objects.filter(pk=user_challenge_id).update(
+                total_expense=F("total_expense") + amount
+            )
+    check_challenge_deltas({pk: amount for pk, amount in totals.items() if amount > 0})
+
+
+# 누적지출금액이 늘어난 도전중 챌린지의 목표지출 80%/100% 도달 확인 (예산과 같은 검사)
+def check_challenge_deltas(increases):
+    if not increases:
+        return
+    rows = UserChallenge.objects.filter(pk__in=increases, status="도전중").values_list(
+        "user_challenge_id", "user_id", "total_expense", "target_expense"
+    )
+    queue_alerts([
+        LimitCheck(
+            user_id=user_id,
+            kind="challenge",
+            scope=str(user_challenge_id),
+            root_category_id=None,
+            user_challenge_id=user_challenge_id,
+            total=total_expense,
+            delta=increases[user_challenge_id],
+            limit=target_expense,
+        )
+        for user_challenge_id, user_id, total_expense, target_expense in rows
+    ])
+
+
+# 기간 내 연결된 지출 합계(실제값, 보관 지출내역 포함)
+def actual_challenge_totals(user_challenge_ids):
+    windows = challenge_windows(user_challenge_ids)
+    totals = {user_challenge_id: 0 for user_challenge_id in windows}
+    for model in (Expense, ArchivedExpense):
+        rows = (
+            model.objects.filter(user_challenge_id__in=windows.keys())
+            .values("user_challenge_id", "date")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+        for row in rows:
+            start, end = windows[row["user_challenge_id"]]
+            if start <= row["date"] <= end:
+                totals[row["user_challenge_id"]] += row["total"] or 0
+    return totals
+
+
+# 누적지출금액을 실제값과 비교해 차이만큼 보정하고 보정한 개수를 반환
+# 같은 트랜잭션에서 읽은 값의 차이를 F()로 더하므로 동시에 들어온 증감도 유지된다
+def recompute_user_challenge_totals(user_challenge_ids):
+    fixed = 0
+    with transaction.atomic():
+        actual = actual_challenge_totals(set(user_challenge_ids))
+        stored = {
+            user_challenge_id: (user_id, total_expense)
+            for user_challenge_id, user_id, total_expense in UserChallenge.objects.filter(
+                pk__in=actual.keys()
+            ).values_list("user_challenge_id", "user_id", "total_expense")
+        }
+        fixed_user_ids = set()
+        for user_challenge_id, total in actual.items():
+            user_id, total_expense = stored.get(user_challenge_id, (None, 0))
+            diff = total - total_expense
+            if diff:
+                UserChallenge.objects.filter(pk=user_challenge_id).update(
+                    total_expense=F("total_expense") + diff
+                )
+                fixed_user_ids.add(user_id)
+                fixed += 1
+        bump_user_data_versions(fixed_user_ids)
+    return fixed
+
+
+# 전체 재계산은 커밋 이후로 미룬다 (롤백되면 실행되지 않음)
+def schedule_challenge_recompute(user_challenge_ids):
+    user_challenge_ids = set(user_challenge_ids)
+    if user_challenge_ids:
+        transaction.on_commit(lambda: recompute_user_challenge_totals(user_challenge_ids))
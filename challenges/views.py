@@ -8,8 +8,9 @@ from django.utils import timezone
 from .pagniation import CustomChallengePagination
 from .utils.response import success_response, error_response
 from datetime import timedelta
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from expenses.models import Expense
+from expenses.utils.response_cache import conditional_user_response
 
 def judge_user_challenge_status(user_challenge):
     now = timezone.now().date()
@@ -69,6 +70,7 @@ class ChallengeDetailView(ChallengeBaseView):
 
 # 내 챌린지 리스트 보기 (도전중, 성공, 실패)
 class UserChallengeView(ChallengeBaseView):
+    @conditional_user_response("user_challenge_list")
     def get(self, request):
         user = request.user
         type_param = request.GET.get('type')
@@ -134,15 +136,14 @@ class ChallengeJoinView(ChallengeBaseView):
                 if not category:
                     return error_response("카테고리가 지정되지 않은 챌린지는 입장 제한 검증을 할 수 없습니다.",
                                          error_code="CATEGORY_REQUIRED", code=400)
-                root_category = category.get_root_category() if hasattr(category, "get_root_category") else category
+                root_category = category.get_root_category()
 
                 # 하위 카테고리까지 포함해서 집계
                 expenses_qs = Expense.objects.filter(
                     user=user,
+                    root_category=root_category,
                     date__gte=period_start,
                     date__lte=period_end,
-                ).filter(
-                    Q(category=root_category) | Q(category__parent_category=root_category)
                 )
                 previous_expense = expenses_qs.aggregate(total=Sum("amount"))["total"] or 0
 
@@ -152,7 +153,7 @@ class ChallengeJoinView(ChallengeBaseView):
                     return error_response(
                         f"지난 {challenge.goal_days}일간({period_start} ~ {period_end}) '{category_name}' 카테고리에서 "
                         f"{challenge.goal_amount}원 이상 소비해야 참가할 수 있습니다. "
-                        f"현재 사용금액: {int(previous_expense)}원",
+                        f"현재 사용금액: {previous_expense}원",
                         error_code="NOT_ENOUGH_EXPENSE",
                         code=400
                     )
@@ -6,4 +6,5 @@ class ExpensesConfig(AppConfig):
     name = 'expenses'
 
     def ready(self):
+        import expenses.checks
         import expenses.signals
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# 프로세스마다 따로 저장되어 웹 워커와 manage.py 명령이 값을 공유하지 못하는 캐시 백엔드
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias):
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+# 캐시 버전 키(카테고리 트리, 사용자 데이터, 예산, 소득구간 분포)는 모든 프로세스가 함께 봐야 하므로
+# 운영 환경(DEBUG=False)에서는 프로세스 로컬 캐시를 오류로 막는다
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    return [
+        Error(
+            f"'{alias}' 캐시가 프로세스 로컬 백엔드({config['BACKEND']})입니다.",
+            hint="REDIS_URL을 지정하거나 django.core.cache.backends.db.DatabaseCache를 사용하세요.",
+            obj=alias,
+            id="expenses.E001",
+        )
+        for alias, config in settings.CACHES.items()
+        if not is_shared_cache(alias)
+    ]
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from expenses.models import Expense
+from expenses.utils.archive import archive_expense_chunk
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 지출내역을 보관 테이블(ArchivedExpense)로 chunk 단위 이동합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.EXPENSE_ARCHIVE_MONTHS,
+            help=f"이번 달로부터 몇 개월 이전 지출을 보관할지 (기본 {settings.EXPENSE_ARCHIVE_MONTHS})",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="한 트랜잭션에서 옮길 지출내역 수 (기본 5000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="옮기지 않고 대상 건수만 출력",
+        )
+
+    def handle(self, *args, **options):
+        today = date.today()
+        month_index = today.year * 12 + today.month - 1 - options["months"]
+        cutoff = date(month_index // 12, month_index % 12 + 1, 1)
+
+        target = Expense.objects.filter(date__lt=cutoff).count()
+        self.stdout.write(f"{cutoff} 이전 지출내역 {target}건 보관 대상")
+        if options["dry_run"] or not target:
+            return
+
+        moved = 0
+        while True:
+            count = archive_expense_chunk(cutoff, options["chunk_size"])
+            if not count:
+                break
+            moved += count
+            self.stdout.write(f"[{moved}/{target}] 보관 완료")
+
+        self.stdout.write(self.style.SUCCESS(f"✅   지출내역 {moved}건 보관 완료"))
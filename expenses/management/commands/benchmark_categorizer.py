@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from expenses.utils.categorizer import ExpenseCategorizer
+from expenses.utils.category_descriptions import categories_data
+from expenses.utils.category_tree import get_category_tree
+
+# 실제 입력처럼 보이도록 대표 설명 앞뒤에 붙이는 문구
+PREFIXES = ["", "", "카드결제 ", "[체크] ", "온라인 "]
+SUFFIXES = ["", "", " 결제", " 1건", " 할인적용"]
+
+
+class Command(BaseCommand):
+    help = "지출 설명 자동 분류기의 처리량과 정확도 측정 (category_descriptions 기반 합성 설명 사용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=1_000_000,
+            help="분류할 설명 수 (기본 1,000,000)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="난수 시드 (기본 42)",
+        )
+
+    def handle(self, *args, **options):
+        tree = get_category_tree()
+        rng = random.Random(options["seed"])
+
+        samples = []
+        for root_name, children in categories_data.items():
+            for child_name, descriptions in children.items():
+                category_id = next(
+                    (
+                        category_id
+                        for category_id in tree.ids_by_name.get(child_name, ())
+                        if tree.parent_name(category_id) == root_name
+                    ),
+                    None,
+                )
+                samples.extend((description, category_id) for description in descriptions)
+        if not samples:
+            self.stdout.write(self.style.ERROR("카테고리 설명 데이터가 없습니다."))
+            return
+
+        count = options["count"]
+        descriptions = [
+            (f"{rng.choice(PREFIXES)}{description}{rng.choice(SUFFIXES)}", category_id)
+            for description, category_id in rng.choices(samples, k=count)
+        ]
+
+        started = time.perf_counter()
+        categorizer = ExpenseCategorizer(tree)
+        build_seconds = time.perf_counter() - started
+        self.stdout.write(f"분류기 생성: {build_seconds * 1000:.1f}ms (키워드 {len(categorizer.weights)}개)")
+
+        categorize = categorizer.categorize
+        started = time.perf_counter()
+        results = [categorize(description) for description, _ in descriptions]
+        elapsed = time.perf_counter() - started
+
+        classified = sum(1 for result in results if result is not None)
+        correct = sum(
+            1 for result, (_, category_id) in zip(results, descriptions)
+            if result is not None and result == category_id
+        )
+        self.stdout.write(
+            f"설명 {count:,}건 분류: {elapsed:.2f}초 ({count / elapsed:,.0f}건/초)"
+        )
+        self.stdout.write(
+            f"분류됨 {classified / count:.1%}, 정답 {correct / count:.1%}, 미분류 {(count - classified) / count:.1%}"
+        )
+        self.stdout.write(self.style.SUCCESS("✅   자동 분류 벤치마크 완료"))
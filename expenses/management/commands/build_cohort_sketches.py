@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import UserProfile
+from expenses.utils.cohort import save_cohort_sketches, sketch_users
+from expenses.utils.sharding import id_shards, run_shards
+
+
+class Command(BaseCommand):
+    help = "평균수입 구간 x 최상위 카테고리별 월 지출 분위수 스케치(CohortSpendingSketch)를 다시 만듭니다. (매일 밤 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=str,
+            default=None,
+            help="집계할 달에 속한 날짜 (YYYY-MM-DD, 기본값: 오늘)",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=2000,
+            help="한 샤드에서 처리할 사용자 수 (기본 2000)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="샤드를 동시에 처리할 프로세스 수 (기본 1)",
+        )
+
+    def handle(self, *args, **options):
+        base_date = (
+            datetime.strptime(options["date"], "%Y-%m-%d").date()
+            if options["date"]
+            else date.today()
+        )
+        month = base_date.replace(day=1)
+
+        user_ids = UserProfile.objects.order_by("user_id").values_list("user_id", flat=True)
+        shards = id_shards(user_ids, options["shard_size"])
+        self.stdout.write(f"{month:%Y-%m} 소득구간별 지출 분포: 총 {sum(len(shard[2]) for shard in shards)}명 사용자")
+
+        # 샤드별 스케치를 병합 (스케치 크기는 사용자 수와 관계없이 일정)
+        sketches, populations = {}, {}
+        for done, (shard, (shard_sketches, shard_populations)) in enumerate(
+            run_shards(sketch_users, shards, options["workers"], month=month), start=1
+        ):
+            for key, sketch in shard_sketches.items():
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    sketches[key] = sketch
+            for bucket, count in shard_populations.items():
+                populations[bucket] = populations.get(bucket, 0) + count
+            self.stdout.write(f"[{done}/{len(shards)}] 사용자 {shard[0]}~{shard[1]}: 스케치 {len(shard_sketches)}개")
+
+        saved = save_cohort_sketches(month, sketches, populations)
+        self.stdout.write(self.style.SUCCESS(f"✅   소득구간별 지출 분포 {saved}개 저장 완료"))
@@ -1,5 +1,4 @@
 import random
-from decimal import Decimal
 from datetime import datetime, timedelta
 
 from django.core.management.base import BaseCommand
@@ -68,7 +67,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         User = get_user_model()
 
-        leaf_list = list(Category.objects.filter(child_category__isnull=True))
+        leaf_list = list(
+            Category.objects.filter(child_category__isnull=True).select_related("root_category")
+        )
         if not leaf_list:
             self.stdout.write(self.style.ERROR("서브 카테고리가 없습니다."))
             return
@@ -105,7 +106,7 @@ class Command(BaseCommand):
         with transaction.atomic():
             for idx, prof in enumerate(profiles.iterator(), start=1):
                 user = prof.user
-                income = prof.average_income
+                income = int(prof.average_income)
 
                 current_date = start_date
                 while current_date <= end_date:
@@ -117,7 +118,7 @@ class Command(BaseCommand):
                     month_start = max(current_date, datetime(year, month, 1).date())
                     month_end = min(next_month - timedelta(days=1), end_date)
 
-                    monthly_total = Decimal('0.00')
+                    monthly_total = 0
                     temp_expenses = []
                     day_list = [
                         month_start + timedelta(days=i)
@@ -133,7 +134,7 @@ class Command(BaseCommand):
                                 cat = None
                             else:
                                 cat = random.choice(leaf_list)
-                            cost = Decimal(random.randint(5, 30)) * 1000  # 5,000~30,000원
+                            cost = random.randint(5, 30) * 1000  # 5,000~30,000원
                             if monthly_total + cost > income:
                                 cost = income - monthly_total
                                 if cost <= 0:
@@ -1,5 +1,4 @@
 import random
-from decimal import Decimal, InvalidOperation
 from datetime import datetime, timedelta
 
 from django.core.management.base import BaseCommand
@@ -94,7 +93,9 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"username={username} 유저 프로필이 없습니다."))
             return
 
-        leaf_list = list(Category.objects.filter(child_category__isnull=True))
+        leaf_list = list(
+            Category.objects.filter(child_category__isnull=True).select_related("root_category")
+        )
         if not leaf_list:
             self.stdout.write(self.style.ERROR("서브 카테고리가 없습니다."))
             return
@@ -140,7 +141,7 @@ class Command(BaseCommand):
                 next_month = month_start.replace(month=month_start.month + 1, day=1)
             month_end = min(next_month - timedelta(days=1), end_date)
 
-            monthly_total = Decimal(0)
+            monthly_total = 0
             temp_expenses = []
             day = current_date
 
@@ -153,7 +154,7 @@ class Command(BaseCommand):
                     else:
                         cat = random.choice(leaf_list)
 
-                    cost = Decimal(random.randint(5, 30)) * 1000  # 5,000~30,000원
+                    cost = random.randint(5, 30) * 1000  # 5,000~30,000원
 
                     # 월별 평균수입 체크 (옵션 무시 가능)
                     if not ignore_income and monthly_total + cost > average_income:
@@ -0,0 +1,61 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from expenses.models import ExpenseMonthlyRollup
+from expenses.utils.analysis import analyze_users, previous_month
+from expenses.utils.sharding import id_shards, run_shards
+
+
+class Command(BaseCommand):
+    help = "사용자별 월간 지출 분석 리포트(ExpenseAnalysis)를 사용자 샤드 단위로 생성/갱신합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            default=None,
+            help="분석 연도 (기본값: 지난달 기준)",
+        )
+        parser.add_argument(
+            "--month",
+            type=int,
+            default=None,
+            help="분석 월 (기본값: 지난달)",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=500,
+            help="한 샤드에서 처리할 사용자 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="샤드를 동시에 처리할 프로세스 수 (기본 1)",
+        )
+
+    def handle(self, *args, **options):
+        month = previous_month(date.today().replace(day=1))
+        if options["year"] or options["month"]:
+            month = date(options["year"] or month.year, options["month"] or month.month, 1)
+
+        # 분석월 또는 전월에 지출이 있는 사용자만 대상
+        user_ids = (
+            ExpenseMonthlyRollup.objects.filter(month__in=[previous_month(month), month])
+            .order_by()
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        shards = id_shards(user_ids, options["shard_size"])
+        self.stdout.write(f"{month:%Y-%m} 지출 분석: 총 {sum(len(shard[2]) for shard in shards)}명 사용자")
+
+        total = 0
+        for done, (shard, count) in enumerate(
+            run_shards(analyze_users, shards, options["workers"], month=month), start=1
+        ):
+            total += count
+            self.stdout.write(f"[{done}/{len(shards)}] 사용자 {shard[0]}~{shard[1]}: {count}개 리포트 저장")
+
+        self.stdout.write(self.style.SUCCESS(f"✅   지출 분석 리포트 {total}개 생성 완료"))
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from expenses.models import ExpenseMonthlyRollup
+from expenses.utils.forecast import LOOKBACK_DAYS, forecast_users
+from expenses.utils.sharding import id_shards, run_shards
+
+
+class Command(BaseCommand):
+    help = "사용자별 월말 지출 예측(SpendingForecast)을 사용자 샤드 단위로 다시 계산합니다. (매일 밤 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=str,
+            default=None,
+            help="기준일 (YYYY-MM-DD, 기본값: 오늘 - 전날까지를 지난 날로 본다)",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=500,
+            help="한 샤드에서 처리할 사용자 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="샤드를 동시에 처리할 프로세스 수 (기본 1)",
+        )
+
+    def handle(self, *args, **options):
+        as_of = (
+            datetime.strptime(options["date"], "%Y-%m-%d").date()
+            if options["date"]
+            else date.today()
+        )
+        month = as_of.replace(day=1)
+
+        # 이번 달 또는 요일 계수를 구하는 과거 기간에 지출이 있는 사용자만 대상
+        user_ids = (
+            ExpenseMonthlyRollup.objects.filter(
+                month__gte=(month - timedelta(days=LOOKBACK_DAYS)).replace(day=1),
+                month__lte=month,
+            )
+            .order_by()
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        shards = id_shards(user_ids, options["shard_size"])
+        self.stdout.write(f"{month:%Y-%m} 월말 지출 예측 (기준일 {as_of}): 총 {sum(len(shard[2]) for shard in shards)}명 사용자")
+
+        total = 0
+        for done, (shard, count) in enumerate(
+            run_shards(forecast_users, shards, options["workers"], as_of=as_of), start=1
+        ):
+            total += count
+            self.stdout.write(f"[{done}/{len(shards)}] 사용자 {shard[0]}~{shard[1]}: 예측 {count}개 저장")
+
+        self.stdout.write(self.style.SUCCESS(f"✅   월말 지출 예측 {total}개 생성 완료"))
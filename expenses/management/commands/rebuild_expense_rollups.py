@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from expenses.utils.deltas import reconcile_monthly_rollups
+
+
+class Command(BaseCommand):
+    help = "월별 지출 집계(ExpenseMonthlyRollup)를 실제 지출내역과 비교해 사용자 단위 chunk로 보정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="한 번에 보정할 사용자 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            default=None,
+            help="특정 사용자만 보정",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        if options["user_id"]:
+            user_ids = user_ids.filter(pk=options["user_id"])
+        user_ids = list(user_ids)
+
+        total_fixed = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            fixed = reconcile_monthly_rollups(chunk)
+            total_fixed += fixed
+            self.stdout.write(
+                f"[{min(start + chunk_size, len(user_ids))}/{len(user_ids)}] 사용자 집계 확인, {fixed}개 키 보정"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅   월별 지출 집계 보정 완료 (총 {total_fixed}개 키)"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from challenges.models import UserChallenge
+from challenges.utils.totals import recompute_user_challenge_totals
+
+
+class Command(BaseCommand):
+    help = "나의챌린지 누적지출금액(total_expense)을 실제 지출내역과 비교해 chunk 단위로 보정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="한 번에 보정할 나의챌린지 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--status",
+            default=None,
+            help="특정 상태(예: 도전중)의 나의챌린지만 보정",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        user_challenges = UserChallenge.objects.order_by("pk")
+        if options["status"]:
+            user_challenges = user_challenges.filter(status=options["status"])
+        user_challenge_ids = list(user_challenges.values_list("pk", flat=True))
+
+        total_fixed = 0
+        for start in range(0, len(user_challenge_ids), chunk_size):
+            chunk = user_challenge_ids[start:start + chunk_size]
+            fixed = recompute_user_challenge_totals(chunk)
+            total_fixed += fixed
+            self.stdout.write(
+                f"[{min(start + chunk_size, len(user_challenge_ids))}/{len(user_challenge_ids)}] "
+                f"나의챌린지 확인, {fixed}개 보정"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅   누적지출금액 보정 완료 (총 {total_fixed}개)"))
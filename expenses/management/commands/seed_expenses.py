@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import UserProfile
+from expenses.utils.seeding import SEED_METHODS, seed_expenses_for_users
+from expenses.utils.sharding import id_shards, run_shards
+
+
+class Command(BaseCommand):
+    help = "부하 테스트용 지출내역을 NumPy로 벡터화해 사용자 샤드 단위로 대량 생성 (같은 시드면 같은 데이터)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--startdate",
+            type=str,
+            default=None,
+            help="시작 날짜 (YYYY-MM-DD, 기본값: 종료일로부터 59일 전)",
+        )
+        parser.add_argument(
+            "--enddate",
+            type=str,
+            default=None,
+            help="종료 날짜 (YYYY-MM-DD, 기본값: 오늘)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="난수 시드 (기본 42)",
+        )
+        parser.add_argument(
+            "--unclassified-ratio",
+            type=float,
+            default=0.05,
+            help="미분류(카테고리 없음) 지출 생성 비율 (기본 0.05)",
+        )
+        parser.add_argument(
+            "--username-prefix",
+            default="user",
+            help="대상 사용자 username 접두사 (기본 user - create_test_users로 만든 사용자)",
+        )
+        parser.add_argument(
+            "--method",
+            choices=SEED_METHODS,
+            default="bulk",
+            help="저장 방식: bulk(bulk_create) 또는 load-data(MySQL LOAD DATA LOCAL INFILE)",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="기간 안의 기존 지출을 지우고 생성",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=500,
+            help="한 샤드에서 처리할 사용자 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="샤드를 동시에 처리할 프로세스 수 (기본 1)",
+        )
+
+    def handle(self, *args, **options):
+        end_date = (
+            datetime.strptime(options["enddate"], "%Y-%m-%d").date()
+            if options["enddate"]
+            else datetime.now().date()
+        )
+        start_date = (
+            datetime.strptime(options["startdate"], "%Y-%m-%d").date()
+            if options["startdate"]
+            else end_date - timedelta(days=59)
+        )
+        if end_date < start_date:
+            self.stdout.write(self.style.ERROR("종료일이 시작일보다 빠릅니다."))
+            return
+
+        user_ids = UserProfile.objects.filter(
+            user__username__startswith=options["username_prefix"]
+        ).values_list("user_id", flat=True)
+        shards = id_shards(user_ids, options["shard_size"])
+        self.stdout.write(f"총 {sum(len(shard[2]) for shard in shards)}명 사용자, {len(shards)}개 샤드 생성을 시작합니다…")
+
+        total = 0
+        results = run_shards(
+            seed_expenses_for_users,
+            shards,
+            options["workers"],
+            start_date=start_date,
+            end_date=end_date,
+            seed=options["seed"],
+            unclassified_ratio=options["unclassified_ratio"],
+            method=options["method"],
+            replace=options["replace"],
+        )
+        for done, (shard, count) in enumerate(results, start=1):
+            total += count
+            self.stdout.write(f"[{done}/{len(shards)}] 사용자 {shard[0]}~{shard[1]}: {count}건 생성")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅   지출 내역 {total}건 생성 완료 (seed {options['seed']}, {options['method']})"
+        ))
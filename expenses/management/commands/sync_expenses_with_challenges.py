@@ -1,35 +1,83 @@
+from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
+
 from challenges.models import UserChallenge
-from expenses.models import Expense
-from django.db.models import Q, Sum
+from expenses.utils.challenge_matcher import link_expenses_to_challenges
+from expenses.utils.sharding import Checkpoint, id_shards, run_shards
+
+CHECKPOINT_NAME = "sync_expenses_with_challenges"
+
 
 class Command(BaseCommand):
     help = "기존 지출내역과 유저챌린지를 챌린지 기간/카테고리 기준으로 자동 연결합니다."
 
-    def handle(self, *args, **options):
-        for uc in UserChallenge.objects.all():
-            challenge = uc.challenge
-            category = challenge.category
-            root_category = category.get_root_category() if category else None
-
-            expenses_qs = Expense.objects.filter(
-                user=uc.user,
-                date__gte=uc.start_date.date(),
-                date__lte=uc.end_date.date(),
-            )
-            if root_category:
-                expenses_qs = expenses_qs.filter(
-                    Q(category=root_category) | Q(category__parent_category=root_category)
-                )
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=500,
+            help="한 샤드에서 처리할 사용자 수 (기본 500)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="샤드를 동시에 처리할 프로세스 수 (기본 1)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="완료한 샤드를 기록할 파일 경로 (지정하면 중단된 지점부터 이어서 실행)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="체크포인트를 지우고 처음부터 실행",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="연결하지 않고 연결될 지출내역 수만 출력",
+        )
 
-            expenses_count = expenses_qs.count()
-            expenses_qs.update(user_challenge=uc)
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        checkpoint = Checkpoint(None if dry_run else options["checkpoint"], CHECKPOINT_NAME)
+        if options["restart"]:
+            checkpoint.clear()
 
-            total = expenses_qs.aggregate(total=Sum("amount"))["total"] or 0
-            uc.total_expense = total
-            uc.save(update_fields=["total_expense"])
+        # 챌린지에 참여한 사용자만 샤드로 나눈다
+        user_ids = UserChallenge.objects.order_by().values_list("user_id", flat=True).distinct()
+        user_ids = get_user_model().objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+        shards = [
+            shard for shard in id_shards(user_ids, options["shard_size"])
+            if not checkpoint.is_done(shard[0], shard[1])
+        ]
+        if not shards:
+            self.stdout.write(self.style.SUCCESS("처리할 샤드가 없습니다."))
+            return
 
+        totals = {"user_challenges": 0, "matched": 0, "linked": 0}
+        for done, (shard, result) in enumerate(
+            run_shards(link_expenses_to_challenges, shards, options["workers"], dry_run=dry_run),
+            start=1,
+        ):
+            first_id, last_id, _ = shard
+            if not dry_run:
+                checkpoint.mark_done(first_id, last_id)
+            for key, value in result.items():
+                totals[key] += value
             self.stdout.write(
-                f"UserChallenge(id={uc.pk}) - {expenses_count}개의 지출내역 연결, 누적지출 {total}원으로 갱신"
+                f"[{done}/{len(shards)}] 사용자 {first_id}~{last_id}: "
+                f"유저챌린지 {result['user_challenges']}개, 기간 내 지출 {result['matched']}개, "
+                f"새로 연결 {result['linked']}개"
             )
-        self.stdout.write(self.style.SUCCESS('지출내역-유저챌린지 동기화가 완료되었습니다.'))
+
+        summary = (
+            f"유저챌린지 {totals['user_challenges']}개, 기간 내 지출 {totals['matched']}개, "
+            f"새로 연결 {totals['linked']}개"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {summary} (변경 없음)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"지출내역-유저챌린지 동기화가 완료되었습니다. ({summary})"))
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.20 on 2026-10-18 16:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_category_ancestry(apps, schema_editor):
+    Category = apps.get_model("expenses", "Category")
+    CategoryClosure = apps.get_model("expenses", "CategoryClosure")
+    Expense = apps.get_model("expenses", "Expense")
+
+    parent_map = dict(Category.objects.values_list("category_id", "parent_category_id"))
+
+    closures = []
+    roots = {}
+    for category_id in parent_map:
+        node, depth, visited = category_id, 0, set()
+        while node is not None and node not in visited:
+            visited.add(node)
+            closures.append(
+                CategoryClosure(ancestor_id=node, descendant_id=category_id, depth=depth)
+            )
+            root_id = node
+            node = parent_map.get(node)
+            depth += 1
+        roots.setdefault(root_id, []).append(category_id)
+
+    CategoryClosure.objects.bulk_create(closures, batch_size=1000)
+    for root_id, category_ids in roots.items():
+        Category.objects.filter(category_id__in=category_ids).update(root_category_id=root_id)
+        Expense.objects.filter(category_id__in=category_ids).update(root_category_id=root_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_rename_user_challenge_id_expense_user_challenge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='root_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='descendant_category', to='expenses.category'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='root_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='root_expense', to='expenses.category'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date'], name='expenses_ex_user_id_713a9d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'root_category', 'date'], name='expenses_ex_user_id_c4ef80_idx'),
+        ),
+        migrations.AddField(
+            model_name='categoryclosure',
+            name='ancestor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='expenses.category'),
+        ),
+        migrations.AddField(
+            model_name='categoryclosure',
+            name='descendant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='expenses.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_category_closure'),
+        ),
+        migrations.RunPython(backfill_category_ancestry, migrations.RunPython.noop),
+    ]
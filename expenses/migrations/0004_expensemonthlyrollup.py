@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-18 16:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollups(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    ExpenseMonthlyRollup = apps.get_model("expenses", "ExpenseMonthlyRollup")
+
+    rows = (
+        Expense.objects.annotate(month=TruncMonth("date"))
+        .values("user_id", "month", "root_category_id")
+        .annotate(amount=Sum("amount"), count=Count("expense_id"))
+        .order_by()
+    )
+    ExpenseMonthlyRollup.objects.bulk_create(
+        (
+            ExpenseMonthlyRollup(
+                user_id=row["user_id"],
+                month=row["month"],
+                root_category_id=row["root_category_id"],
+                amount=row["amount"] or 0,
+                count=row["count"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0003_category_root_category_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseMonthlyRollup',
+            fields=[
+                ('expense_monthly_rollup_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('root_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='monthly_rollup', to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_monthly_rollup', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expensemonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'root_category'), name='unique_expense_monthly_rollup'),
+        ),
+        migrations.RunPython(backfill_monthly_rollups, migrations.RunPython.noop),
+    ]
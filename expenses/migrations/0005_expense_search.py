@@ -0,0 +1,83 @@
+# Generated by Django 4.2.20 on 2026-10-18 16:48
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# 마이그레이션은 실행 시점의 코드와 무관하게 같은 결과를 내야 하므로
+# expenses.utils.search의 값과 토큰화 규칙을 이 시점 그대로 복사해 둔다
+NGRAM_SIZE = 2
+FULLTEXT_INDEX_NAME = "expense_description_ngram_idx"
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+def tokenize(text):
+    tokens = set()
+    for word in BOOLEAN_OPERATORS.sub(" ", text or "").lower().split():
+        if len(word) <= NGRAM_SIZE:
+            tokens.add(word)
+            continue
+        for i in range(len(word) - NGRAM_SIZE + 1):
+            tokens.add(word[i:i + NGRAM_SIZE])
+    return tokens
+
+
+# MySQL은 FULLTEXT(ngram) 인덱스, 그 외 DB는 기존 지출내역의 n-gram 토큰을 채운다
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE expenses_expense ADD FULLTEXT INDEX {FULLTEXT_INDEX_NAME} "
+            "(description) WITH PARSER ngram"
+        )
+        return
+
+    Expense = apps.get_model("expenses", "Expense")
+    ExpenseSearchToken = apps.get_model("expenses", "ExpenseSearchToken")
+    expenses = Expense.objects.using(schema_editor.connection.alias).values_list(
+        "expense_id", "user_id", "description"
+    )
+    ExpenseSearchToken.objects.using(schema_editor.connection.alias).bulk_create(
+        (
+            ExpenseSearchToken(expense_id=expense_id, user_id=user_id, token=token)
+            for expense_id, user_id, description in expenses.iterator()
+            for token in tokenize(description)
+        ),
+        batch_size=1000,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE expenses_expense DROP INDEX {FULLTEXT_INDEX_NAME}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0004_expensemonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=10)),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_token', to='expenses.expense')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'token'], name='expenses_ex_user_id_e2aeaf_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='expensesearchtoken',
+            constraint=models.UniqueConstraint(fields=('expense', 'token'), name='unique_expense_search_token'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
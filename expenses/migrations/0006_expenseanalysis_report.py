@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0005_expense_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseanalysis',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='expenseanalysis',
+            name='data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='expenseanalysis',
+            name='month',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='expenseanalysis',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddConstraint(
+            model_name='expenseanalysis',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_expense_analysis_month'),
+        ),
+    ]
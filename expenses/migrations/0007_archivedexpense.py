@@ -0,0 +1,34 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0009_userchallenge_created_at_userchallenge_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0006_expenseanalysis_report'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedExpense',
+            fields=[
+                ('expense_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(blank=True, default='', max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('date', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.category')),
+                ('root_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_expense', to=settings.AUTH_USER_MODEL)),
+                ('user_challenge', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='challenges.userchallenge')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='expenses_ar_user_id_202910_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:12
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+WON_FIELDS = (("Expense", ("amount",)), ("ArchivedExpense", ("amount",)), ("ExpenseMonthlyRollup", ("amount",)))
+
+
+# 원 단위 정수 컬럼으로 바꾸기 전에 소수점이 있는 값만 반올림
+# (MySQL strict 모드에서 ALTER 중 잘림 오류가 나지 않도록)
+def round_won_amounts(apps, schema_editor):
+    for model_name, fields in WON_FIELDS:
+        model = apps.get_model("expenses", model_name)
+        for field in fields:
+            model.objects.exclude(**{field: Round(field)}).update(**{field: Round(field)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0007_archivedexpense'),
+    ]
+
+    operations = [
+        migrations.RunPython(round_won_amounts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedexpense',
+            name='amount',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='amount',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='expensemonthlyrollup',
+            name='amount',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0008_integer_won_amounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendingForecast',
+            fields=[
+                ('spending_forecast_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('as_of', models.DateField()),
+                ('spent_amount', models.BigIntegerField(default=0)),
+                ('projected_amount', models.BigIntegerField(default=0)),
+                ('rate', models.FloatField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('root_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='spending_forecast', to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_forecast', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='spendingforecast',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'root_category'), name='unique_spending_forecast'),
+        ),
+    ]
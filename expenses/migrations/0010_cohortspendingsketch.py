@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0009_spendingforecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortSpendingSketch',
+            fields=[
+                ('cohort_spending_sketch_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('income_bucket', models.PositiveSmallIntegerField()),
+                ('population', models.IntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('sketch', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('root_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.category')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cohortspendingsketch',
+            constraint=models.UniqueConstraint(fields=('month', 'income_bucket', 'root_category'), name='unique_cohort_spending_sketch'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('challenges', '0010_integer_won_amounts'),
+        ('expenses', '0010_cohortspendingsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryBudget',
+            fields=[
+                ('category_budget_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('amount', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('root_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_budget', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpendingAlert',
+            fields=[
+                ('spending_alert_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('budget', '예산'), ('challenge', '챌린지')], max_length=20)),
+                ('month', models.DateField()),
+                ('threshold', models.PositiveSmallIntegerField()),
+                ('amount', models.BigIntegerField()),
+                ('limit_amount', models.BigIntegerField()),
+                ('dedupe_key', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('root_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_alert', to=settings.AUTH_USER_MODEL)),
+                ('user_challenge', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='challenges.userchallenge')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='expenses_sp_user_id_a53363_idx'), models.Index(fields=['sent_at', 'created_at'], name='expenses_sp_sent_at_e68024_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categorybudget',
+            constraint=models.UniqueConstraint(fields=('user', 'root_category'), name='unique_category_budget'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:32
+
+from django.db import migrations, models
+from django.db.models import F
+
+# root_key를 채우고, NULL 키 때문에 중복된 (key_fields, 최상위 카테고리) 행을 첫 행에 합친다
+# sum_fields가 없으면 첫 행만 남긴다
+# (root_key를 추가하는 다른 테이블의 마이그레이션도 이 함수를 가져다 쓴다)
+def backfill_root_keys(model_name, sum_fields, key_fields=("user_id", "month")):
+    def backfill(apps, schema_editor):
+        model = apps.get_model("expenses", model_name)
+        model.objects.exclude(root_category__isnull=True).update(root_key=F("root_category_id"))
+
+        kept = {}
+        duplicates = []
+        rows = model.objects.order_by("pk").values_list("pk", *key_fields, "root_key", *sum_fields)
+        for pk, *row in rows:
+            key, values = tuple(row[:len(key_fields) + 1]), row[len(key_fields) + 1:]
+            if key not in kept:
+                kept[key] = [pk, *values]
+                continue
+            for index, value in enumerate(values, start=1):
+                kept[key][index] += value
+            duplicates.append(pk)
+            if sum_fields:
+                model.objects.filter(pk=kept[key][0]).update(
+                    **{field: kept[key][index] for index, field in enumerate(sum_fields, start=1)}
+                )
+        model.objects.filter(pk__in=duplicates).delete()
+
+    return backfill
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0011_categorybudget_spendingalert'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='expensemonthlyrollup',
+            name='unique_expense_monthly_rollup',
+        ),
+        migrations.AddField(
+            model_name='expensemonthlyrollup',
+            name='root_key',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_root_keys("ExpenseMonthlyRollup", ("amount", "count")),
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='expensemonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'root_key'), name='unique_expense_monthly_rollup'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:35
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# 0012와 같은 backfill을 써서 두 테이블의 root_key 규칙이 어긋나지 않게 한다
+backfill_root_keys = import_module("expenses.migrations.0012_rollup_root_key").backfill_root_keys
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0012_rollup_root_key'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='spendingforecast',
+            name='unique_spending_forecast',
+        ),
+        migrations.AddField(
+            model_name='spendingforecast',
+            name='root_key',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_root_keys("SpendingForecast", ("spent_amount", "projected_amount")),
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='spendingforecast',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'root_key'), name='unique_spending_forecast'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:58
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# 0012와 같은 backfill (스케치는 합칠 수 있는 합계 필드가 없어 중복 중 첫 행만 남기고,
+# 다음 build_cohort_sketches 실행 때 해당 월 전체를 다시 만든다)
+backfill_root_keys = import_module("expenses.migrations.0012_rollup_root_key").backfill_root_keys
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0013_forecast_root_key'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='cohortspendingsketch',
+            name='unique_cohort_spending_sketch',
+        ),
+        migrations.AddField(
+            model_name='cohortspendingsketch',
+            name='root_key',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_root_keys("CohortSpendingSketch", (), key_fields=("month", "income_bucket")),
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='cohortspendingsketch',
+            constraint=models.UniqueConstraint(fields=('month', 'income_bucket', 'root_key'), name='unique_cohort_spending_sketch'),
+        ),
+    ]
@@ -1,6 +1,149 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from challenges.models import UserChallenge
+from expenses.utils.category_tree import bump_category_tree_version, get_category_tree
+from expenses.utils.deltas import (
+    TRACKED_FIELDS,
+    apply_expense_deltas,
+    grouped_snapshots,
+    snapshot,
+)
+from expenses.utils.response_cache import bump_user_data_versions
+from expenses.utils.search import index_expenses, uses_token_index
+
+UPDATE_CHUNK_SIZE = 1000
+
+
+class CategoryQuerySet(models.QuerySet):
+    # bulk_create는 save()를 거치지 않으므로 루트/계층 정보를 여기서 맞춰준다
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            if obj.parent_category_id is not None:
+                parent = obj.parent_category
+                obj.root_category_id = parent.root_category_id or parent.pk
+        created = super().bulk_create(objs, *args, **kwargs)
+        self.rebuild_ancestry()
+        return created
+
+    # 전체 카테고리의 루트 카테고리와 클로저 테이블을 다시 계산
+    # 카테고리 수가 적으므로 구조가 바뀔 때마다 전체를 재계산한다
+    def rebuild_ancestry(self):
+        rows = list(
+            Category.objects.values_list(
+                "category_id", "parent_category_id", "root_category_id"
+            )
+        )
+        parent_map = {category_id: parent_id for category_id, parent_id, _ in rows}
+
+        closures = []
+        root_map = {}
+        for category_id in parent_map:
+            node, depth, visited = category_id, 0, set()
+            while node is not None and node not in visited:
+                visited.add(node)
+                closures.append(
+                    CategoryClosure(
+                        ancestor_id=node, descendant_id=category_id, depth=depth
+                    )
+                )
+                root_map[category_id] = node
+                node = parent_map.get(node)
+                depth += 1
+
+        changed = {}
+        for category_id, _, root_id in rows:
+            if root_map[category_id] != root_id:
+                changed.setdefault(root_map[category_id], []).append(category_id)
+
+        with transaction.atomic():
+            CategoryClosure.objects.all().delete()
+            CategoryClosure.objects.bulk_create(closures)
+            for root_id, category_ids in changed.items():
+                Category.objects.filter(category_id__in=category_ids).update(
+                    root_category_id=root_id
+                )
+                Expense.objects.filter(category_id__in=category_ids).update(
+                    root_category_id=root_id
+                )
+            bump_category_tree_version()
+        return root_map
+
+
+class ExpenseQuerySet(models.QuerySet):
+    # bulk_create 시 루트 카테고리를 카테고리 트리에서 채운다
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.root_category_id = Category.objects.root_id_of(obj.category_id)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            apply_expense_deltas(added=[snapshot(obj) for obj in created])
+            if uses_token_index():
+                index_expenses(created)
+        return created
+
+    # 카테고리를 일괄 변경하면 루트 카테고리도 함께 변경
+    # 집계에 영향을 주는 필드가 바뀌면 변경 전/후를 키 단위로 묶어 증감 반영
+    def update(self, **kwargs):
+        for field in ("category", "category_id"):
+            if field in kwargs and not {"root_category", "root_category_id"} & kwargs.keys():
+                value = kwargs[field]
+                category_id = value.pk if isinstance(value, Category) else value
+                kwargs["root_category_id"] = Category.objects.root_id_of(category_id)
+        tracked = bool(TRACKED_FIELDS & kwargs.keys())
+        reindex = "description" in kwargs and uses_token_index()
+        # 집계에 영향이 없는 변경도 조회 응답 캐시는 무효화
+        if not tracked:
+            bump_user_data_versions(self.order_by().values_list("user_id", flat=True).distinct())
+        if not tracked and not reindex:
+            return super().update(**kwargs)
+
+        rows = 0
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                chunk = self.model.objects.filter(
+                    pk__in=pks[start:start + UPDATE_CHUNK_SIZE]
+                )
+                before = grouped_snapshots(chunk) if tracked else None
+                rows += super(ExpenseQuerySet, chunk).update(**kwargs)
+                if tracked:
+                    apply_expense_deltas(removed=before, added=grouped_snapshots(chunk))
+                if reindex:
+                    index_expenses(chunk.only("expense_id", "user_id", "description"))
+        return rows
+
+    # Collector를 거치지 않고 DELETE 한 번으로 지출내역만 삭제 (내부 API인 _raw_delete는 여기서만 사용)
+    # 지출내역을 참조하는 테이블은 검색 토큰뿐이라 따라갈 CASCADE가 없고, 행마다 pre/post_delete 시그널과
+    # 조회를 하는 Collector 대신 호출한 쪽에서 검색 토큰 정리와 집계 증감 반영을 직접 처리한다
+    def raw_delete(self):
+        return self._raw_delete(self.db)
+
+    # 행 단위 시그널 없이 DELETE 한 번으로 삭제하고 삭제 전 값을 키 단위로 묶어 증감 반영
+    def bulk_delete(self):
+        with transaction.atomic(using=self.db):
+            before = grouped_snapshots(self)
+            ExpenseSearchToken.objects.filter(expense__in=self.values("pk")).delete()
+            rows = self.raw_delete()
+            apply_expense_deltas(removed=before)
+        return rows
+
+
+class CategoryManager(models.Manager.from_queryset(CategoryQuerySet)):
+    # 카테고리 식별자로 루트 카테고리 식별자를 반환
+    # 메모리의 카테고리 트리에 없을 때만 DB를 조회한다
+    def root_id_of(self, category_id):
+        if category_id is None:
+            return None
+        root_id = get_category_tree().root_id(category_id)
+        if root_id is not None:
+            return root_id
+        return (
+            self.filter(category_id=category_id)
+            .values_list("root_category_id", flat=True)
+            .first()
+        )
 
 
 # Create your models here.
@@ -18,18 +161,81 @@ class Category(models.Model):
         related_name="child_category",
         on_delete=models.CASCADE,
     )
+    # 최상위카테고리식별자 (최상위 카테고리는 자기 자신)
+    root_category = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        related_name="descendant_category",
+        on_delete=models.SET_NULL,
+    )
     # 이름
     name = models.CharField(max_length=100)
 
+    objects = CategoryManager()
+
     # 카테고리의 이름을 표시
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent_category_id = instance.__dict__.get(
+            "parent_category_id"
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        moved = self.parent_category_id != getattr(
+            self, "_loaded_parent_category_id", None
+        )
+        # 이동한 경우 기존 루트를 유지해야 재계산 시 하위 지출내역까지 갱신된다
+        if is_new and self.parent_category_id is not None:
+            parent = self.parent_category
+            self.root_category_id = parent.root_category_id or parent.pk
+        super().save(*args, **kwargs)
+        self._loaded_parent_category_id = self.parent_category_id
+
+        # 새 카테고리이거나 상위 카테고리가 바뀐 경우에만 계층 정보를 재계산
+        if is_new or moved:
+            root_map = Category.objects.rebuild_ancestry()
+            self.root_category_id = root_map.get(self.pk)
+
     # 최상위 카테고리를 반환
     def get_root_category(self):
-        if self.parent_category:
+        if self.parent_category_id is None or self.root_category_id == self.pk:
+            return self
+        if self.root_category_id is None:
             return self.parent_category.get_root_category()
-        return self
+        return self.root_category
+
+
+# 카테고리 계층 (클로저 테이블)
+class CategoryClosure(models.Model):
+    # 상위카테고리식별자 (자기 자신 포함)
+    ancestor = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+    )
+    # 하위카테고리식별자 (자기 자신 포함)
+    descendant = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+    )
+    # 깊이 (자기 자신은 0)
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="unique_category_closure",
+            )
+        ]
 
 
 # 지출내역
@@ -51,17 +257,22 @@ class Expense(models.Model):
         null=True,
         blank=True,
     )
+    # 최상위카테고리식별자 (category 변경 시 함께 갱신)
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="root_expense",
+    )
     # 지출내용
     description = models.CharField(
         max_length=100,
         blank=True,
         default="",
     )
-    # 지출금액
-    amount = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-    )
+    # 지출금액 (원 단위 정수)
+    amount = models.BigIntegerField()
     # 지출일자
     date = models.DateField()
 
@@ -74,15 +285,131 @@ class Expense(models.Model):
         related_name="expense",
     )
 
-    @property
-    # 최상위 카테고리를 반환
-    def root_category(self):
-        if self.category:
-            try:
-                return self.category.get_root_category()
-            except Exception:
-                return None
-        return None
+    objects = ExpenseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date"]),
+            models.Index(fields=["user", "root_category", "date"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_snapshot = instance.current_snapshot()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_snapshot = self.current_snapshot()
+
+    # 집계 필드가 모두 로드된 경우에만 현재 값의 스냅샷을 만든다
+    def current_snapshot(self):
+        loaded = self.get_deferred_fields().isdisjoint(
+            {"user_id", "date", "amount", "root_category_id", "user_challenge_id"}
+        )
+        return snapshot(self) if loaded else None
+
+    # category에 맞춰 최상위 카테고리를 동기화
+    def sync_root_category(self):
+        if Expense.category.is_cached(self) and self.category and self.category.root_category_id:
+            self.root_category_id = self.category.root_category_id
+        else:
+            self.root_category_id = Category.objects.root_id_of(self.category_id)
+
+    def save(self, *args, **kwargs):
+        self.sync_root_category()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "category" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"root_category"}
+        super().save(*args, **kwargs)
+
+
+# 지출내용 검색 토큰 (MySQL FULLTEXT를 쓸 수 없는 환경의 n-gram 역색인)
+class ExpenseSearchToken(models.Model):
+    # 지출내역식별자
+    expense = models.ForeignKey(
+        Expense,
+        on_delete=models.CASCADE,
+        related_name="search_token",
+    )
+    # 회원식별자 (사용자 단위로 토큰을 좁히기 위해 중복 저장)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    # n-gram 토큰
+    token = models.CharField(max_length=10)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "token"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["expense", "token"],
+                name="unique_expense_search_token",
+            )
+        ]
+
+
+# 보관 지출내역 (archive_expenses가 보관 기간이 지난 지출내역을 옮겨 둔다)
+# 월별 집계와 누적지출금액에는 계속 포함되며, 조회 기간이 보관 범위에 닿을 때만 함께 읽는다
+class ArchivedExpense(models.Model):
+    # 지출내역식별자 (원래 Expense의 식별자를 그대로 사용)
+    expense_id = models.BigIntegerField(
+        primary_key=True,
+    )
+    # 회원식별자
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_expense",
+    )
+    # 카테고리식별자
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 최상위카테고리식별자
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 지출내용
+    description = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+    )
+    # 지출금액 (원 단위 정수)
+    amount = models.BigIntegerField()
+    # 지출일자
+    date = models.DateField()
+    # 나의챌린지식별자
+    user_challenge = models.ForeignKey(
+        UserChallenge,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 보관일시
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date"]),
+        ]
 
 
 # 지출내역분석
@@ -102,3 +429,283 @@ class ExpenseAnalysis(models.Model):
     )
     # 내용
     content = models.TextField()
+    # 분석월 (해당 월의 1일, 배치 생성 리포트의 upsert 키)
+    month = models.DateField(
+        null=True,
+        blank=True,
+    )
+    # 분석 결과 (전월 대비 증감, 자주 쓴 지출처, 급증일)
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+    )
+    # 생성일시
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+    # 수정일시
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month"],
+                name="unique_expense_analysis_month",
+            )
+        ]
+
+
+# 월별지출집계 (회원, 월, 최상위 카테고리 단위로 지출 저장/삭제 시 증감 반영)
+class ExpenseMonthlyRollup(models.Model):
+    # 월별지출집계식별자
+    expense_monthly_rollup_id = models.BigAutoField(
+        primary_key=True,
+    )
+    # 회원식별자
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="expense_monthly_rollup",
+    )
+    # 집계월 (해당 월의 1일)
+    month = models.DateField()
+    # 최상위카테고리식별자 (미분류는 NULL)
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="monthly_rollup",
+    )
+    # 유니크 키로 쓰는 최상위카테고리식별자 (미분류는 0)
+    # NULL은 유니크 인덱스에서 서로 다른 값으로 취급되어 미분류 행이 중복될 수 있다
+    root_key = models.BigIntegerField(
+        default=0,
+    )
+    # 지출금액 합계
+    amount = models.BigIntegerField(
+        default=0,
+    )
+    # 지출건수
+    count = models.IntegerField(
+        default=0,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "root_key"],
+                name="unique_expense_monthly_rollup",
+            )
+        ]
+
+
+# 월말지출예측 (회원, 월, 최상위 카테고리 단위)
+# 매일 밤 배치(generate_spending_forecasts)로 계산하고, 지출 저장/삭제 시 증감을 반영한다
+class SpendingForecast(models.Model):
+    # 월말지출예측식별자
+    spending_forecast_id = models.BigAutoField(
+        primary_key=True,
+    )
+    # 회원식별자
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="spending_forecast",
+    )
+    # 예측월 (해당 월의 1일)
+    month = models.DateField()
+    # 최상위카테고리식별자 (미분류는 NULL)
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="spending_forecast",
+    )
+    # 유니크 키로 쓰는 최상위카테고리식별자 (미분류는 0, ExpenseMonthlyRollup과 같은 규칙)
+    root_key = models.BigIntegerField(
+        default=0,
+    )
+    # 기준일 (기준일 전날까지를 지난 날로 보고 예측)
+    as_of = models.DateField()
+    # 이번 달 지출금액
+    spent_amount = models.BigIntegerField(
+        default=0,
+    )
+    # 월말 예상 지출금액
+    projected_amount = models.BigIntegerField(
+        default=0,
+    )
+    # 이번 달 지출이 1원 늘 때 월말 예상 지출금액 증가분
+    rate = models.FloatField(
+        default=1,
+    )
+    # 수정일시
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "root_key"],
+                name="unique_spending_forecast",
+            )
+        ]
+
+
+# 소득구간별지출분포 (월, 평균수입 구간, 최상위 카테고리 단위의 KLL 분위수 스케치)
+# 매일 밤 배치(build_cohort_sketches)로 다시 만든다
+class CohortSpendingSketch(models.Model):
+    # 소득구간별지출분포식별자
+    cohort_spending_sketch_id = models.BigAutoField(
+        primary_key=True,
+    )
+    # 집계월 (해당 월의 1일)
+    month = models.DateField()
+    # 평균수입 구간 (100만원 단위)
+    income_bucket = models.PositiveSmallIntegerField()
+    # 최상위카테고리식별자 (미분류는 NULL)
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 유니크 키로 쓰는 최상위카테고리식별자 (미분류는 0, ExpenseMonthlyRollup과 같은 규칙)
+    root_key = models.BigIntegerField(
+        default=0,
+    )
+    # 구간 전체 사용자 수 (지출이 없는 사용자 포함)
+    population = models.IntegerField(
+        default=0,
+    )
+    # 지출이 있는 사용자 수
+    count = models.IntegerField(
+        default=0,
+    )
+    # 스케치 (int64 배열 바이트)
+    sketch = models.BinaryField()
+    # 수정일시
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "income_bucket", "root_key"],
+                name="unique_cohort_spending_sketch",
+            )
+        ]
+
+
+# 카테고리별예산 (회원이 정한 최상위 카테고리별 월 예산)
+class CategoryBudget(models.Model):
+    # 카테고리별예산식별자
+    category_budget_id = models.BigAutoField(
+        primary_key=True,
+    )
+    # 회원식별자
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="category_budget",
+    )
+    # 최상위카테고리식별자
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    # 월 예산 (원 단위 정수)
+    amount = models.BigIntegerField()
+    # 생성일시
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+    # 수정일시
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "root_category"],
+                name="unique_category_budget",
+            )
+        ]
+
+
+ALERT_KIND_CHOICES = [
+    ("budget", "예산"),
+    ("challenge", "챌린지"),
+]
+
+
+# 지출알림 (예산/나의챌린지 목표지출의 80%, 100% 도달 시 쌓이는 알림 대기열, 발송 전에는 sent_at이 NULL)
+class SpendingAlert(models.Model):
+    # 지출알림식별자
+    spending_alert_id = models.BigAutoField(
+        primary_key=True,
+    )
+    # 회원식별자
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="spending_alert",
+    )
+    # 종류
+    kind = models.CharField(
+        max_length=20,
+        choices=ALERT_KIND_CHOICES,
+    )
+    # 최상위카테고리식별자 (예산 알림)
+    root_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 유저챌린지식별자 (챌린지 알림)
+    user_challenge = models.ForeignKey(
+        UserChallenge,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # 알림월 (해당 월의 1일)
+    month = models.DateField()
+    # 도달 비율 (80, 100)
+    threshold = models.PositiveSmallIntegerField()
+    # 도달 시점 누적금액
+    amount = models.BigIntegerField()
+    # 한도 (예산 또는 목표지출)
+    limit_amount = models.BigIntegerField()
+    # 같은 한도, 같은 비율의 알림은 한 번만 쌓는다
+    dedupe_key = models.CharField(
+        max_length=100,
+        unique=True,
+    )
+    # 생성일시
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+    # 발송일시
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["sent_at", "created_at"]),
+        ]
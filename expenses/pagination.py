@@ -1,10 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.exceptions import ValidationError
 from rest_framework import status
 
 
-# 페이지네이션
-class CustomPageNumberPagination(PageNumberPagination):
+# 허용된 page_size만 받도록 검증
+class PageSizeMixin:
     page_size = 20  # 기본 페이지 크기
     page_size_query_param = "page_size"  # 쿼리 파라미터 이름
     max_page_size = 100  # 최대 페이지 크기
@@ -32,3 +37,82 @@ class CustomPageNumberPagination(PageNumberPagination):
             )
 
         return page_size
+
+
+# 페이지네이션
+class CustomPageNumberPagination(PageSizeMixin, PageNumberPagination):
+    pass
+
+
+# 커서(keyset) 페이지네이션
+# (date, expense_id) 기준으로 이어서 조회하므로 COUNT/OFFSET 없이 깊은 페이지도 일정한 비용
+class ExpenseCursorPagination(PageSizeMixin, BasePagination):
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, descending=True):
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        backward = bool(cursor and cursor["prev"])
+
+        # 이전 페이지는 반대 방향으로 조회한 뒤 뒤집는다
+        scan_descending = descending != backward
+        if cursor:
+            if scan_descending:
+                queryset = queryset.filter(
+                    Q(date__lt=cursor["date"])
+                    | Q(date=cursor["date"], expense_id__lt=cursor["id"])
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(date__gt=cursor["date"])
+                    | Q(date=cursor["date"], expense_id__gt=cursor["id"])
+                )
+        ordering = ("-date", "-expense_id") if scan_descending else ("date", "expense_id")
+
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backward:
+            rows.reverse()
+
+        self.page_size = page_size
+        self.has_next = has_more if not backward else cursor is not None
+        self.has_previous = has_more if backward else cursor is not None
+        self.next_cursor = self.encode_cursor(rows[-1], prev=False) if rows and self.has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], prev=True) if rows and self.has_previous else None
+        return rows
+
+    def get_pagination_data(self):
+        return {
+            "page_size": self.page_size,
+            "has_next": self.has_next,
+            "has_previous": self.has_previous,
+            "next_cursor": self.next_cursor,
+            "previous_cursor": self.previous_cursor,
+        }
+
+    def encode_cursor(self, expense, prev):
+        payload = {"d": expense.date.isoformat(), "i": expense.expense_id, "p": prev}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, raw):
+        if not raw:
+            return None
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            cursor = {
+                "date": parse_date(payload["d"]),
+                "id": int(payload["i"]),
+                "prev": bool(payload.get("p")),
+            }
+        except (ValueError, TypeError, KeyError):
+            cursor = None
+        if cursor is None or cursor["date"] is None:
+            raise ValidationError(
+                {
+                    "invalid_cursor": "cursor 값이 올바르지 않습니다.",
+                }
+            )
+        return cursor
@@ -1,6 +1,9 @@
+from decimal import Decimal, InvalidOperation
 from rest_framework import serializers
-from .models import Expense, ExpenseAnalysis, Category
-from drf_spectacular.utils import extend_schema_serializer, OpenApiExample
+from .models import Expense, ExpenseAnalysis, Category, SpendingAlert
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_serializer, extend_schema_field, OpenApiExample
+from .utils.category_tree import get_category_tree
 
 
 # 에러 응답 정의
@@ -23,7 +26,9 @@ class ErrorResponseSerializer(serializers.Serializer):
 
 
 # 카테고리를 재귀적으로 반환
+# 하위 카테고리는 메모리의 카테고리 트리에서 구성 (노드별 조회 없음)
 class RecursiveCategorySerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="category_id")
     children = serializers.SerializerMethodField()
 
     class Meta:
@@ -31,10 +36,9 @@ class RecursiveCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "children"]
 
     def get_children(self, obj):
-        children = obj.child_category.all()
-        if children.exists():
-            return RecursiveCategorySerializer(children, many=True).data
-        return []
+        tree = get_category_tree()
+        node = tree.get(obj.category_id)
+        return tree.nested(node.children) if node else []
 
 
 # 지출내역에 들어가는 카테고리 목록
@@ -47,16 +51,17 @@ class InlineCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "parent"]
 
     def get_parent(self, obj):
-        return obj.parent_category.name if obj.parent_category else None
+        return get_category_tree().parent_name(obj.category_id)
 
 
 # 전체지출내역
 class ExpenseSerializer(serializers.ModelSerializer):
-    category = InlineCategorySerializer()
-    amount = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
 
-    def get_amount(self, obj):
-        return int(obj.amount)
+    # 카테고리 정보는 카테고리 트리에서 채워 지출내역마다 카테고리를 조회하지 않는다
+    @extend_schema_field(InlineCategorySerializer(allow_null=True))
+    def get_category(self, obj):
+        return get_category_tree().inline(obj.category_id)
 
     class Meta:
         model = Expense
@@ -68,14 +73,151 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "description",
         )
 
+# 입력 가능한 최대 금액 (정수 변경 전 DecimalField(max_digits=10, decimal_places=2)의 정수부 범위)
+MAX_WON_AMOUNT = 99_999_999
+
+
+# 금액은 원 단위 정수로 저장한다
+# 기존 클라이언트가 보내던 "12000.00" 같은 소수점 표기는 소수부가 0일 때만 허용
+# 응답 표기는 정수 변경 전과 같다
+# - 정수: 지출내역 조회/등록(ExpenseSerializer), 내보내기, 합계/요약/시계열/예측/예산/알림
+# - "12000.00" 문자열: 지출내역 수정(PUT) 응답, 챌린지/나의챌린지 금액 (DecimalWonAmountField)
+class WonAmountField(serializers.IntegerField):
+    default_error_messages = {
+        "fraction": "금액은 원 단위 정수로 입력해주세요.",
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_value", MAX_WON_AMOUNT)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, float) or (isinstance(data, str) and "." in data):
+            try:
+                value = Decimal(str(data).strip())
+            except InvalidOperation:
+                self.fail("invalid")
+            if not value.is_finite():
+                self.fail("invalid")
+            if value != value.to_integral_value():
+                self.fail("fraction")
+            data = int(value)
+        return super().to_internal_value(data)
+
+
+# 정수 변경 전 DecimalField처럼 "12000.00" 문자열로 응답하는 금액
+@extend_schema_field(OpenApiTypes.DECIMAL)
+class DecimalWonAmountField(WonAmountField):
+    def to_representation(self, value):
+        return f"{int(value)}.00"
+
+
 class ExpenseWriteSerializer(serializers.ModelSerializer):
+    amount = DecimalWonAmountField()
+
     class Meta:
         model = Expense
         fields = ("date", "amount", "category", "description")
         
 class CategorySerializer(serializers.ModelSerializer):
-    parent = serializers.CharField(source='parent_category.name', allow_null=True)
+    parent = serializers.SerializerMethodField()
+
+    def get_parent(self, obj):
+        return get_category_tree().parent_name(obj.category_id)
 
     class Meta:
         model = Category
-        fields = ['category_id', 'name', 'parent']
\ No newline at end of file
+        fields = ['category_id', 'name', 'parent']
+
+
+# 카테고리 식별자 또는 이름을 카테고리 트리에서 찾아 식별자로 변환
+class CategoryLookupField(serializers.Field):
+    default_error_messages = {
+        "not_found": "존재하지 않는 카테고리입니다: {value}",
+    }
+
+    def to_internal_value(self, data):
+        tree = get_category_tree()
+        value = str(data).strip()
+        if value.isdigit() and tree.get(int(value)):
+            return int(value)
+        category_ids = tree.ids_by_name.get(value)
+        if category_ids:
+            return category_ids[0]
+        self.fail("not_found", value=value)
+
+    def to_representation(self, value):
+        return value
+
+
+# 지출내역 일괄 등록의 한 행 (ExpenseWriteSerializer와 같은 검증, 카테고리는 이름도 허용)
+# 인스턴스 하나로 run_validation()을 반복 호출해 행마다 시리얼라이저를 만들지 않는다
+class ExpenseImportRowSerializer(ExpenseWriteSerializer):
+    category = CategoryLookupField(required=False, allow_null=True)
+
+    class Meta(ExpenseWriteSerializer.Meta):
+        pass
+
+
+# 지출내역 일괄 수정/삭제 요청
+class ExpenseBulkSerializer(serializers.Serializer):
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=MAX_IDS,
+    )
+    operation = serializers.ChoiceField(choices=("update", "delete"))
+    # operation=update 일 때 변경할 값 (ExpenseWriteSerializer와 같은 검증)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        attrs["ids"] = list(dict.fromkeys(attrs["ids"]))
+        if attrs["operation"] == "update":
+            write_serializer = ExpenseWriteSerializer(data=attrs.get("data") or {}, partial=True)
+            write_serializer.is_valid(raise_exception=True)
+            if not write_serializer.validated_data:
+                raise serializers.ValidationError({"data": "변경할 값이 없습니다."})
+            attrs["data"] = write_serializer.validated_data
+        return attrs
+
+
+class ExpenseAnalysisSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExpenseAnalysis
+        fields = (
+            "expense_analysis_id",
+            "month",
+            "title",
+            "content",
+            "data",
+            "updated_at",
+        )
+
+
+# 카테고리별 예산 등록/수정 (최상위 카테고리만, 식별자 또는 이름)
+class CategoryBudgetWriteSerializer(serializers.Serializer):
+    category = CategoryLookupField()
+    amount = WonAmountField(min_value=1)
+
+    def validate_category(self, value):
+        if get_category_tree().root_id(value) != value:
+            raise serializers.ValidationError("예산은 최상위 카테고리에만 정할 수 있습니다.")
+        return value
+
+
+class SpendingAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SpendingAlert
+        fields = (
+            "spending_alert_id",
+            "kind",
+            "root_category",
+            "user_challenge",
+            "month",
+            "threshold",
+            "amount",
+            "limit_amount",
+            "created_at",
+        )
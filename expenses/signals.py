@@ -1,29 +1,97 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import Expense
+from challenges.models import UserChallenge
+from challenges.utils.totals import schedule_challenge_recompute
+from .models import Category, CategoryBudget, Expense
+from .utils.alerts import invalidate_user_budgets
+from .utils.category_tree import bump_category_tree_version
+from .utils.challenge_matcher import invalidate_challenge_matcher
+from .utils.response_cache import bump_user_data_versions
+from .utils.deltas import apply_expense_deltas, fold_root_category, grouped_snapshots, snapshot
+from .utils.cohort import drop_root_category_sketches
+from .utils.forecast import fold_root_category_forecasts
+from .utils.search import index_expenses, uses_token_index
 
+
+# 카테고리가 바뀌면 모든 워커의 카테고리 트리를 무효화
+# (이름 변경/삭제는 rebuild_ancestry를 거치지 않으므로 여기서 버전을 올린다)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, **kwargs):
+    bump_category_tree_version()
+
+
+# 최상위 카테고리 삭제 시 지출내역은 미분류가 되므로 집계/예측 행은 미분류로 합치고 분포는 지운다
+@receiver(pre_delete, sender=Category)
+def fold_rollups_on_root_delete(sender, instance, **kwargs):
+    if instance.parent_category_id is None:
+        fold_root_category(instance.pk)
+        fold_root_category_forecasts(instance.pk)
+        drop_root_category_sketches(instance.pk)
+
+
+# 수정 전 값을 알 수 없는 인스턴스는 저장 전에 DB 값을 읽어 둔다
+@receiver(pre_save, sender=Expense)
+def capture_previous_expense_snapshot(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_snapshots = []
+    elif getattr(instance, "_loaded_snapshot", None) is not None:
+        instance._previous_snapshots = [instance._loaded_snapshot]
+    else:
+        instance._previous_snapshots = grouped_snapshots(
+            Expense.objects.filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Expense)
+def update_monthly_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = snapshot(instance)
+    apply_expense_deltas(removed=instance._previous_snapshots, added=[current])
+    instance._loaded_snapshot = current
+
+
+# n-gram 역색인을 쓰는 환경에서는 저장 시 검색 토큰을 갱신
 @receiver(post_save, sender=Expense)
-def update_user_challenge_total_expense_on_save(sender, instance, **kwargs):
-    if instance.user_challenge:
-        from django.db.models import Sum
-        uc = instance.user_challenge
-        total = Expense.objects.filter(
-            user_challenge=uc,
-            date__gte=uc.start_date.date(),
-            date__lte=uc.end_date.date()
-        ).aggregate(total=Sum("amount"))["total"] or 0
-        uc.total_expense = total
-        uc.save(update_fields=["total_expense"])
+def update_search_tokens_on_save(sender, instance, raw=False, **kwargs):
+    if not raw and uses_token_index():
+        index_expenses([instance])
+
 
 @receiver(post_delete, sender=Expense)
-def update_user_challenge_total_expense_on_delete(sender, instance, **kwargs):
-    if instance.user_challenge:
-        from django.db.models import Sum
-        uc = instance.user_challenge
-        total = Expense.objects.filter(
-            user_challenge=uc,
-            date__gte=uc.start_date.date(),
-            date__lte=uc.end_date.date()
-        ).aggregate(total=Sum("amount"))["total"] or 0
-        uc.total_expense = total
-        uc.save(update_fields=["total_expense"])
\ No newline at end of file
+def update_monthly_rollup_on_delete(sender, instance, **kwargs):
+    previous = getattr(instance, "_loaded_snapshot", None) or snapshot(instance)
+    apply_expense_deltas(removed=[previous])
+
+
+# 챌린지 참여/판정/삭제 시 사용자의 데이터 버전을 갱신하고 도전중 챌린지 인덱스를 무효화
+# (누적지출금액만 갱신하는 저장은 매칭에 영향이 없으므로 제외)
+@receiver(post_save, sender=UserChallenge)
+def invalidate_matcher_on_user_challenge_save(sender, instance, update_fields=None, **kwargs):
+    bump_user_data_versions([instance.user_id])
+    if update_fields and set(update_fields) <= {"total_expense", "progress", "updated_at"}:
+        return
+    invalidate_challenge_matcher(instance.user_id)
+
+
+@receiver(post_delete, sender=UserChallenge)
+def invalidate_matcher_on_user_challenge_delete(sender, instance, **kwargs):
+    bump_user_data_versions([instance.user_id])
+    invalidate_challenge_matcher(instance.user_id)
+
+
+# 나의챌린지 기간이 바뀌면 기간 안에 드는 지출이 달라지므로 커밋 후 다시 합산
+@receiver(post_save, sender=UserChallenge)
+def recompute_total_expense_on_window_change(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is None or {"start_date", "end_date"} & set(update_fields):
+        schedule_challenge_recompute([instance.user_challenge_id])
+
+
+# 예산이 바뀌면 지출 저장 시 읽는 사용자 예산 캐시를 무효화
+@receiver(post_save, sender=CategoryBudget)
+@receiver(post_delete, sender=CategoryBudget)
+def invalidate_budgets_on_change(sender, instance, **kwargs):
+    invalidate_user_budgets(instance.user_id)
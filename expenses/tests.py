@@ -1,3 +1,890 @@
-from django.test import TestCase
+import io
+import json
+import random
+from datetime import date, timedelta
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Sum
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from accounts.models import User, UserProfile
+from geumjjoki import db_router
+from .checks import check_shared_caches
+from .models import (
+    ArchivedExpense,
+    SpendingForecast,
+    Category,
+    CohortSpendingSketch,
+    Expense,
+    ExpenseMonthlyRollup,
+    SpendingAlert,
+)
+from .utils.alerts import get_user_budgets
+from .utils.archive import with_archive
+from .utils.categorizer import ExpenseCategorizer, KeywordAutomaton, get_categorizer
+from .utils.category_tree import get_category_tree
+from .utils.exporter import iter_expense_values
+from .utils.forecast import flat_rate, forecast_users
+from .utils.cohort import CohortDistribution, KLLSketch, get_cohort_distributions
+from .utils.importer import ExpenseImporter
+from .utils.query import filter_expenses
+from .utils.search import tokenize
+from .utils.timeseries import MAX_BUCKETS, bucket_dates
+
+
+class ExpenseTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("create_categories", stdout=io.StringIO())
+        cls.user = User.objects.create(username="tester", email="tester@example.com")
+
+    def setUp(self):
+        # 카테고리 트리/응답/예산 캐시 버전이 이전 테스트의 데이터와 섞이지 않게 비운다
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def category(name):
+        return Category.objects.get(name=name)
+
+    def create_expense(self, amount, category, expense_date, description=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/expenses/create/",
+                {
+                    "date": str(expense_date),
+                    "amount": amount,
+                    "category": category.pk,
+                    "description": description,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response
+
+
+# 캐시 버전 키를 프로세스 간에 공유하지 못하는 설정은 운영 환경에서 오류
+class SharedCacheCheckTests(SimpleTestCase):
+    LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    DATABASE = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache"}
+
+    def test_locmem_is_rejected_without_debug(self):
+        with override_settings(DEBUG=False, CACHES={"default": self.LOCMEM, "responses": self.DATABASE}):
+            self.assertEqual([error.id for error in check_shared_caches(None)], ["expenses.E001"])
+        with override_settings(DEBUG=True, CACHES={"default": self.LOCMEM, "responses": self.DATABASE}):
+            self.assertEqual(check_shared_caches(None), [])
+        with override_settings(DEBUG=False, CACHES={"default": self.DATABASE, "responses": self.DATABASE}):
+            self.assertEqual(check_shared_caches(None), [])
+
+
+# 지출 저장/일괄 수정/일괄 삭제가 월별 집계에 증감으로 반영되는지
+class ExpenseRollupDeltaTests(ExpenseTestCase):
+    def rollups(self):
+        return {
+            (month, root_key): (amount, count)
+            for month, root_key, amount, count in ExpenseMonthlyRollup.objects.filter(count__gt=0).values_list(
+                "month", "root_key", "amount", "count"
+            )
+        }
+
+    def test_save_moves_amount_between_roots_and_months(self):
+        food, taxi = self.category("편의점"), self.category("택시")
+        expense = Expense.objects.create(user=self.user, category=food, amount=1000, date=date(2025, 3, 5))
+        self.assertEqual(self.rollups(), {(date(2025, 3, 1), food.root_category_id): (1000, 1)})
+
+        expense.amount = 1500
+        expense.category = taxi
+        expense.save()
+        self.assertEqual(self.rollups(), {(date(2025, 3, 1), taxi.root_category_id): (1500, 1)})
+
+        expense.date = date(2025, 2, 3)
+        expense.save()
+        self.assertEqual(self.rollups(), {(date(2025, 2, 1), taxi.root_category_id): (1500, 1)})
+
+    def test_queryset_update_and_bulk_delete(self):
+        taxi, movie = self.category("택시"), self.category("영화")
+        Expense.objects.bulk_create(
+            [Expense(user=self.user, category=taxi, amount=5, date=date(2025, 2, 2)) for _ in range(3)]
+        )
+        self.assertEqual(self.rollups(), {(date(2025, 2, 1), taxi.root_category_id): (15, 3)})
+
+        Expense.objects.filter(category=taxi).update(category=movie)
+        self.assertEqual(self.rollups(), {(date(2025, 2, 1), movie.root_category_id): (15, 3)})
+
+        Expense.objects.filter(user=self.user).bulk_delete()
+        self.assertEqual(self.rollups(), {})
+
+    def test_uncategorized_expenses_share_one_row(self):
+        for amount in (100, 200, 300):
+            Expense.objects.create(user=self.user, category=None, amount=amount, date=date(2025, 1, 10))
+
+        rows = ExpenseMonthlyRollup.objects.filter(user=self.user, month=date(2025, 1, 1))
+        self.assertEqual(list(rows.values_list("root_key", "root_category_id", "amount", "count")), [(0, None, 600, 3)])
+
+    def test_root_category_delete_folds_into_uncategorized(self):
+        taxi = self.category("택시")
+        Expense.objects.create(user=self.user, category=None, amount=100, date=date(2025, 1, 10))
+        Expense.objects.create(user=self.user, category=taxi, amount=50, date=date(2025, 1, 11))
+
+        Category.objects.filter(pk=taxi.root_category_id).delete()
+        self.assertEqual(self.rollups(), {(date(2025, 1, 1), 0): (150, 2)})
+
+        # 지출내역과 집계가 이미 일치하므로 보정할 키가 없다
+        call_command("rebuild_expense_rollups", stdout=io.StringIO())
+        self.assertEqual(self.rollups(), {(date(2025, 1, 1), 0): (150, 2)})
+
+
+# 커서 페이지네이션의 다음/이전 이동
+class ExpenseCursorPaginationTests(ExpenseTestCase):
+    PAGE_SIZE = 10
+
+    def setUp(self):
+        super().setUp()
+        Expense.objects.bulk_create(
+            [
+                Expense(
+                    user=self.user,
+                    category=self.category("편의점" if i % 3 else "택시"),
+                    amount=1000 + i,
+                    date=date(2025, 1, 1) + timedelta(days=i // 3),
+                    description=f"지출{i}",
+                )
+                for i in range(25)
+            ]
+        )
+
+    def page(self, order="desc", cursor=None):
+        url = f"/api/v1/expenses/?pagination=cursor&page_size={self.PAGE_SIZE}&date={order}"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        return [expense["expense_id"] for expense in data["expenses"]], data["pagination"]
+
+    def walk_forward(self, order):
+        pages, cursor = [], None
+        while True:
+            ids, pagination = self.page(order, cursor)
+            pages.append((ids, pagination))
+            cursor = pagination["next_cursor"]
+            if not cursor:
+                return pages
+
+    def test_next_cursor_walks_every_expense_once(self):
+        for order, ordering in (("desc", ("-date", "-expense_id")), ("asc", ("date", "expense_id"))):
+            with self.subTest(order=order):
+                pages = self.walk_forward(order)
+                ids = [expense_id for page_ids, _ in pages for expense_id in page_ids]
+                expected = list(Expense.objects.order_by(*ordering).values_list("expense_id", flat=True))
+                self.assertEqual(ids, expected)
+                self.assertEqual(len(pages), 3)
+                self.assertFalse(pages[0][1]["has_previous"])
+                self.assertFalse(pages[-1][1]["has_next"])
+
+    def test_previous_cursor_walks_back_to_first_page(self):
+        for order in ("desc", "asc"):
+            with self.subTest(order=order):
+                pages = self.walk_forward(order)
+                cursor = pages[-1][1]["previous_cursor"]
+                for expected_ids, _ in reversed(pages[:-1]):
+                    ids, pagination = self.page(order, cursor)
+                    self.assertEqual(ids, expected_ids)
+                    cursor = pagination["previous_cursor"]
+                self.assertFalse(pagination["has_previous"])
+                self.assertTrue(pagination["has_next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/v1/expenses/?pagination=cursor&cursor=zzz")
+        self.assertEqual(response.status_code, 400)
+
+
+# 보관 지출내역과 지출내역을 하나의 목록처럼 조회하는지
+# 보관 후 예전 날짜로 새로 등록한 지출은 같은 날짜의 보관 지출내역과 섞여 페이지 경계에 걸린다
+class ExpenseArchiveTests(ExpenseTestCase):
+    PAGE_SIZE = 10
+
+    def setUp(self):
+        super().setUp()
+        old, recent = date(2020, 1, 1), date.today() - timedelta(days=10)
+        Expense.objects.bulk_create(
+            [
+                Expense(user=self.user, category=self.category("택시"), amount=100 + i, date=old + timedelta(days=i // 3))
+                for i in range(10)
+            ]
+            + [
+                Expense(user=self.user, category=self.category("마트"), amount=200 + i, date=recent + timedelta(days=i // 3))
+                for i in range(12)
+            ]
+        )
+        self.rollups_before = self.rollups()
+        call_command("archive_expenses", "--chunk-size", "5", stdout=io.StringIO())
+        Expense.objects.bulk_create(
+            [
+                Expense(user=self.user, category=self.category("택시"), amount=300 + i, date=date(2020, 1, 4))
+                for i in range(4)
+            ]
+        )
+
+    def rollups(self):
+        return set(ExpenseMonthlyRollup.objects.filter(count__gt=0).values_list("month", "root_key", "amount", "count"))
+
+    def expected(self, descending):
+        rows = [
+            (expense_date, expense_id)
+            for model in (Expense, ArchivedExpense)
+            for expense_date, expense_id in model.objects.values_list("date", "expense_id")
+        ]
+        return [expense_id for _, expense_id in sorted(rows, reverse=descending)]
+
+    def test_archive_moves_only_old_expenses(self):
+        self.assertEqual(ArchivedExpense.objects.count(), 10)
+        self.assertEqual(Expense.objects.filter(date__lt=date(2021, 1, 1)).count(), 4)
+
+    def test_union_slices_count_and_aggregate(self):
+        union = with_archive(self.user, QueryDict(), Expense.objects.filter(user=self.user))
+        for descending in (True, False):
+            with self.subTest(descending=descending):
+                ordered = union.order_by("-date" if descending else "date").values_list("date", "expense_id")
+                expected = self.expected(descending)
+                for start, stop in ((0, 10), (5, 15), (10, 20), (20, None)):
+                    ids = [row[1] for row in ordered[start:stop]]
+                    self.assertEqual(ids, expected[start:stop], (start, stop))
+
+        self.assertEqual(union.count(), 26)
+        totals = union.aggregate(count=Count("expense_id"), sum=Sum("amount"))
+        self.assertEqual(totals, {"count": 26, "sum": sum(range(100, 110)) + sum(range(200, 212)) + sum(range(300, 304))})
+
+    def test_cursor_walks_across_tables(self):
+        for order, descending in (("desc", True), ("asc", False)):
+            with self.subTest(order=order):
+                ids, cursor = [], None
+                while True:
+                    url = f"/api/v1/expenses/?pagination=cursor&page_size={self.PAGE_SIZE}&date={order}"
+                    if cursor:
+                        url += f"&cursor={cursor}"
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200, response.content)
+                    data = response.json()["data"]
+                    ids += [expense["expense_id"] for expense in data["expenses"]]
+                    self.assertEqual(data["total_count"], 26)
+                    cursor = data["pagination"]["next_cursor"]
+                    if not cursor:
+                        break
+                self.assertEqual(ids, self.expected(descending))
+
+        # 오름차순 첫 페이지 경계가 2020-01-04의 보관/새 지출 사이에 걸린다
+        asc = self.expected(False)
+        boundary = asc[self.PAGE_SIZE - 1:self.PAGE_SIZE + 1]
+        self.assertTrue(ArchivedExpense.objects.filter(pk=boundary[0], date=date(2020, 1, 4)).exists())
+        self.assertTrue(Expense.objects.filter(pk=boundary[1], date=date(2020, 1, 4)).exists())
+
+    # 월별 집계는 보관 지출내역을 포함한 값이라 보관해도 그대로이고 재계산해도 같다
+    def test_rollups_unchanged_after_archiving(self):
+        Expense.objects.filter(amount__gte=300).bulk_delete()
+        self.assertEqual(self.rollups(), self.rollups_before)
+        call_command("rebuild_expense_rollups", stdout=io.StringIO())
+        self.assertEqual(self.rollups(), self.rollups_before)
+
+
+# 조회 응답 캐시가 쓰기 후 무효화되는지
+class ExpenseResponseCacheTests(ExpenseTestCase):
+    def test_cached_list_reflects_write(self):
+        self.create_expense(1000, self.category("택시"), date(2026, 3, 2))
+        self.assertEqual(self.client.get("/api/v1/expenses/").json()["data"]["total_count"], 1)
+
+        self.create_expense(500, self.category("택시"), date(2026, 3, 3))
+        self.assertEqual(self.client.get("/api/v1/expenses/").json()["data"]["total_count"], 2)
+
+        expense = Expense.objects.get(amount=500)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/v1/expenses/{expense.pk}/")
+        self.assertEqual(self.client.get("/api/v1/expenses/").json()["data"]["total_count"], 1)
+
+    # 관리 명령(다른 프로세스)에서 바꾼 데이터도 공유 캐시의 버전을 바꿔 다음 조회에 반영된다
+    def test_command_write_invalidates_cache(self):
+        today = date.today()
+        self.create_expense(1000, self.category("택시"), today)
+        rollup = ExpenseMonthlyRollup.objects.filter(user=self.user, month=today.replace(day=1))
+        # 신호를 거치지 않는 수정이라 버전이 바뀌지 않고 캐시된 응답이 그대로 나간다
+        rollup.update(amount=9999)
+        url = f"/api/v1/expenses/summary/?year={today.year}&month={today.month}"
+        self.assertEqual(self.client.get(url).json()["data"]["current_month"]["total_amount"], 9999)
+        rollup.update(amount=7777)
+        self.assertEqual(self.client.get(url).json()["data"]["current_month"]["total_amount"], 9999)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_expense_rollups", stdout=io.StringIO())
+        self.assertEqual(self.client.get(url).json()["data"]["current_month"]["total_amount"], 1000)
+
+
+# 쓰기 전에는 ETag가 같아 304, 쓰기 후에는 새 ETag로 200
+class ExpenseETagTests(ExpenseTestCase):
+    def test_etag_revalidates_until_write(self):
+        self.create_expense(1000, self.category("택시"), date(2026, 3, 2))
+        for url in ("/api/v1/expenses/", "/api/v1/expenses/summary/"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+                self.create_expense(500, self.category("택시"), date(2026, 3, 3))
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "responses": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    })
+    def test_no_etag_without_shared_cache(self):
+        self.create_expense(1000, self.category("택시"), date(2026, 3, 2))
+        response = self.client.get("/api/v1/expenses/")
+        self.assertNotIn("ETag", response)
+        response = self.client.get("/api/v1/expenses/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+
+
+# 금액 응답 표기는 정수 변경 전과 같다 (조회는 정수, 수정 응답은 "12000.00")
+class ExpenseAmountRenderingTests(ExpenseTestCase):
+    def test_read_and_write_responses_keep_their_formats(self):
+        expense_id = self.create_expense("1000.00", self.category("택시"), date(2026, 3, 2)).json()["data"]["expense_id"]
+        self.assertEqual(self.client.get(f"/api/v1/expenses/{expense_id}/").json()["data"]["amount"], 1000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f"/api/v1/expenses/{expense_id}/", {"amount": 1500}, format="json")
+        self.assertEqual(response.json()["data"]["amount"], "1500.00")
+        self.assertEqual(self.client.get(f"/api/v1/expenses/{expense_id}/").json()["data"]["amount"], 1500)
+
+    def test_amount_limits(self):
+        url = "/api/v1/expenses/create/"
+        for amount in ("12.5", 100_000_000):
+            with self.subTest(amount=amount):
+                response = self.client.post(
+                    url, {"date": "2026-03-02", "amount": amount, "category": self.category("택시").pk}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+# 예산 비율(80%, 100%)을 넘을 때 알림이 비율마다 한 번만 쌓이는지
+class BudgetAlertTests(ExpenseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.category("식품")
+        self.mart = self.category("마트")
+        self.today = date.today()
+        self.set_budget(100000)
+
+    def set_budget(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/expenses/budgets/",
+                {"category": self.root.pk, "amount": amount},
+                format="json",
+            )
+        self.assertIn(response.status_code, (200, 201), response.content)
+
+    def alerts(self):
+        return list(
+            SpendingAlert.objects.filter(user=self.user, kind="budget")
+            .order_by("limit_amount", "threshold")
+            .values_list("threshold", "limit_amount")
+        )
+
+    def test_each_threshold_fires_once(self):
+        steps = [
+            (50000, []),
+            (35000, [(80, 100000)]),
+            (10000, [(80, 100000)]),
+            (20000, [(80, 100000), (100, 100000)]),
+            (5000, [(80, 100000), (100, 100000)]),
+        ]
+        for amount, expected in steps:
+            self.create_expense(amount, self.mart, self.today)
+            self.assertEqual(self.alerts(), expected, amount)
+
+        # 아래로 내려갔다가 다시 넘어도 같은 달/한도의 알림은 다시 쌓이지 않는다
+        expense = Expense.objects.get(amount=35000)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/v1/expenses/{expense.pk}/")
+        self.create_expense(35000, self.mart, self.today)
+        self.assertEqual(self.alerts(), [(80, 100000), (100, 100000)])
+
+    def test_budget_change_uses_new_limit(self):
+        self.create_expense(60000, self.mart, self.today)
+        self.assertEqual(get_user_budgets([self.user.pk])[self.user.pk], {self.root.pk: 100000})
+
+        # 예산을 바꾸면 캐시 버전이 바뀌어 다음 지출부터 새 한도로 확인한다
+        self.set_budget(70000)
+        self.assertEqual(get_user_budgets([self.user.pk])[self.user.pk], {self.root.pk: 70000})
+        self.assertEqual(self.alerts(), [(80, 70000)])
+
+        self.create_expense(10000, self.mart, self.today)
+        self.assertEqual(self.alerts(), [(80, 70000), (100, 70000)])
+
+
+# 밤 배치가 다시 만든 분포를 웹 프로세스가 (배치 전에 빈 분포를 읽었더라도) 다음 조회에서 읽는지
+class CohortSketchRebuildTests(ExpenseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.month = date.today().replace(day=1)
+        UserProfile.objects.create(user=self.user, average_income=2_500_000)
+
+    def build(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("build_cohort_sketches", stdout=io.StringIO())
+
+    def test_rebuild_is_picked_up(self):
+        self.assertEqual(get_cohort_distributions(self.month), {})
+
+        food = self.category("마트")
+        Expense.objects.create(user=self.user, category=food, amount=1000, date=self.month)
+        Expense.objects.create(user=self.user, category=None, amount=500, date=self.month)
+        self.build()
+        distributions = get_cohort_distributions(self.month)
+        self.assertEqual(set(distributions), {(2, food.root_category_id), (2, None)})
+        self.assertEqual(distributions[(2, None)].spenders, 1)
+
+        Expense.objects.filter(user=self.user, category=None).delete()
+        self.build()
+        self.assertEqual(set(get_cohort_distributions(self.month)), {(2, food.root_category_id)})
+
+    def test_uncategorized_sketch_uses_zero_root_key(self):
+        Expense.objects.create(user=self.user, category=None, amount=500, date=self.month)
+        self.build()
+        self.assertEqual(
+            list(CohortSpendingSketch.objects.values_list("root_key", "root_category_id")), [(0, None)]
+        )
+
+    def test_root_category_delete_drops_its_sketches(self):
+        food = self.category("마트")
+        Expense.objects.create(user=self.user, category=food, amount=1000, date=self.month)
+        self.build()
+        self.assertIn((2, food.root_category_id), get_cohort_distributions(self.month))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(pk=food.root_category_id).delete()
+        self.assertEqual(get_cohort_distributions(self.month), {})
+
+
+# 지출내용 n-gram 토큰화와 검색 관련도순 정렬
+class ExpenseSearchTests(ExpenseTestCase):
+    TEXTS = ["스타벅스 커피", "커피 원두 구매 (온라인)", "+점심* 김밥", "a", "", None]
+
+    def search(self, text, sort="relevance"):
+        response = self.client.get("/api/v1/expenses/", {"description": text, "sort": sort})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [expense["description"] for expense in response.json()["data"]["expenses"]]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("스타벅스 커피"), {"스타", "타벅", "벅스", "커피"})
+        self.assertEqual(tokenize("+점심* (김밥)"), {"점심", "김밥"})
+        self.assertEqual(tokenize("A b"), {"a", "b"})
+        self.assertEqual(tokenize(None), set())
+
+    # 0005의 토큰화 복사본은 이후 코드가 바뀌어도 그대로 두지만, 만든 시점의 규칙과는 같아야 한다
+    def test_migration_copy_matches_tokenizer(self):
+        migration = import_module("expenses.migrations.0005_expense_search")
+        for text in self.TEXTS:
+            self.assertEqual(migration.tokenize(text), tokenize(text), text)
+
+    # 관련도는 지출내용 토큰 중 검색 토큰 비율 (커피 1/1, 커피 원두 구매 1/3, 스타벅스 커피 1/4)
+    def test_relevance_prefers_short_exact_descriptions(self):
+        taxi = self.category("택시")
+        for description in ("커피 원두 구매", "커피", "스타벅스 커피", "택시비"):
+            self.create_expense(1000, taxi, date(2026, 3, 2), description)
+
+        self.assertEqual(self.search("커피"), ["커피", "커피 원두 구매", "스타벅스 커피"])
+        # 모든 단어가 포함된 지출만 남는다
+        self.assertEqual(self.search("스타벅스 커피"), ["스타벅스 커피"])
+        self.assertEqual(self.search("스타"), ["스타벅스 커피"])
+
+    def test_description_update_reindexes(self):
+        response = self.create_expense(1000, self.category("택시"), date(2026, 3, 2), "점심 김밥")
+        expense_id = response.json()["data"]["expense_id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f"/api/v1/expenses/{expense_id}/", {"description": "저녁 라면"}, format="json")
+
+        self.assertEqual(self.search("김밥"), [])
+        self.assertEqual(self.search("라면"), ["저녁 라면"])
+
+
+# 파일 업로드 일괄 등록: 잘못된 행은 행 번호와 함께 건너뛰고 나머지는 chunk 단위로 등록
+class ExpenseImportTests(ExpenseTestCase):
+    def upload(self, name, content, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/expenses/import/",
+                {"file": SimpleUploadedFile(name, content.encode()), **params},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def test_csv_reports_invalid_rows(self):
+        data = self.upload(
+            "expenses.csv",
+            "date,amount,category,description\n"
+            "2026-03-02,1000,택시,퇴근\n"
+            "2026-03-02,abc,택시,금액 오류\n"
+            "2026-03-03,2000,없는카테고리,\n"
+            "2026-03-04,3000,,\n",
+        )
+        self.assertEqual((data["imported_count"], data["error_count"]), (2, 2))
+        self.assertEqual([error["row"] for error in data["errors"]], [2, 3])
+        self.assertIn("amount", data["errors"][0]["errors"])
+        self.assertIn("category", data["errors"][1]["errors"])
+        self.assertEqual(
+            sorted(Expense.objects.filter(user=self.user).values_list("amount", "category__name")),
+            [(1000, "택시"), (3000, None)],
+        )
+        self.assertEqual(
+            ExpenseMonthlyRollup.objects.filter(user=self.user, month=date(2026, 3, 1)).aggregate(Sum("amount")),
+            {"amount__sum": 4000},
+        )
+
+    def test_ndjson_reports_malformed_lines(self):
+        data = self.upload(
+            "expenses.ndjson",
+            '{"date": "2026-03-02", "amount": 1000, "category": "택시"}\n\n{not json\n[1, 2]\n',
+        )
+        self.assertEqual((data["imported_count"], data["error_count"]), (1, 2))
+        self.assertEqual([error["row"] for error in data["errors"]], [3, 4])
+
+    @mock.patch("expenses.utils.importer.MAX_REPORTED_ERRORS", 1)
+    def test_reported_errors_are_capped(self):
+        data = self.upload("expenses.csv", "date,amount\nbad,1\nbad,2\n")
+        self.assertEqual(data["error_count"], 2)
+        self.assertEqual(len(data["errors"]), 1)
+
+    # chunk마다 bulk_create 하지만 도중에 실패하면 앞서 등록한 chunk도 함께 롤백
+    @mock.patch("expenses.utils.importer.IMPORT_CHUNK_SIZE", 2)
+    def test_chunks_share_one_transaction(self):
+        saved_counts = []
+
+        def rows():
+            for row_number in range(1, 6):
+                saved_counts.append(Expense.objects.filter(user=self.user).count())
+                yield row_number, {"date": "2026-03-02", "amount": 100, "category": "택시"}
+            raise ValueError("read failed")
+
+        with self.assertRaises(ValueError):
+            ExpenseImporter(self.user).run(rows())
+        self.assertEqual(saved_counts, [0, 0, 2, 2, 4])
+        self.assertFalse(Expense.objects.filter(user=self.user).exists())
+        self.assertFalse(ExpenseMonthlyRollup.objects.filter(user=self.user, count__gt=0).exists())
+
+
+# 내보내기는 (date, expense_id) keyset으로 chunk씩 읽어 같은 날짜가 chunk 경계에 걸려도 빠짐/중복이 없다
+class ExpenseExportTests(ExpenseTestCase):
+    def setUp(self):
+        super().setUp()
+        taxi = self.category("택시")
+        Expense.objects.bulk_create(
+            [
+                Expense(user=self.user, category=taxi, amount=100 + i, date=date(2025, 3, 1) + timedelta(days=i // 4))
+                for i in range(7)
+            ]
+        )
+
+    def test_keyset_chunks_cover_every_row_once(self):
+        expenses = Expense.objects.filter(user=self.user)
+        for descending, ordering in ((True, ("-date", "-expense_id")), (False, ("date", "expense_id"))):
+            with self.subTest(descending=descending):
+                # 3 + 3 + 1건, chunk마다 쿼리 한 번
+                with self.assertNumQueries(3):
+                    rows = list(iter_expense_values(expenses, descending=descending, chunk_size=3))
+                self.assertEqual(
+                    [row[0] for row in rows],
+                    list(expenses.order_by(*ordering).values_list("expense_id", flat=True)),
+                )
+
+    def test_keyset_chunks_span_archive(self):
+        call_command("archive_expenses", "--months", "0", stdout=io.StringIO())
+        taxi = self.category("택시")
+        Expense.objects.bulk_create([Expense(user=self.user, category=taxi, amount=1, date=date(2025, 3, 2))])
+        expenses = with_archive(self.user, QueryDict(), Expense.objects.filter(user=self.user))
+
+        rows = list(iter_expense_values(expenses, descending=False, chunk_size=3))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (row[1], row[0])))
+
+    def test_csv_and_ndjson(self):
+        response = self.client.get("/api/v1/expenses/export/", {"date": "asc"})
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "\ufeffexpense_id,date,amount,category,parent_category,description")
+        first = Expense.objects.order_by("date", "expense_id").first()
+        self.assertEqual(lines[1], f"{first.pk},2025-03-01,100,택시,교통,")
+        self.assertEqual(len(lines), 8)
+
+        response = self.client.get("/api/v1/expenses/export/", {"file_format": "ndjson", "date": "asc"})
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 7)
+        self.assertEqual(
+            records[0],
+            {
+                "expense_id": first.pk,
+                "date": "2025-03-01",
+                "amount": 100,
+                "category": "택시",
+                "parent_category": "교통",
+                "description": "",
+            },
+        )
+
+        response = self.client.get("/api/v1/expenses/export/", {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, 400)
+
+
+# 구간별 지출 합계: 빈 구간은 0으로 채우고 구간 수는 MAX_BUCKETS까지
+class ExpenseTimeSeriesTests(ExpenseTestCase):
+    def series(self, **params):
+        response = self.client.get("/api/v1/expenses/timeseries/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def test_bucket_dates(self):
+        # 2026-03-04는 수요일 -> 월요일(3/2)부터 주 단위
+        self.assertEqual(
+            bucket_dates(date(2026, 3, 4), date(2026, 3, 16), "week"),
+            [date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16)],
+        )
+        self.assertEqual(
+            bucket_dates(date(2025, 12, 31), date(2026, 2, 1), "month"),
+            [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1)],
+        )
+
+    def test_max_buckets(self):
+        start = date(2020, 1, 1)
+        self.assertEqual(len(bucket_dates(start, start + timedelta(days=MAX_BUCKETS - 1), "day")), MAX_BUCKETS)
+        with self.assertRaises(ValidationError):
+            bucket_dates(start, start + timedelta(days=MAX_BUCKETS), "day")
+
+        response = self.client.get(
+            "/api/v1/expenses/timeseries/",
+            {"interval": "day", "start_date": "2020-01-01", "end_date": "2026-01-01"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("TOO_MANY_BUCKETS", response.content.decode())
+
+    def test_weekly_series_by_category(self):
+        taxi, mart = self.category("택시"), self.category("마트")
+        self.create_expense(1000, taxi, date(2026, 3, 2))
+        self.create_expense(500, mart, date(2026, 3, 8))
+        self.create_expense(200, taxi, date(2026, 3, 16))
+
+        data = self.series(interval="week", start_date="2026-03-02", end_date="2026-03-22", split="category")
+        self.assertEqual(
+            data["series"],
+            [
+                {"date": "2026-03-02", "amount": 1500, "count": 2},
+                {"date": "2026-03-09", "amount": 0, "count": 0},
+                {"date": "2026-03-16", "amount": 200, "count": 1},
+            ],
+        )
+        by_root = {category["category_id"]: category["series"] for category in data["categories"]}
+        self.assertEqual([bucket["amount"] for bucket in by_root[taxi.root_category_id]], [1000, 0, 200])
+        self.assertEqual([bucket["amount"] for bucket in by_root[mart.root_category_id]], [500, 0, 0])
+        self.assertEqual([bucket["amount"] for bucket in by_root[None]], [0, 0, 0])
+
+
+# 조회 API는 replica에서 읽고, 데이터를 바꾼 사용자는 REPLICA_STICKY_SECONDS 동안 primary에서 읽는다
+# (TestCase는 트랜잭션 안이라 실제 조회는 항상 primary이므로 조회 시점의 replica 사용 여부를 기록해 확인)
+@mock.patch("geumjjoki.db_router.replica_configured", return_value=True)
+class ReplicaRouterTests(ExpenseTestCase):
+    def list_uses_replica(self, **params):
+        used = []
+
+        def spy(*args, **kwargs):
+            used.append(db_router._use_replica.get())
+            return filter_expenses(*args, **kwargs)
+
+        with mock.patch("expenses.views.filter_expenses", side_effect=spy):
+            response = self.client.get("/api/v1/expenses/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return used[0]
+
+    def test_router(self, _):
+        router = db_router.ReplicaRouter()
+        with db_router.read_from_replica():
+            # 트랜잭션 안의 조회와 캐시 테이블은 primary
+            self.assertTrue(transaction.get_connection(DEFAULT_DB_ALIAS).in_atomic_block)
+            self.assertEqual(router.db_for_read(Expense), DEFAULT_DB_ALIAS)
+            with mock.patch.object(transaction.get_connection(DEFAULT_DB_ALIAS), "in_atomic_block", False):
+                self.assertEqual(router.db_for_read(Expense), db_router.REPLICA_ALIAS)
+                cache_model = BaseDatabaseCache("geumjjoki_cache", {}).cache_model_class
+                self.assertEqual(router.db_for_read(cache_model), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Expense), DEFAULT_DB_ALIAS)
+
+    def test_write_pins_user_to_primary(self, _):
+        self.assertTrue(self.list_uses_replica(page_size=5))
+
+        self.create_expense(1000, self.category("택시"), date(2026, 3, 2))
+        self.assertTrue(db_router.is_pinned_to_primary(self.user.pk))
+        self.assertFalse(self.list_uses_replica(page_size=10))
+
+        # 고정 시간이 지나면 다시 replica
+        caches["default"].delete(db_router.STICKY_KEY.format(user_id=self.user.pk))
+        self.assertTrue(self.list_uses_replica(page_size=20))
+
+    def test_other_users_stay_on_replica(self, _):
+        other = User.objects.create(username="other", email="other@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(user=other, category=self.category("택시"), amount=100, date=date(2026, 3, 2))
+        self.assertTrue(db_router.is_pinned_to_primary(other.pk))
+        self.assertTrue(self.list_uses_replica())
+
+
+# Aho-Corasick 오토마톤은 겹치는 키워드를 모두 찾고, 분류기는 동점이면 분류하지 않는다
+class ExpenseCategorizerTests(ExpenseTestCase):
+    DATA = {
+        "교통": {"택시": ["카카오택시 호출"], "대중교통": ["지하철 교통카드 충전"]},
+        "식품": {"편의점": ["GS25 결제"], "마트": ["이마트 결제"]},
+    }
+
+    def test_overlapping_matches(self):
+        keywords = ["he", "she", "his", "hers", "스타", "스타벅스", "벅스"]
+        automaton = KeywordAutomaton(keywords)
+        for text in ("ushers", "hishers", "스타벅스스타", ""):
+            with self.subTest(text=text):
+                expected = sorted(
+                    index
+                    for index, keyword in enumerate(keywords)
+                    for start in range(len(text))
+                    if text.startswith(keyword, start)
+                )
+                self.assertEqual(sorted(automaton.iter_matches(text)), expected)
+
+    def test_shared_words_and_ties(self):
+        categorizer = ExpenseCategorizer(get_category_tree(), self.DATA)
+        taxi, subway = self.category("택시"), self.category("대중교통")
+        self.assertEqual(categorizer.categorize("카카오택시 호출"), taxi.pk)
+        self.assertEqual(categorizer.categorize("지하철 교통카드 충전 5만원"), subway.pk)
+        # "결제"는 두 카테고리에 나와 가중치가 나뉘고, 가맹점명이 분류를 정한다
+        self.assertEqual(categorizer.categorize("GS25 결제"), self.category("편의점").pk)
+        self.assertIsNone(categorizer.categorize("카드 결제"))
+        # 점수가 같은 카테고리가 둘 이상이면 분류하지 않는다
+        self.assertIsNone(categorizer.categorize("호출 충전"))
+        self.assertIsNone(categorizer.categorize("알 수 없음"))
+        self.assertIsNone(categorizer.categorize(""))
+
+    def test_create_without_category_uses_categorizer(self):
+        self.assertIsNotNone(get_categorizer().categorize("카카오택시"))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/expenses/create/",
+                {"date": "2026-03-02", "amount": 1000, "description": "카카오택시"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        expense = Expense.objects.get(pk=response.json()["data"]["expense_id"])
+        self.assertEqual(expense.category_id, get_categorizer().categorize("카카오택시"))
+
+
+# 밤 배치가 저장한 월말 예측에 이후 지출을 예측 비율(rate)로 더해 반영
+class SpendingForecastDeltaTests(ExpenseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = date.today()
+        self.month = self.today.replace(day=1)
+        self.taxi, self.mart = self.category("택시"), self.category("마트")
+        self.create_expense(10000, self.taxi, self.today)
+        forecast_users([self.user.pk], self.today)
+
+    def forecasts(self):
+        return {
+            root_key: (spent, projected, rate)
+            for root_key, spent, projected, rate in SpendingForecast.objects.filter(
+                user=self.user, month=self.month
+            ).values_list("root_key", "spent_amount", "projected_amount", "rate")
+        }
+
+    def test_batch_without_history_uses_flat_rate(self):
+        spent, projected, rate = self.forecasts()[self.taxi.root_category_id]
+        self.assertAlmostEqual(rate, flat_rate(self.today))
+        self.assertEqual((spent, projected), (10000, round(10000 * rate)))
+
+    def test_expense_changes_apply_rate(self):
+        _, before, rate = self.forecasts()[self.taxi.root_category_id]
+        self.create_expense(3000, self.taxi, self.today)
+        self.assertEqual(self.forecasts()[self.taxi.root_category_id], (13000, before + round(3000 * rate), rate))
+
+        Expense.objects.filter(user=self.user, amount=3000).bulk_delete()
+        self.assertEqual(self.forecasts()[self.taxi.root_category_id], (10000, before, rate))
+
+    def test_new_category_and_past_month(self):
+        self.create_expense(2000, self.mart, self.today)
+        rate = flat_rate(self.today)
+        self.assertEqual(self.forecasts()[self.mart.root_category_id], (2000, round(2000 * rate), rate))
+
+        # 지난 달 지출은 이번 달 예측에 영향이 없다
+        before = self.forecasts()
+        self.create_expense(4000, self.taxi, self.month - timedelta(days=1))
+        self.assertEqual(self.forecasts(), before)
+
+    # 최상위 카테고리를 삭제하면 예측 행은 미분류 예측에 합쳐진다
+    def test_root_category_delete_folds_forecast(self):
+        before = self.forecasts()[self.taxi.root_category_id]
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(pk=self.taxi.root_category_id).delete()
+        self.assertEqual(self.forecasts(), {0: before})
+
+    def test_rebuild_matches_deltas(self):
+        self.create_expense(3000, self.taxi, self.today)
+        spent, _, _ = self.forecasts()[self.taxi.root_category_id]
+        forecast_users([self.user.pk], self.today)
+        self.assertEqual(self.forecasts()[self.taxi.root_category_id][0], spent)
+
+
+# KLL 스케치 병합과 지출이 없는 사용자를 포함한 백분위
+class KLLSketchTests(SimpleTestCase):
+    def sketch(self, values, k=200):
+        sketch = KLLSketch(k)
+        for value in values:
+            sketch.update(value)
+        return sketch
+
+    def test_percentile_counts_zero_spend_users(self):
+        # 5명 중 2명은 지출 없음
+        distribution = CohortDistribution(self.sketch([100, 200, 300]), population=5)
+        self.assertEqual(distribution.percentile(0), 0)
+        self.assertEqual(distribution.percentile(100), 40.0)
+        self.assertEqual(distribution.percentile(250), 80.0)
+        self.assertEqual(distribution.percentile(1000), 100.0)
+        self.assertIsNone(CohortDistribution(KLLSketch(), population=0).percentile(100))
+        self.assertEqual(CohortDistribution(KLLSketch(), population=3).percentile(100), 100.0)
+
+    def test_merge_without_compression_is_exact(self):
+        merged = self.sketch([1, 3, 5]).merge(self.sketch([2, 4]))
+        self.assertEqual(merged.count, 5)
+        self.assertEqual(CohortDistribution(merged, 5).values, [1, 2, 3, 4, 5])
+
+    def test_merged_shards_keep_rank_error_small(self):
+        random.seed(0)
+        values = list(range(1, 10001))
+        random.shuffle(values)
+        merged = self.sketch(values[:3000], k=50)
+        for start in (3000, 7000):
+            merged.merge(self.sketch(values[start:start + 4000], k=50))
+        self.assertEqual(merged.count, 10000)
+        self.assertLess(merged.size, 200)
+
+        restored = KLLSketch.from_bytes(merged.to_bytes(), merged.count, k=50)
+        self.assertEqual(restored.levels, merged.levels)
+        distribution = CohortDistribution(restored, population=20000)
+        for amount in (2500, 5000, 7500):
+            # 10000명은 지출 없음 -> 50% + 지출 사용자 중 순위의 절반
+            expected = 50 + (amount - 1) / 10000 * 50
+            self.assertAlmostEqual(distribution.percentile(amount), expected, delta=3)
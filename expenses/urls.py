@@ -7,6 +7,17 @@ urlpatterns = [
     path("", views.ExpenseListView.as_view(), name="index"),
     path("<int:expense_id>/", views.ExpenseDetailView.as_view(), name='detail'),
     path("summary/", views.ExpenseSummaryView.as_view(), name="summary"),
+    path("timeseries/", views.ExpenseTimeSeriesView.as_view(), name="timeseries"),
+    path("analysis/", views.ExpenseAnalysisView.as_view(), name="analysis"),
+    path("forecast/", views.ExpenseForecastView.as_view(), name="forecast"),
+    path("percentiles/", views.ExpenseCohortPercentileView.as_view(), name="percentiles"),
+    path("budgets/", views.CategoryBudgetView.as_view(), name="budgets"),
+    path("budgets/<int:category_id>/", views.CategoryBudgetDetailView.as_view(), name="budget_detail"),
+    path("alerts/", views.SpendingAlertListView.as_view(), name="alerts"),
     path("categories/roots/", views.RootCategoryListView.as_view(), name="root_categories"),
+    path("categories/tree/", views.CategoryTreeView.as_view(), name="category_tree"),
     path("create/", views.ExpenseCreateView.as_view(), name='create'),
+    path("bulk/", views.ExpenseBulkView.as_view(), name='bulk'),
+    path("import/", views.ExpenseImportView.as_view(), name='import'),
+    path("export/", views.ExpenseExportView.as_view(), name='export'),
 ]
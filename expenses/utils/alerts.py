@@ -0,0 +1,179 @@
+import uuid
+from collections import namedtuple
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+
+from expenses.models import CategoryBudget, ExpenseMonthlyRollup, SpendingAlert
+
+# 알림을 쌓는 한도 대비 비율 (%)
+ALERT_THRESHOLDS = (80, 100)
+BUDGET_CACHE_KEY = "expenses:budgets:{user_id}:{version}"
+BUDGET_VERSION_KEY = "expenses:budget_version:{user_id}"
+BUDGET_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 누적금액과 한도 (예산과 나의챌린지 목표지출이 같은 검사를 쓴다)
+# scope는 같은 대상의 알림을 한 번만 쌓기 위한 키
+LimitCheck = namedtuple(
+    "LimitCheck",
+    ["user_id", "kind", "scope", "root_category_id", "user_challenge_id", "total", "delta", "limit"],
+)
+
+
+# 증가 전/후 누적금액 사이에서 새로 넘은 비율 (합계 조회 없이 상수 시간)
+def crossed_thresholds(before, after, limit):
+    if limit <= 0 or after <= before:
+        return []
+    return [
+        threshold for threshold in ALERT_THRESHOLDS
+        if before * 100 < limit * threshold <= after * 100
+    ]
+
+
+# 새로 넘은 비율마다 알림을 쌓는다 (지출 저장과 같은 트랜잭션, 이미 쌓인 알림은 무시)
+def queue_alerts(checks):
+    month = date.today().replace(day=1)
+    alerts = [
+        SpendingAlert(
+            user_id=check.user_id,
+            kind=check.kind,
+            root_category_id=check.root_category_id,
+            user_challenge_id=check.user_challenge_id,
+            month=month,
+            threshold=threshold,
+            amount=check.total,
+            limit_amount=check.limit,
+            dedupe_key=f"{check.kind}:{check.scope}:{check.limit}:{threshold}",
+        )
+        for check in checks
+        for threshold in crossed_thresholds(check.total - check.delta, check.total, check.limit)
+    ]
+    if alerts:
+        SpendingAlert.objects.bulk_create(alerts, ignore_conflicts=True)
+    return len(alerts)
+
+
+def budget_scope(user_id, month, root_category_id):
+    return f"{user_id}:{month:%Y-%m}:{root_category_id}"
+
+
+# 사용자별 예산 캐시 버전 (response_cache의 사용자 데이터 버전과 같은 방식)
+def get_user_budget_versions(user_ids):
+    keys = {user_id: BUDGET_VERSION_KEY.format(user_id=user_id) for user_id in user_ids}
+    versions = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return {user_id: versions[key] for user_id, key in keys.items()}
+
+
+# 사용자별 {최상위 카테고리: 월 예산} (버전별 캐시, 예산 변경 시 버전을 바꾼다)
+def get_user_budgets(user_ids):
+    keys = {
+        user_id: BUDGET_CACHE_KEY.format(user_id=user_id, version=version)
+        for user_id, version in get_user_budget_versions(user_ids).items()
+    }
+    cached = cache.get_many(keys.values())
+    budgets = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+
+    missing = [user_id for user_id in keys if user_id not in budgets]
+    if missing:
+        loaded = {user_id: {} for user_id in missing}
+        rows = CategoryBudget.objects.filter(user_id__in=missing).values_list(
+            "user_id", "root_category_id", "amount"
+        )
+        for user_id, root_category_id, amount in rows:
+            loaded[user_id][root_category_id] = amount
+        cache.set_many(
+            {keys[user_id]: user_budgets for user_id, user_budgets in loaded.items()},
+            BUDGET_CACHE_TIMEOUT,
+        )
+        budgets.update(loaded)
+    return budgets
+
+
+# 버전을 바꾸면 이전 버전으로 저장된 예산은 더 이상 조회되지 않고 만료된다
+# (커밋 전에 이전 예산을 읽어 이전 버전 키에 저장한 요청이 있어도 새 버전에는 섞이지 않는다)
+def invalidate_user_budgets(user_id):
+    transaction.on_commit(
+        lambda: cache.set(BUDGET_VERSION_KEY.format(user_id=user_id), uuid.uuid4().hex, None)
+    )
+
+
+# 사용자 예산과 이번 달 누적금액 (월별 집계에서 읽는다)
+def budget_status(user_id):
+    month = date.today().replace(day=1)
+    budgets = CategoryBudget.objects.filter(user_id=user_id).order_by("root_category_id").values_list(
+        "root_category_id", "amount"
+    )
+    spent = dict(
+        ExpenseMonthlyRollup.objects.filter(user_id=user_id, month=month).values_list(
+            "root_category_id", "amount"
+        )
+    )
+    return [
+        (root_category_id, amount, spent.get(root_category_id, 0))
+        for root_category_id, amount in budgets
+    ]
+
+
+# 예산을 정하거나 바꾼 직후 이번 달 누적금액으로 확인 (이미 넘은 비율도 알림)
+def check_budget(user_id, root_category_id, limit):
+    month = date.today().replace(day=1)
+    spent = (
+        ExpenseMonthlyRollup.objects.filter(
+            user_id=user_id, month=month, root_category_id=root_category_id
+        ).values_list("amount", flat=True).first()
+        or 0
+    )
+    return queue_alerts([
+        LimitCheck(
+            user_id=user_id,
+            kind="budget",
+            scope=budget_scope(user_id, month, root_category_id),
+            root_category_id=root_category_id,
+            user_challenge_id=None,
+            total=spent,
+            delta=spent,
+            limit=limit,
+        )
+    ])
+
+
+# 이번 달 지출이 늘어난 키 중 예산이 있는 키만 갱신된 월별 집계를 읽어 80%/100% 도달 확인
+# (예산은 캐시에서 읽고, 예산이 없으면 조회하지 않는다)
+def check_budget_deltas(deltas):
+    this_month = date.today().replace(day=1)
+    increases = {
+        key: amount for key, (amount, _) in deltas.items()
+        if amount > 0 and key[1] == this_month and key[2] is not None
+    }
+    if not increases:
+        return
+    budgets = get_user_budgets({key[0] for key in increases})
+    keys = [key for key in increases if key[2] in budgets.get(key[0], {})]
+    if not keys:
+        return
+
+    rows = ExpenseMonthlyRollup.objects.filter(
+        user_id__in={key[0] for key in keys},
+        month=this_month,
+        root_category_id__in={key[2] for key in keys},
+    ).values_list("user_id", "root_category_id", "amount")
+    queue_alerts([
+        LimitCheck(
+            user_id=user_id,
+            kind="budget",
+            scope=budget_scope(user_id, this_month, root_category_id),
+            root_category_id=root_category_id,
+            user_challenge_id=None,
+            total=amount,
+            delta=increases[(user_id, this_month, root_category_id)],
+            limit=budgets[user_id][root_category_id],
+        )
+        for user_id, root_category_id, amount in rows
+        if (user_id, this_month, root_category_id) in increases
+        and root_category_id in budgets[user_id]
+    ])
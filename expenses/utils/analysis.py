@@ -0,0 +1,197 @@
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Sum
+
+from expenses.models import Expense, ExpenseAnalysis, ExpenseMonthlyRollup
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.date import month_range
+from expenses.utils.summarize import UNCLASSIFIED
+
+TOP_MERCHANT_COUNT = 5
+SPIKE_COUNT = 3
+# 급증일 판단 기준: 분석월 직전 90일의 일별 지출 평균/표준편차
+SPIKE_LOOKBACK_DAYS = 90
+SPIKE_Z_SCORE = 3.0
+SPIKE_MIN_RATIO = 2.0
+
+
+def previous_month(month):
+    return (month - timedelta(days=1)).replace(day=1)
+
+
+def _rate(current, previous):
+    return round((current - previous) / previous * 100, 1) if previous else None
+
+
+# 최상위 카테고리별 전월 대비 증감 (월별 집계에서 두 달치를 한 번에 읽는다)
+def category_changes(user_ids, month):
+    prev = previous_month(month)
+    root_names = {root.category_id: root.name for root in get_category_tree().roots}
+    rows = (
+        ExpenseMonthlyRollup.objects.filter(user_id__in=user_ids, month__in=[prev, month])
+        .values_list("user_id", "root_category_id", "month")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    keys = sorted({(user_id, root_id) for user_id, root_id, _, _ in rows}, key=lambda k: (k[0], k[1] or 0))
+    if not keys:
+        return {}
+    index = {key: i for i, key in enumerate(keys)}
+    amounts = np.zeros((len(keys), 2), dtype=np.int64)
+    for user_id, root_id, row_month, total in rows:
+        amounts[index[(user_id, root_id)], int(row_month == month)] += total or 0
+    previous, current = amounts[:, 0], amounts[:, 1]
+    change = current - previous
+
+    changes = defaultdict(list)
+    for (user_id, root_id), prev_amount, cur_amount, diff in zip(keys, previous, current, change):
+        changes[user_id].append({
+            "category_id": root_id,
+            "name": root_names.get(root_id, UNCLASSIFIED),
+            "current": int(cur_amount),
+            "previous": int(prev_amount),
+            "change": int(diff),
+            "rate": _rate(int(cur_amount), int(prev_amount)),
+        })
+    return changes
+
+
+# 분석월에 자주 쓴 지출처 (지출내용 기준 건수, 금액 순)
+def top_merchants(user_ids, month):
+    start, end = month_range(month.year, month.month)
+    rows = (
+        Expense.objects.filter(user_id__in=user_ids, date__range=[start, end])
+        .exclude(description="")
+        .values_list("user_id", "description")
+        .annotate(count=Count("expense_id"), total=Sum("amount"))
+        .order_by("user_id", "-count", "-total")
+    )
+    merchants = defaultdict(list)
+    for user_id, description, count, total in rows:
+        if len(merchants[user_id]) < TOP_MERCHANT_COUNT:
+            merchants[user_id].append(
+                {"description": description, "count": count, "amount": total or 0}
+            )
+    return merchants
+
+
+# 평소보다 지출이 크게 많았던 날
+# 사용자 x 일자 행렬로 펼쳐 직전 기간의 평균/표준편차를 사용자별로 한 번에 계산한다
+def spending_spikes(user_ids, month):
+    start, end = month_range(month.year, month.month)
+    window_start = start - timedelta(days=SPIKE_LOOKBACK_DAYS)
+    rows = list(
+        Expense.objects.filter(user_id__in=user_ids, date__range=[window_start, end])
+        .values_list("user_id", "date")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    if not rows:
+        return {}
+    users = sorted({user_id for user_id, _, _ in rows})
+    user_index = {user_id: i for i, user_id in enumerate(users)}
+    daily = np.zeros((len(users), (end - window_start).days + 1))
+    np.add.at(
+        daily,
+        (
+            np.array([user_index[user_id] for user_id, _, _ in rows]),
+            np.array([(day - window_start).days for _, day, _ in rows]),
+        ),
+        np.array([float(total or 0) for _, _, total in rows]),
+    )
+
+    baseline = daily[:, :SPIKE_LOOKBACK_DAYS]
+    target = daily[:, SPIKE_LOOKBACK_DAYS:]
+    mean = baseline.mean(axis=1, keepdims=True)
+    std = baseline.std(axis=1, keepdims=True)
+    is_spike = (
+        (mean > 0)
+        & (target > mean + SPIKE_Z_SCORE * std)
+        & (target >= mean * SPIKE_MIN_RATIO)
+    )
+
+    spikes = {}
+    for row, col in zip(*np.nonzero(is_spike)):
+        spikes.setdefault(users[row], []).append({
+            "date": (start + timedelta(days=int(col))).isoformat(),
+            "amount": int(target[row, col]),
+            "average": int(round(mean[row, 0])),
+        })
+    return {
+        user_id: sorted(items, key=lambda item: -item["amount"])[:SPIKE_COUNT]
+        for user_id, items in spikes.items()
+    }
+
+
+def build_content(month, data):
+    total = data["total"]
+    lines = [f"{month.month}월 총 지출은 {total['current']:,}원입니다."]
+    if total["previous"]:
+        direction = "증가" if total["change"] >= 0 else "감소"
+        lines.append(
+            f"전월 대비 {abs(total['change']):,}원({abs(total['rate'])}%) {direction}했습니다."
+        )
+
+    categories = [item for item in data["categories"] if item["change"]]
+    if categories:
+        increased = max(categories, key=lambda item: item["change"])
+        decreased = min(categories, key=lambda item: item["change"])
+        if increased["change"] > 0:
+            lines.append(f"가장 많이 늘어난 카테고리는 {increased['name']}(+{increased['change']:,}원)입니다.")
+        if decreased["change"] < 0:
+            lines.append(f"가장 많이 줄어든 카테고리는 {decreased['name']}({decreased['change']:,}원)입니다.")
+
+    if data["top_merchants"]:
+        merchants = ", ".join(
+            f"{item['description']}({item['count']}회, {item['amount']:,}원)"
+            for item in data["top_merchants"]
+        )
+        lines.append(f"자주 쓴 지출처: {merchants}")
+
+    if data["spikes"]:
+        spikes = ", ".join(f"{item['date']}({item['amount']:,}원)" for item in data["spikes"])
+        lines.append(f"평소보다 지출이 많았던 날: {spikes}")
+    return "\n".join(lines)
+
+
+# 사용자 묶음의 분석월 리포트를 만들어 (사용자, 월) 기준으로 upsert하고 저장한 개수를 반환
+# (generate_expense_analyses)
+def analyze_users(user_ids, month):
+    changes = category_changes(user_ids, month)
+    merchants = top_merchants(user_ids, month)
+    spikes = spending_spikes(user_ids, month)
+
+    analyses = []
+    for user_id in sorted(changes):
+        categories = sorted(changes[user_id], key=lambda item: -item["current"])
+        current = sum(item["current"] for item in categories)
+        previous = sum(item["previous"] for item in categories)
+        data = {
+            "total": {
+                "current": current,
+                "previous": previous,
+                "change": current - previous,
+                "rate": _rate(current, previous),
+            },
+            "categories": categories,
+            "top_merchants": merchants.get(user_id, []),
+            "spikes": spikes.get(user_id, []),
+        }
+        analyses.append(ExpenseAnalysis(
+            user_id=user_id,
+            month=month,
+            title=f"{month.year}년 {month.month}월 지출 분석",
+            content=build_content(month, data),
+            data=data,
+        ))
+
+    ExpenseAnalysis.objects.bulk_create(
+        analyses,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user", "month"],
+        update_fields=["title", "content", "data", "updated_at"],
+    )
+    return len(analyses)
@@ -0,0 +1,132 @@
+from functools import cmp_to_key
+
+from django.db import transaction
+
+from expenses.models import ArchivedExpense, Expense, ExpenseSearchToken
+from expenses.utils.date import validate_and_parse_dates
+from expenses.utils.query import filter_expenses
+
+ARCHIVE_COLUMNS = (
+    "expense_id",
+    "user_id",
+    "category_id",
+    "root_category_id",
+    "description",
+    "amount",
+    "date",
+    "user_challenge_id",
+)
+
+
+# 조회 기간이 사용자의 보관 지출내역에 닿는지 (user, date 인덱스로 한 건만 확인)
+def archive_reached(user, start_date=None, end_date=None):
+    archived = ArchivedExpense.objects.filter(user=user)
+    if start_date:
+        archived = archived.filter(date__gte=start_date)
+    if end_date:
+        archived = archived.filter(date__lte=end_date)
+    return archived.exists()
+
+
+# 목록 조회 조건의 기간이 보관 범위에 닿으면 보관 지출내역을 합친 결과를, 아니면 그대로 반환
+def with_archive(user, query, expenses):
+    start_date, end_date = validate_and_parse_dates(query.get("start_date"), query.get("end_date"))
+    if not archive_reached(user, start_date, end_date):
+        return expenses
+    return ArchiveUnion([expenses, filter_expenses(user, query, model=ArchivedExpense)])
+
+
+# 지출내역과 보관 지출내역 쿼리셋을 하나처럼 다루는 읽기 전용 묶음
+# 페이지네이션/내보내기가 쓰는 filter, order_by, 슬라이싱, values_list, count, aggregate만 지원하며
+# 슬라이싱은 각 테이블에서 필요한 만큼만 정렬해 읽은 뒤 병합한다
+class ArchiveUnion:
+    def __init__(self, parts, ordering=(), fields=None):
+        self.parts = parts
+        self.ordering = tuple(ordering)
+        self.fields = fields
+
+    @property
+    def ordered(self):
+        return bool(self.ordering)
+
+    def _clone(self, parts=None, ordering=None, fields=None):
+        return ArchiveUnion(
+            parts if parts is not None else self.parts,
+            self.ordering if ordering is None else ordering,
+            self.fields if fields is None else fields,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._clone(parts=[part.filter(*args, **kwargs) for part in self.parts])
+
+    # 두 테이블의 식별자가 겹치지 않으므로 expense_id를 마지막 정렬 기준으로 더해 순서를 고정
+    def order_by(self, *ordering):
+        if not any(field.lstrip("-") == "expense_id" for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering = ordering + ("-expense_id" if descending else "expense_id",)
+        return self._clone(parts=[part.order_by(*ordering) for part in self.parts], ordering=ordering)
+
+    def values_list(self, *fields):
+        return self._clone(parts=[part.values_list(*fields) for part in self.parts], fields=fields)
+
+    def count(self):
+        return sum(part.count() for part in self.parts)
+
+    # Count/Sum 같은 가산 집계만 합산 가능
+    def aggregate(self, **aggregates):
+        results = [part.aggregate(**aggregates) for part in self.parts]
+        return {
+            key: sum(result[key] or 0 for result in results) if any(result[key] is not None for result in results) else None
+            for key in aggregates
+        }
+
+    def _value(self, row, field):
+        if self.fields is not None:
+            return row[self.fields.index(field)]
+        return getattr(row, field)
+
+    def _compare(self, left, right):
+        for field in self.ordering:
+            name = field.lstrip("-")
+            a, b = self._value(left, name), self._value(right, name)
+            if a == b:
+                continue
+            result = -1 if a < b else 1
+            return -result if field.startswith("-") else result
+        return 0
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return list(self[item:item + 1])[0]
+        start = item.start or 0
+        stop = item.stop
+        if stop is None:
+            rows = [row for part in self.parts for row in part]
+        else:
+            rows = [row for part in self.parts for row in part[:stop]]
+        rows.sort(key=cmp_to_key(self._compare))
+        return rows[start:stop]
+
+    def __iter__(self):
+        return iter(self[0:None])
+
+
+# 보관 기준일 이전 지출내역을 chunk 단위로 보관 테이블로 옮긴다
+# 월별 집계와 누적지출금액은 보관 지출내역을 포함한 값이므로 증감을 반영하지 않는다
+def archive_expense_chunk(cutoff, chunk_size):
+    with transaction.atomic():
+        pks = list(
+            Expense.objects.filter(date__lt=cutoff)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return 0
+        expenses = Expense.objects.filter(pk__in=pks)
+        ArchivedExpense.objects.bulk_create(
+            [ArchivedExpense(**row) for row in expenses.values(*ARCHIVE_COLUMNS)],
+            batch_size=chunk_size,
+        )
+        ExpenseSearchToken.objects.filter(expense_id__in=pks).delete()
+        expenses.raw_delete()
+    return len(pks)
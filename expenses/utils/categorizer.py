@@ -0,0 +1,118 @@
+import threading
+from collections import Counter, deque
+
+from expenses.utils.category_descriptions import categories_data
+from expenses.utils.category_tree import get_category_tree
+
+# 이보다 짧은 단어는 패턴으로 쓰지 않는다 ("한", "갑" 등)
+MIN_KEYWORD_LENGTH = 2
+
+
+# 여러 키워드를 한 번에 찾는 Aho-Corasick 오토마톤
+# 설명 길이에 비례하는 시간으로 포함된 모든 키워드를 찾는다
+class KeywordAutomaton:
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (index,)
+
+        # 너비 우선으로 실패 링크를 만들고, 실패 링크의 출력을 합쳐 둔다
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    # 텍스트에 포함된 키워드 인덱스 (겹치는 키워드도 모두)
+    def iter_matches(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield from output[state]
+
+
+# category_descriptions의 대표 지출 설명으로 만든 자동 분류기
+# 설명 전체와 설명의 각 단어를 키워드로 쓰고, 여러 카테고리에 나오는 단어("편의점", "결제")는
+# 카테고리 수만큼 가중치를 나눠 가맹점명처럼 한 카테고리를 가리키는 단어가 우선하게 한다
+class ExpenseCategorizer:
+    def __init__(self, tree, data=categories_data):
+        keyword_categories = {}
+        for root_name, children in data.items():
+            for child_name, descriptions in children.items():
+                category_id = self.find_category_id(tree, root_name, child_name)
+                if category_id is None:
+                    continue
+                for description in descriptions:
+                    for keyword in {description, *description.split()}:
+                        keyword = keyword.lower()
+                        if len(keyword) >= MIN_KEYWORD_LENGTH:
+                            keyword_categories.setdefault(keyword, set()).add(category_id)
+
+        self.automaton = KeywordAutomaton(keyword_categories)
+        self.weights = [
+            (tuple(category_ids), len(keyword) / len(category_ids))
+            for keyword, category_ids in keyword_categories.items()
+        ]
+
+    @staticmethod
+    def find_category_id(tree, root_name, child_name):
+        for category_id in tree.ids_by_name.get(child_name, ()):
+            if tree.parent_name(category_id) == root_name:
+                return category_id
+        return None
+
+    # 점수가 가장 높은 카테고리 식별자 (일치하는 키워드가 없거나 동점이면 None)
+    def categorize(self, description):
+        if not description:
+            return None
+        scores = Counter()
+        for index in self.automaton.iter_matches(description.lower()):
+            category_ids, weight = self.weights[index]
+            for category_id in category_ids:
+                scores[category_id] += weight
+        best = scores.most_common(2)
+        if not best or (len(best) == 2 and best[0][1] == best[1][1]):
+            return None
+        return best[0][0]
+
+
+_lock = threading.Lock()
+_categorizer = None
+_categorizer_version = None
+
+
+# 워커당 한 번 만든 분류기 (카테고리 트리 버전이 바뀌면 다시 만든다)
+def get_categorizer():
+    global _categorizer, _categorizer_version
+    tree = get_category_tree()
+    if _categorizer is not None and _categorizer_version == tree.version:
+        return _categorizer
+
+    with _lock:
+        if _categorizer is None or _categorizer_version != tree.version:
+            _categorizer = ExpenseCategorizer(tree)
+            _categorizer_version = tree.version
+    return _categorizer
@@ -0,0 +1,147 @@
+import json
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# 모든 워커가 공유하는 카테고리 버전 키 (카테고리 변경 시 갱신)
+VERSION_KEY = "expenses:category_tree_version"
+
+
+@dataclass
+class CategoryNode:
+    category_id: int
+    name: str
+    parent_id: int = None
+    root_id: int = None
+    children: list = field(default_factory=list)
+    # 자기 자신을 포함한 상위 카테고리 식별자 목록
+    ancestor_ids: list = field(default_factory=list)
+
+
+# 메모리에 올려둔 카테고리 트리 (워커당 한 번 로드)
+class CategoryTree:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.nodes = {}
+        self.ids_by_name = defaultdict(list)
+        for category_id, parent_id, root_id, name in rows:
+            self.nodes[category_id] = CategoryNode(
+                category_id=category_id,
+                name=name,
+                parent_id=parent_id,
+                root_id=root_id or category_id,
+            )
+            self.ids_by_name[name].append(category_id)
+
+        for node in self.nodes.values():
+            parent = self.nodes.get(node.parent_id)
+            if parent is not None:
+                parent.children.append(node)
+
+        # 상위 카테고리는 부모 관계를 따라 메모리에서 구한다 (루트부터 자기 자신까지)
+        for node in self.nodes.values():
+            ancestor_id, visited = node.category_id, set()
+            while ancestor_id in self.nodes and ancestor_id not in visited:
+                visited.add(ancestor_id)
+                node.ancestor_ids.insert(0, ancestor_id)
+                ancestor_id = self.nodes[ancestor_id].parent_id
+
+        self.roots = [node for node in self.nodes.values() if node.parent_id is None]
+
+    def get(self, category_id):
+        return self.nodes.get(category_id)
+
+    def root_id(self, category_id):
+        node = self.nodes.get(category_id)
+        return node.root_id if node else None
+
+    def parent_name(self, category_id):
+        node = self.nodes.get(category_id)
+        parent = self.nodes.get(node.parent_id) if node else None
+        return parent.name if parent else None
+
+    # 이름(부분일치)이 일치하는 카테고리와 그 하위 카테고리 식별자
+    def matching_ids(self, keyword):
+        keyword = keyword.lower()
+        return {
+            node.category_id
+            for node in self.nodes.values()
+            if any(
+                keyword in self.nodes[ancestor_id].name.lower()
+                for ancestor_id in node.ancestor_ids
+                if ancestor_id in self.nodes
+            )
+        }
+
+    # 지출내역에 들어가는 카테고리 정보 (InlineCategorySerializer와 같은 형태)
+    def inline(self, category_id):
+        node = self.nodes.get(category_id)
+        if node is None:
+            return None
+        return {
+            "id": node.category_id,
+            "name": node.name,
+            "parent": self.parent_name(category_id),
+        }
+
+    # 하위 카테고리를 재귀적으로 포함한 목록 (RecursiveCategorySerializer와 같은 형태)
+    def nested(self, nodes=None):
+        nodes = self.roots if nodes is None else nodes
+        return [
+            {
+                "id": node.category_id,
+                "name": node.name,
+                "children": self.nested(node.children),
+            }
+            for node in nodes
+        ]
+
+    # 전체 트리 응답 본문 (트리 버전마다 한 번만 직렬화해 바이트로 보관)
+    @cached_property
+    def nested_json(self):
+        payload = {"status": "success", "data": self.nested()}
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+_lock = threading.Lock()
+_tree = None
+_tree_version = None
+
+
+def get_category_tree_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_category_tree():
+    global _tree, _tree_version
+    version = get_category_tree_version()
+    if _tree is not None and _tree_version == version:
+        return _tree
+
+    from expenses.models import Category
+
+    with _lock:
+        if _tree is None or _tree_version != version:
+            # 새 버전의 트리는 복제 지연이 없는 primary에서 읽는다
+            rows = Category.objects.using(DEFAULT_DB_ALIAS).order_by("category_id").values_list(
+                "category_id", "parent_category_id", "root_category_id", "name"
+            )
+            _tree = CategoryTree(list(rows), version)
+            _tree_version = version
+    return _tree
+
+
+# 커밋 이후에 버전을 바꿔야 다른 워커가 변경 전 데이터를 새 버전으로 캐시하지 않는다
+def bump_category_tree_version():
+    transaction.on_commit(
+        lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    )
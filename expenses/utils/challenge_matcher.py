@@ -0,0 +1,121 @@
+from collections import defaultdict, namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from challenges.models import UserChallenge
+from expenses.utils.category_tree import get_category_tree
+
+CACHE_KEY = "expenses:active_challenges:{user_id}"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# 챌린지 매칭에 필요한 값만 담은 항목 (기간은 현지 날짜 기준)
+ChallengeEntry = namedtuple(
+    "ChallengeEntry", ["user_challenge_id", "user_id", "root_id", "start", "end"]
+)
+
+
+def build_entries(user_challenges):
+    tree = get_category_tree()
+    rows = user_challenges.order_by("user_challenge_id").values_list(
+        "user_challenge_id", "user_id", "challenge__category_id", "start_date", "end_date"
+    )
+    return [
+        ChallengeEntry(
+            user_challenge_id=user_challenge_id,
+            user_id=user_id,
+            root_id=tree.root_id(category_id),
+            start=timezone.localtime(start_date).date(),
+            end=timezone.localtime(end_date).date(),
+        )
+        for user_challenge_id, user_id, category_id, start_date, end_date in rows
+    ]
+
+
+# 사용자의 도전중 챌린지를 최상위 카테고리별로 묶은 인덱스
+# 챌린지 참여/판정 시 무효화되며, 매칭은 dict 조회와 날짜 비교만 한다
+class ChallengeMatcher:
+    def __init__(self, entries):
+        self.entries = entries
+        self.entries_by_root = defaultdict(list)
+        for entry in entries:
+            self.entries_by_root[entry.root_id].append(entry)
+
+    @classmethod
+    def for_user(cls, user_id):
+        key = CACHE_KEY.format(user_id=user_id)
+        entries = cache.get(key)
+        if entries is None:
+            entries = build_entries(
+                UserChallenge.objects.filter(user_id=user_id, status="도전중")
+            )
+            cache.set(key, entries, CACHE_TIMEOUT)
+        return cls(entries)
+
+    # 지출일자가 기간 안에 있고 최상위 카테고리가 같은 챌린지
+    # (카테고리 없는 지출은 기간 안의 첫 챌린지에 연결 - 기존 ExpenseCreateView 동작)
+    def match(self, category_id, expense_date):
+        if category_id is None:
+            candidates = self.entries
+        else:
+            candidates = self.entries_by_root.get(get_category_tree().root_id(category_id), ())
+        for entry in candidates:
+            if entry.start <= expense_date <= entry.end:
+                return entry.user_challenge_id
+        return None
+
+
+def invalidate_challenge_matcher(user_id):
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY.format(user_id=user_id)))
+
+
+# 사용자 묶음 단위로 기존 지출내역을 나의챌린지에 연결 (sync_expenses_with_challenges)
+# 사용자의 챌린지와 기간 안 지출을 한 번씩만 읽어 메모리에서 매칭하고,
+# 바뀌는 지출만 연결할 챌린지별로 묶어 일괄 update한다
+# (기간이 겹치면 나중에 참여한 챌린지에 연결 - 기존 명령과 같은 결과)
+def link_expenses_to_challenges(user_ids, dry_run=False):
+    from expenses.models import UPDATE_CHUNK_SIZE, Expense
+
+    result = {"user_challenges": 0, "matched": 0, "linked": 0}
+    entries_by_user = defaultdict(list)
+    for entry in build_entries(UserChallenge.objects.filter(user_id__in=user_ids)):
+        entries_by_user[entry.user_id].append(entry)
+        result["user_challenges"] += 1
+    if not entries_by_user:
+        return result
+
+    entries = [entry for user_entries in entries_by_user.values() for entry in user_entries]
+    rows = (
+        Expense.objects.filter(
+            user_id__in=entries_by_user.keys(),
+            date__gte=min(entry.start for entry in entries),
+            date__lte=max(entry.end for entry in entries),
+        )
+        .order_by()
+        .values_list("expense_id", "user_id", "root_category_id", "date", "user_challenge_id")
+    )
+    pks_by_target = defaultdict(list)
+    for expense_id, user_id, root_id, expense_date, current in rows.iterator(chunk_size=UPDATE_CHUNK_SIZE):
+        target = None
+        for entry in entries_by_user[user_id]:
+            if entry.root_id in (None, root_id) and entry.start <= expense_date <= entry.end:
+                target = entry.user_challenge_id
+        if target is None:
+            continue
+        result["matched"] += 1
+        if target != current:
+            pks_by_target[target].append(expense_id)
+
+    result["linked"] = sum(len(pks) for pks in pks_by_target.values())
+    if dry_run:
+        return result
+
+    # 누적지출금액은 update 훅에서 증감으로 반영된다
+    with transaction.atomic():
+        for user_challenge_id, pks in pks_by_target.items():
+            for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                Expense.objects.filter(pk__in=pks[start:start + UPDATE_CHUNK_SIZE]).update(
+                    user_challenge_id=user_challenge_id
+                )
+    return result
@@ -0,0 +1,267 @@
+import math
+import random
+import threading
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from accounts.models import UserProfile
+from expenses.models import CohortSpendingSketch, ExpenseMonthlyRollup
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.deltas import rollup_root_key
+from expenses.utils.summarize import UNCLASSIFIED
+
+# 평균수입 구간 크기 (100만원 단위, 마지막 구간은 그 이상 전체)
+INCOME_BUCKET_SIZE = 1_000_000
+MAX_INCOME_BUCKET = 10
+# KLL 스케치 크기 (클수록 정확하고 커진다, 200이면 순위 오차 약 1~2%)
+SKETCH_K = 200
+# 모든 워커가 공유하는 스케치 버전 키 (배치 저장 후 갱신)
+VERSION_KEY = "expenses:cohort_sketch_version"
+
+
+def income_bucket(average_income):
+    return min(int(average_income or 0) // INCOME_BUCKET_SIZE, MAX_INCOME_BUCKET)
+
+
+def income_bucket_range(bucket):
+    low = bucket * INCOME_BUCKET_SIZE
+    return low, None if bucket >= MAX_INCOME_BUCKET else low + INCOME_BUCKET_SIZE
+
+
+# 병합 가능한 분위수 스케치 (KLL)
+# 단계 h의 값은 2^h명을 대표하고, 단계가 가득 차면 정렬 후 절반만 다음 단계로 올린다
+class KLLSketch:
+    def __init__(self, k=SKETCH_K, levels=None, count=0):
+        self.k = k
+        self.levels = levels or [[]]
+        # 스케치에 넣은 값의 실제 개수
+        self.count = count
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    @property
+    def size(self):
+        return sum(len(values) for values in self.levels)
+
+    def max_size(self):
+        return sum(self.capacity(level) for level in range(len(self.levels)))
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.count += 1
+        if self.size >= self.max_size():
+            self.compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.count += other.count
+        while self.size >= self.max_size():
+            self.compress()
+        return self
+
+    def compress(self):
+        for level in range(len(self.levels)):
+            values = self.levels[level]
+            if len(values) >= self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                values.sort()
+                # 홀수 개면 마지막 값은 현재 단계에 남긴다
+                keep = [values.pop()] if len(values) % 2 else []
+                offset = random.randint(0, 1)
+                self.levels[level + 1].extend(values[offset::2])
+                self.levels[level] = keep
+                return
+
+    # [단계 수, 단계별 개수..., 값...]을 int64 바이트로 저장
+    def to_bytes(self):
+        header = [len(self.levels), *(len(values) for values in self.levels)]
+        values = [value for level_values in self.levels for value in level_values]
+        return np.array(header + values, dtype=np.int64).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, count=0, k=SKETCH_K):
+        array = np.frombuffer(bytes(data), dtype=np.int64)
+        level_count = int(array[0])
+        sizes = array[1:1 + level_count]
+        levels, start = [], 1 + level_count
+        for size in sizes:
+            levels.append(array[start:start + size].tolist())
+            start += size
+        return cls(k, levels, count)
+
+
+# 조회용으로 펼친 스케치 (정렬한 값과 누적 가중치, 순위 조회는 이진 탐색 한 번)
+class CohortDistribution:
+    def __init__(self, sketch, population):
+        self.population = population
+        self.spenders = sketch.count
+        pairs = sorted(
+            (value, 1 << level)
+            for level, values in enumerate(sketch.levels)
+            for value in values
+        )
+        self.values = [value for value, _ in pairs]
+        self.cumulative = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            self.cumulative.append(total)
+        self.sketch_total = total
+
+    # 지출이 amount보다 적은 사용자 비율 (지출이 없는 사용자 포함)
+    def percentile(self, amount):
+        if not self.population:
+            return None
+        index = bisect_left(self.values, amount)
+        below = self.cumulative[index - 1] if index else 0
+        # 스케치 가중치 합은 실제 지출 사용자 수와 조금 다를 수 있어 비율로 환산
+        ranked = below / self.sketch_total * self.spenders if self.sketch_total else 0
+        zeros = max(self.population - self.spenders, 0) if amount > 0 else 0
+        return round((zeros + ranked) / self.population * 100, 1)
+
+
+# 사용자 묶음의 (평균수입 구간, 최상위 카테고리) 스케치와 구간별 사용자 수
+# (build_cohort_sketches, 샤드 결과는 merge로 합친다)
+def sketch_users(user_ids, month):
+    buckets = {
+        user_id: income_bucket(average_income)
+        for user_id, average_income in UserProfile.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "average_income"
+        )
+    }
+    populations = defaultdict(int)
+    for bucket in buckets.values():
+        populations[bucket] += 1
+
+    sketches = defaultdict(KLLSketch)
+    rows = (
+        ExpenseMonthlyRollup.objects.filter(user_id__in=buckets.keys(), month=month)
+        .values_list("user_id", "root_category_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for user_id, root_id, total in rows:
+        if total and total > 0:
+            sketches[(buckets[user_id], root_id)].update(total)
+    return dict(sketches), dict(populations)
+
+
+def save_cohort_sketches(month, sketches, populations):
+    rows = [
+        CohortSpendingSketch(
+            month=month,
+            income_bucket=bucket,
+            root_category_id=root_id,
+            root_key=rollup_root_key(root_id),
+            population=populations.get(bucket, 0),
+            count=sketch.count,
+            sketch=sketch.to_bytes(),
+        )
+        for (bucket, root_id), sketch in sketches.items()
+    ]
+    with transaction.atomic():
+        CohortSpendingSketch.objects.filter(month=month).delete()
+        CohortSpendingSketch.objects.bulk_create(rows, batch_size=1000)
+        transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
+    return len(rows)
+
+
+# 최상위 카테고리를 삭제하면 그 카테고리의 분포를 지운다 (Category pre_delete)
+# 지출은 미분류로 옮겨지지만 사용자별 합계가 바뀌어 스케치끼리 합칠 수 없으므로
+# 미분류 분포는 다음 build_cohort_sketches 실행 때 다시 만든다
+def drop_root_category_sketches(root_category_id):
+    with transaction.atomic():
+        deleted, _ = CohortSpendingSketch.objects.filter(root_key=root_category_id).delete()
+        if deleted:
+            transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
+
+
+_lock = threading.Lock()
+_distributions = {}
+_distributions_version = None
+
+
+def get_sketch_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+# 월별 (평균수입 구간, 최상위 카테고리) 분포 (워커당 한 번 로드, 배치가 다시 저장하면 새로 로드)
+def get_cohort_distributions(month):
+    global _distributions, _distributions_version
+    version = get_sketch_version()
+    # 다른 스레드가 잠금 안에서 _distributions를 바꿀 수 있어 지역 변수로 잡아 두고 읽는다
+    loaded, loaded_version = _distributions, _distributions_version
+    if loaded_version == version and month in loaded:
+        return loaded[month]
+
+    with _lock:
+        if _distributions_version != version:
+            _distributions = {}
+            _distributions_version = version
+        if month not in _distributions:
+            distributions = {}
+            rows = CohortSpendingSketch.objects.filter(month=month).values_list(
+                "income_bucket", "root_category_id", "population", "count", "sketch"
+            )
+            for bucket, root_id, population, count, data in rows:
+                distributions[(bucket, root_id)] = CohortDistribution(
+                    KLLSketch.from_bytes(data, count), population
+                )
+            _distributions[month] = distributions
+        result = _distributions[month]
+    return result
+
+
+# 같은 평균수입 구간 사용자 중 카테고리별로 지출이 나보다 적은 사용자 비율
+def cohort_percentiles(user, month):
+    average_income = (
+        UserProfile.objects.filter(user=user).values_list("average_income", flat=True).first()
+    )
+    if average_income is None:
+        return None
+    bucket = income_bucket(average_income)
+    distributions = get_cohort_distributions(month)
+    root_ids = [root_id for bucket_id, root_id in distributions if bucket_id == bucket]
+    if not root_ids:
+        return None
+
+    amounts = dict(
+        ExpenseMonthlyRollup.objects.filter(user=user, month=month)
+        .values_list("root_category_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    root_names = {root.category_id: root.name for root in get_category_tree().roots}
+    low, high = income_bucket_range(bucket)
+    categories = []
+    for root_id in sorted(root_ids, key=lambda root_id: root_id or 0):
+        distribution = distributions[(bucket, root_id)]
+        amount = amounts.get(root_id) or 0
+        categories.append({
+            "category_id": root_id,
+            "name": root_names.get(root_id, UNCLASSIFIED),
+            "amount": amount,
+            "percentile": distribution.percentile(amount),
+            "population": distribution.population,
+        })
+    return {
+        "month": month,
+        "income_bucket": {"min": low, "max": high},
+        "categories": categories,
+    }
@@ -1,3 +1,6 @@
+import calendar
+from datetime import date
+
 from django.utils.dateparse import parse_date
 from rest_framework.exceptions import ValidationError
 
@@ -21,3 +24,10 @@ def validate_and_parse_dates(start_date, end_date):
         })
 
     return parsed_start, parsed_end
+
+
+# 해당 월의 첫날과 마지막 날을 반환
+def month_range(year, month):
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    return first, last
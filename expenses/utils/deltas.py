@@ -0,0 +1,216 @@
+from collections import defaultdict, namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils.dateparse import parse_date
+
+from expenses.utils.response_cache import bump_user_data_versions
+
+# 지출 한 건(또는 같은 키로 묶인 여러 건)의 집계용 스냅샷
+ExpenseSnapshot = namedtuple(
+    "ExpenseSnapshot",
+    ["user_id", "date", "root_category_id", "user_challenge_id", "amount", "count"],
+)
+
+# 값이 바뀌면 집계에 영향을 주는 필드
+TRACKED_FIELDS = {
+    "user", "user_id",
+    "date",
+    "amount",
+    "category", "category_id",
+    "root_category", "root_category_id",
+    "user_challenge", "user_challenge_id",
+}
+
+
+def snapshot(expense):
+    expense_date = expense.date
+    if isinstance(expense_date, str):
+        expense_date = parse_date(expense_date)
+    return ExpenseSnapshot(
+        user_id=expense.user_id,
+        date=expense_date,
+        root_category_id=expense.root_category_id,
+        user_challenge_id=expense.user_challenge_id,
+        amount=int(expense.amount),
+        count=1,
+    )
+
+
+# 쿼리셋을 집계 키 단위로 묶은 스냅샷 목록 (행 수가 아닌 키 수만큼 조회)
+def grouped_snapshots(queryset):
+    rows = (
+        queryset.order_by()
+        .values("user_id", "date", "root_category_id", "user_challenge_id")
+        .annotate(total=Sum("amount"), rows=Count("pk"))
+    )
+    return [
+        ExpenseSnapshot(
+            user_id=row["user_id"],
+            date=row["date"],
+            root_category_id=row["root_category_id"],
+            user_challenge_id=row["user_challenge_id"],
+            amount=row["total"] or 0,
+            count=row["rows"],
+        )
+        for row in rows
+    ]
+
+
+# 삭제된(이전) 스냅샷은 빼고 추가된(이후) 스냅샷은 더해서 집계 테이블에 반영하고
+# 예산 알림/월말 예측/나의챌린지 누적지출금액에는 키별 증감을 넘긴다
+# (expenses.models가 이 모듈을 불러오므로 각 모듈은 함수 안에서 불러온다)
+def apply_expense_deltas(removed=(), added=()):
+    from challenges.utils.totals import apply_challenge_deltas
+    from expenses.utils.alerts import check_budget_deltas
+    from expenses.utils.forecast import apply_forecast_deltas
+
+    rollup_deltas = defaultdict(lambda: [0, 0])
+    challenge_deltas = defaultdict(int)
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for snap in snapshots:
+            key = (snap.user_id, snap.date.replace(day=1), snap.root_category_id)
+            rollup_deltas[key][0] += sign * snap.amount
+            rollup_deltas[key][1] += sign * snap.count
+            if snap.user_challenge_id:
+                challenge_deltas[(snap.user_challenge_id, snap.date)] += sign * snap.amount
+
+    changed = {key: delta for key, delta in rollup_deltas.items() if delta[0] or delta[1]}
+    apply_rollup_deltas(changed)
+    check_budget_deltas(changed)
+    apply_forecast_deltas(changed)
+    apply_challenge_deltas(challenge_deltas)
+    # 지출내용만 바뀐 경우도 조회 결과가 달라지므로 증감과 관계없이 버전 갱신
+    bump_user_data_versions({snap.user_id for snaps in (removed, added) for snap in snaps})
+
+
+# 집계/예측 행의 최상위 카테고리 키 (미분류는 0)
+# MySQL/SQLite 유니크 인덱스는 NULL끼리 서로 다른 값으로 보므로 NULL을 키로 쓰지 않는다
+def rollup_root_key(root_category_id):
+    return root_category_id or 0
+
+
+# 키가 여러 개면 없는 집계 행을 한 번에 만들고 나머지만 키별 F() 갱신
+# (일괄 등록처럼 새 월/카테고리가 많은 경우 키마다 update + insert 하지 않도록)
+def apply_rollup_deltas(deltas):
+    from expenses.models import ExpenseMonthlyRollup
+
+    created = set()
+    if len(deltas) > 1:
+        existing = set(
+            ExpenseMonthlyRollup.objects.filter(
+                user_id__in={key[0] for key in deltas},
+                month__in={key[1] for key in deltas},
+            ).values_list("user_id", "month", "root_key")
+        )
+        missing = [
+            key for key in deltas
+            if (key[0], key[1], rollup_root_key(key[2])) not in existing
+        ]
+        if missing:
+            try:
+                with transaction.atomic():
+                    ExpenseMonthlyRollup.objects.bulk_create(
+                        [
+                            ExpenseMonthlyRollup(
+                                user_id=user_id,
+                                month=month,
+                                root_category_id=root_category_id,
+                                root_key=rollup_root_key(root_category_id),
+                                amount=deltas[(user_id, month, root_category_id)][0],
+                                count=deltas[(user_id, month, root_category_id)][1],
+                            )
+                            for user_id, month, root_category_id in missing
+                        ],
+                        batch_size=1000,
+                    )
+                created = set(missing)
+            except IntegrityError:
+                # 동시에 생성된 키가 있으면 키별 갱신으로 처리
+                created = set()
+
+    for key, (amount, count) in deltas.items():
+        if key not in created:
+            apply_rollup_delta(*key, amount, count)
+
+
+def apply_rollup_delta(user_id, month, root_category_id, amount, count):
+    from expenses.models import ExpenseMonthlyRollup
+
+    rollups = ExpenseMonthlyRollup.objects.filter(
+        user_id=user_id, month=month, root_key=rollup_root_key(root_category_id)
+    )
+    if rollups.update(amount=F("amount") + amount, count=F("count") + count):
+        return
+    try:
+        with transaction.atomic():
+            ExpenseMonthlyRollup.objects.create(
+                user_id=user_id,
+                month=month,
+                root_category_id=root_category_id,
+                root_key=rollup_root_key(root_category_id),
+                amount=amount,
+                count=count,
+            )
+    except IntegrityError:
+        # 동시에 같은 키가 생성된 경우 다시 증감으로 반영
+        rollups.update(amount=F("amount") + amount, count=F("count") + count)
+
+
+# 최상위 카테고리를 삭제하면 그 지출내역은 미분류가 되므로(SET_NULL)
+# 삭제 전에 해당 카테고리의 집계 행을 미분류 행에 합친다 (Category pre_delete)
+def fold_root_category(root_category_id):
+    from expenses.models import ExpenseMonthlyRollup
+
+    with transaction.atomic():
+        rollups = ExpenseMonthlyRollup.objects.filter(root_key=root_category_id)
+        for user_id, month, amount, count in rollups.values_list("user_id", "month", "amount", "count"):
+            apply_rollup_delta(user_id, month, None, amount, count)
+        rollups.delete()
+
+
+# 사용자들의 월별 집계를 실제 지출내역과 비교해 보정하고 보정한 키 개수를 반환
+# 같은 트랜잭션에서 읽은 실제값과 집계값의 차이를 증감으로 반영
+# (그 사이 들어온 지출의 증감도 그대로 유지된다)
+def reconcile_monthly_rollups(user_ids):
+    from expenses.models import ArchivedExpense, Expense, ExpenseMonthlyRollup
+
+    with transaction.atomic():
+        # 집계에는 보관 지출내역도 포함된다
+        actual = defaultdict(lambda: [0, 0])
+        for model in (Expense, ArchivedExpense):
+            rows = (
+                model.objects.filter(user_id__in=user_ids)
+                .annotate(month=TruncMonth("date"))
+                .values("user_id", "month", "root_category_id")
+                .annotate(amount=Sum("amount"), count=Count("expense_id"))
+                .order_by()
+            )
+            for row in rows:
+                key = (row["user_id"], row["month"], rollup_root_key(row["root_category_id"]))
+                actual[key][0] += row["amount"] or 0
+                actual[key][1] += row["count"]
+
+        stored = defaultdict(lambda: [0, 0])
+        rollups = ExpenseMonthlyRollup.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "month", "root_key", "amount", "count"
+        )
+        for user_id, month, root_key, amount, count in rollups:
+            key = (user_id, month, root_key)
+            stored[key][0] += amount
+            stored[key][1] += count
+
+        fixed = 0
+        for key in actual.keys() | stored.keys():
+            amount = actual[key][0] - stored[key][0]
+            count = actual[key][1] - stored[key][1]
+            if amount or count:
+                user_id, month, root_key = key
+                apply_rollup_delta(user_id, month, root_key or None, amount, count)
+                fixed += 1
+        if fixed:
+            bump_user_data_versions(user_ids)
+    return fixed
+
+
@@ -0,0 +1,66 @@
+import csv
+import json
+
+from django.db.models import Q
+
+from expenses.utils.category_tree import get_category_tree
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_COLUMNS = ["expense_id", "date", "amount", "category", "parent_category", "description"]
+
+
+# csv.writer가 쓴 한 줄을 그대로 돌려주는 버퍼
+class Echo:
+    def write(self, value):
+        return value
+
+
+# (date, expense_id) 기준으로 chunk씩 이어서 조회
+# MySQL 드라이버는 결과 전체를 메모리에 올리므로 iterator() 대신 keyset으로 나눠 읽는다
+def iter_expense_values(queryset, descending=True, chunk_size=EXPORT_CHUNK_SIZE):
+    ordering = ("-date", "-expense_id") if descending else ("date", "expense_id")
+    fields = ("expense_id", "date", "amount", "category_id", "description")
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            last_date, last_id = last
+            if descending:
+                chunk = chunk.filter(Q(date__lt=last_date) | Q(date=last_date, expense_id__lt=last_id))
+            else:
+                chunk = chunk.filter(Q(date__gt=last_date) | Q(date=last_date, expense_id__gt=last_id))
+        rows = list(chunk.order_by(*ordering).values_list(*fields)[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = (rows[-1][1], rows[-1][0])
+
+
+def to_record(row, tree):
+    expense_id, expense_date, amount, category_id, description = row
+    node = tree.get(category_id)
+    return [
+        expense_id,
+        expense_date.isoformat(),
+        amount,
+        node.name if node else None,
+        tree.parent_name(category_id),
+        description,
+    ]
+
+
+def stream_csv(rows):
+    tree = get_category_tree()
+    writer = csv.writer(Echo())
+    # 엑셀에서 한글이 깨지지 않도록 BOM을 먼저 보낸다
+    yield "\ufeff" + writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(to_record(row, tree))
+
+
+def stream_ndjson(rows):
+    tree = get_category_tree()
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, to_record(row, tree)))
+        yield json.dumps(record, ensure_ascii=False) + "\n"
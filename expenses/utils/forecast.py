@@ -0,0 +1,224 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from accounts.models import UserProfile
+from expenses.models import Expense, ExpenseMonthlyRollup, SpendingForecast
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.date import month_range
+from expenses.utils.deltas import rollup_root_key
+from expenses.utils.summarize import UNCLASSIFIED
+
+# 요일 계수를 구하는 과거 기간 (12주)
+LOOKBACK_DAYS = 84
+# 이번 달 지난 날이 적을 때 과거 일평균에 주는 가중치 (일 수)
+PRIOR_DAYS = 7
+# 요일별 지출이 적을 때 요일 계수를 1에 가깝게 당기는 가중치 (주 수)
+WEEKDAY_PRIOR_WEEKS = 2
+
+
+# 요일 계수 (과거 기간의 요일별 일평균 / 전체 일평균, 과거 지출이 없으면 1)
+def weekday_factors(history, first_day):
+    weekdays = np.array([(first_day + timedelta(days=i)).weekday() for i in range(history.shape[1])])
+    one_hot = np.eye(7)[weekdays]
+    mean = history.mean(axis=1, keepdims=True)
+    totals = history @ one_hot
+    counts = one_hot.sum(axis=0)
+    expected = (counts + WEEKDAY_PRIOR_WEEKS) * mean
+    factors = np.divide(
+        totals + WEEKDAY_PRIOR_WEEKS * mean,
+        expected,
+        out=np.ones_like(totals),
+        where=expected > 0,
+    )
+    return factors, mean[:, 0]
+
+
+# 월말 예상 지출 = 이번 달 지출 + 남은 날 수(요일 계수 반영) x 일 지출 속도
+# 일 지출 속도는 이번 달 지출과 과거 일평균을 지난 날 수와 PRIOR_DAYS로 가중 평균한다
+def project(spent, history, history_start, as_of):
+    month_start, month_end = month_range(as_of.year, as_of.month)
+    factors, mean = weekday_factors(history, history_start)
+    month_weekdays = np.array([
+        (month_start + timedelta(days=i)).weekday()
+        for i in range((month_end - month_start).days + 1)
+    ])
+    elapsed = as_of.day - 1
+    elapsed_weight = factors[:, month_weekdays[:elapsed]].sum(axis=1)
+    remaining_weight = factors[:, month_weekdays[elapsed:]].sum(axis=1)
+
+    daily_rate = (spent + PRIOR_DAYS * mean) / (elapsed_weight + PRIOR_DAYS)
+    projected = spent + daily_rate * remaining_weight
+    rate = 1 + remaining_weight / (elapsed_weight + PRIOR_DAYS)
+    return np.rint(projected).astype(np.int64), rate
+
+
+# 과거 지출이 없을 때(요일 계수 1)의 예측 비율
+def flat_rate(as_of):
+    _, month_end = month_range(as_of.year, as_of.month)
+    elapsed = as_of.day - 1
+    return 1 + (month_end.day - elapsed) / (elapsed + PRIOR_DAYS)
+
+
+# 사용자 묶음의 기준일이 속한 달 월말 예측을 계산해 저장하고 저장한 행 수를 반환
+# (generate_spending_forecasts)
+def forecast_users(user_ids, as_of):
+    month = as_of.replace(day=1)
+    history_start = month - timedelta(days=LOOKBACK_DAYS)
+
+    spent_rows = ExpenseMonthlyRollup.objects.filter(
+        user_id__in=user_ids, month=month
+    ).values_list("user_id", "root_category_id", "amount")
+    history_rows = list(
+        Expense.objects.filter(user_id__in=user_ids, date__range=[history_start, month - timedelta(days=1)])
+        .values_list("user_id", "root_category_id", "date")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+    spent_by_key = {}
+    for user_id, root_id, amount in spent_rows:
+        if amount:
+            spent_by_key[(user_id, root_id)] = spent_by_key.get((user_id, root_id), 0) + amount
+    keys = sorted(
+        spent_by_key.keys() | {(user_id, root_id) for user_id, root_id, _, _ in history_rows},
+        key=lambda key: (key[0], key[1] or 0),
+    )
+
+    forecasts = []
+    if keys:
+        index = {key: i for i, key in enumerate(keys)}
+        history = np.zeros((len(keys), LOOKBACK_DAYS))
+        if history_rows:
+            np.add.at(
+                history,
+                (
+                    np.array([index[(user_id, root_id)] for user_id, root_id, _, _ in history_rows]),
+                    np.array([(day - history_start).days for _, _, day, _ in history_rows]),
+                ),
+                np.array([total or 0 for _, _, _, total in history_rows], dtype=float),
+            )
+        spent = np.array([spent_by_key.get(key, 0) for key in keys], dtype=float)
+        projected, rate = project(spent, history, history_start, as_of)
+        forecasts = [
+            SpendingForecast(
+                user_id=user_id,
+                month=month,
+                root_category_id=root_id,
+                root_key=rollup_root_key(root_id),
+                as_of=as_of,
+                spent_amount=int(spent[i]),
+                projected_amount=int(projected[i]),
+                rate=float(rate[i]),
+            )
+            for i, (user_id, root_id) in enumerate(keys)
+        ]
+
+    with transaction.atomic():
+        SpendingForecast.objects.filter(user_id__in=user_ids, month=month).delete()
+        SpendingForecast.objects.bulk_create(forecasts, batch_size=1000)
+    return len(forecasts)
+
+
+# 저장된 예측과 평균수입 비교 (조회 시에는 저장된 값을 더하기만 한다)
+def forecast_summary(user, month):
+    forecasts = list(
+        SpendingForecast.objects.filter(user=user, month=month).order_by("-projected_amount")
+    )
+    if not forecasts:
+        return None
+
+    root_names = {root.category_id: root.name for root in get_category_tree().roots}
+    spent = sum(forecast.spent_amount for forecast in forecasts)
+    projected = sum(forecast.projected_amount for forecast in forecasts)
+    income = (
+        UserProfile.objects.filter(user=user).values_list("average_income", flat=True).first()
+    )
+    income = int(income) if income is not None else None
+    return {
+        "month": month,
+        "as_of": max(forecast.as_of for forecast in forecasts),
+        "spent_amount": spent,
+        "projected_amount": projected,
+        "average_income": income,
+        "income_ratio": round(projected / income * 100, 1) if income else None,
+        "is_over_income": income is not None and projected > income,
+        "categories": [
+            {
+                "category_id": forecast.root_category_id,
+                "name": root_names.get(forecast.root_category_id, UNCLASSIFIED),
+                "spent_amount": forecast.spent_amount,
+                "projected_amount": forecast.projected_amount,
+            }
+            for forecast in forecasts
+        ],
+    }
+
+
+# 이번 달 이후 월말 예측에 지출 증감을 반영 (다음 배치 전까지 예측 비율은 그대로 사용)
+# 예측이 있는 사용자의 새 카테고리는 요일 계수 없이 만든 예측 행을 추가한다
+def apply_forecast_deltas(deltas):
+    this_month = date.today().replace(day=1)
+    deltas = {
+        key: amount for key, (amount, _) in deltas.items() if amount and key[1] >= this_month
+    }
+    if not deltas:
+        return
+
+    forecasts = {}
+    as_of_by_month = {}
+    rows = SpendingForecast.objects.filter(
+        user_id__in={key[0] for key in deltas},
+        month__in={key[1] for key in deltas},
+    ).values_list("spending_forecast_id", "user_id", "month", "root_key", "rate", "as_of")
+    for pk, user_id, month, root_key, rate, as_of in rows:
+        forecasts[(user_id, month, root_key)] = (pk, rate)
+        as_of_by_month[(user_id, month)] = as_of
+
+    missing = []
+    for (user_id, month, root_category_id), amount in deltas.items():
+        key = (user_id, month, rollup_root_key(root_category_id))
+        if key in forecasts:
+            pk, rate = forecasts[key]
+            SpendingForecast.objects.filter(pk=pk).update(
+                spent_amount=F("spent_amount") + amount,
+                projected_amount=F("projected_amount") + round(amount * rate),
+            )
+        elif amount > 0 and (user_id, month) in as_of_by_month:
+            rate = flat_rate(as_of_by_month[(user_id, month)])
+            missing.append(SpendingForecast(
+                user_id=user_id,
+                month=month,
+                root_category_id=root_category_id,
+                root_key=rollup_root_key(root_category_id),
+                as_of=as_of_by_month[(user_id, month)],
+                spent_amount=amount,
+                projected_amount=round(amount * rate),
+                rate=rate,
+            ))
+    if missing:
+        try:
+            with transaction.atomic():
+                SpendingForecast.objects.bulk_create(missing)
+        except IntegrityError:
+            # 동시에 생성된 경우 다음 배치에서 다시 계산된다
+            pass
+
+
+# 최상위 카테고리를 삭제하면 그 카테고리의 예측 행을 미분류 예측에 합친다 (Category pre_delete)
+def fold_root_category_forecasts(root_category_id):
+    with transaction.atomic():
+        forecasts = SpendingForecast.objects.filter(root_key=root_category_id)
+        for pk, user_id, month, spent, projected in forecasts.values_list(
+            "spending_forecast_id", "user_id", "month", "spent_amount", "projected_amount"
+        ):
+            merged = SpendingForecast.objects.filter(user_id=user_id, month=month, root_key=0).update(
+                spent_amount=F("spent_amount") + spent,
+                projected_amount=F("projected_amount") + projected,
+            )
+            if merged:
+                SpendingForecast.objects.filter(pk=pk).delete()
+            else:
+                SpendingForecast.objects.filter(pk=pk).update(root_category=None, root_key=0)
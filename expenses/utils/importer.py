@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from expenses.models import Expense
+from expenses.serializers import ExpenseImportRowSerializer
+from expenses.utils.categorizer import get_categorizer
+from expenses.utils.challenge_matcher import ChallengeMatcher
+
+IMPORT_CHUNK_SIZE = 1000
+# 응답에 담는 행 오류 최대 개수 (전체 개수는 error_count로 반환)
+MAX_REPORTED_ERRORS = 100
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+# 업로드 파일 형식 판별 (file_format 파라미터 > 확장자)
+def detect_format(uploaded_file, requested=None):
+    if requested:
+        return requested.lower()
+    name = (uploaded_file.name or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+# 파일을 한 줄씩 읽으며 (행 번호, 행 데이터)를 돌려준다 - 파일 전체를 메모리에 올리지 않음
+def iter_rows(uploaded_file, file_format):
+    text = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError:
+            yield row_number, None
+
+
+class ExpenseImporter:
+    def __init__(self, user):
+        self.user = user
+        self.serializer = ExpenseImportRowSerializer()
+        self.matcher = ChallengeMatcher.for_user(user.pk)
+        self.categorizer = get_categorizer()
+        self.imported_count = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row_number, detail):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": detail})
+
+    def build_expense(self, row_number, row):
+        if not isinstance(row, dict):
+            self.add_error(row_number, {"row": ["행 형식이 올바르지 않습니다."]})
+            return None
+        row = {key: value for key, value in row.items() if value not in ("", None)}
+        try:
+            data = self.serializer.run_validation(row)
+        except ValidationError as exc:
+            self.add_error(row_number, exc.detail)
+            return None
+
+        category_id = data.get("category")
+        if category_id is None:
+            category_id = self.categorizer.categorize(data.get("description"))
+        user_challenge_id = self.matcher.match(category_id, data["date"])
+        return Expense(
+            user=self.user,
+            category_id=category_id,
+            description=data.get("description", ""),
+            amount=data["amount"],
+            date=data["date"],
+            user_challenge_id=user_challenge_id,
+        )
+
+    def flush(self, chunk):
+        if chunk:
+            Expense.objects.bulk_create(chunk, batch_size=IMPORT_CHUNK_SIZE)
+            self.imported_count += len(chunk)
+            chunk.clear()
+
+    # 검증을 통과한 행만 chunk 단위로 bulk_create, 전체를 하나의 트랜잭션으로 처리
+    def run(self, rows):
+        chunk = []
+        with transaction.atomic():
+            for row_number, row in rows:
+                expense = self.build_expense(row_number, row)
+                if expense is not None:
+                    chunk.append(expense)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    self.flush(chunk)
+            self.flush(chunk)
+        return {
+            "imported_count": self.imported_count,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
@@ -1,5 +1,9 @@
 from rest_framework.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import FloatField, Q, Value
+
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.date import validate_and_parse_dates
+from expenses.utils.search import query_words, search_expenses
 
 def get_ordering(field: str, direction: str = "desc"):
     if direction not in ["asc", "desc"]:
@@ -9,8 +13,53 @@ def get_ordering(field: str, direction: str = "desc"):
     return f"-{field}" if direction == "desc" else field
 
 
+# 이름이 일치하는 카테고리 또는 그 하위 카테고리에 속한 지출
 def get_category_filter_q(category_list):
-    q = Q()
+    tree = get_category_tree()
+    category_ids = set()
     for cat in category_list:
-        q |= Q(category__name__icontains=cat) | Q(category__parent_category__name__icontains=cat)
-    return q
+        category_ids |= tree.matching_ids(cat)
+    return Q(category_id__in=category_ids)
+
+
+# 지출내역 목록 조회 조건(기간, 카테고리, 미분류 포함, 내용)을 적용한 쿼리셋
+# model에 ArchivedExpense를 주면 보관 지출내역에 같은 조건을 적용한다
+def filter_expenses(user, query, model=None):
+    from expenses.models import Expense
+
+    model = model or Expense
+
+    start_date = query.get("start_date")
+    end_date = query.get("end_date")
+    category_names = query.getlist("category") or query.getlist("category[]")
+    include_null_category = query.get("include_null_category") == "true"
+    description = query.get("description")
+
+    parsed_start, parsed_end = validate_and_parse_dates(start_date, end_date)
+
+    base_q = Q(user=user)
+    if parsed_start:
+        base_q &= Q(date__gte=parsed_start)
+    if parsed_end:
+        base_q &= Q(date__lte=parsed_end)
+
+    category_q = Q()
+    if category_names:
+        category_q |= get_category_filter_q(category_names)
+    if include_null_category:
+        category_q |= Q(category__isnull=True)
+
+    if category_q.children:
+        expenses = model.objects.filter(base_q & category_q)
+    else:
+        expenses = model.objects.filter(base_q)
+
+    # 내용 검색은 전문 검색 인덱스를 사용하고 관련도(search_rank)를 붙인다
+    # (검색 인덱스가 없는 보관 지출내역은 단어별 부분 일치, 관련도 0)
+    if description and model is Expense:
+        expenses = search_expenses(expenses, user, description)
+    elif description:
+        for word in query_words(description):
+            expenses = expenses.filter(description__icontains=word)
+        expenses = expenses.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return expenses
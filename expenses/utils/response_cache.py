@@ -0,0 +1,124 @@
+import hashlib
+import uuid
+from datetime import date
+from functools import wraps
+
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from expenses.checks import is_shared_cache
+from expenses.utils.category_tree import get_category_tree_version
+from geumjjoki.db_router import pin_users_to_primary
+
+# 사용자별 데이터 버전 (지출/챌린지 변경 시 커밋 후 갱신)
+USER_VERSION_KEY = "expenses:user_version:{user_id}"
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+
+def get_user_data_version(user_id):
+    key = USER_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+# 버전을 바꾸기만 하면 이전 버전으로 저장된 응답은 더 이상 조회되지 않고 만료된다
+# (카운터 대신 임의 값을 써서 버전 키가 캐시에서 밀려나도 이전 응답과 겹치지 않게 함)
+def bump_user_data_versions(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def bump():
+        cache.set_many(
+            {USER_VERSION_KEY.format(user_id=user_id): uuid.uuid4().hex for user_id in user_ids},
+            None,
+        )
+        # 복제 지연 동안 변경 전 데이터를 읽지 않도록 primary에 고정
+        pin_users_to_primary(user_ids)
+
+    transaction.on_commit(bump)
+
+
+# 요청 사용자의 데이터 버전 + 카테고리 트리 버전 + 오늘 날짜
+# (기본값이 오늘 기준인 조회와 기간 판정 결과도 날짜가 바뀌면 달라진다)
+def user_data_version(request):
+    return ":".join([
+        get_user_data_version(request.user.pk),
+        get_category_tree_version(),
+        date.today().isoformat(),
+    ])
+
+
+def normalized_query(request):
+    items = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    return hashlib.md5(repr(items).encode()).hexdigest()
+
+
+def response_cache_key(view_name, request):
+    return f"expenses:response:{view_name}:{request.user.pk}:{user_data_version(request)}:{normalized_query(request)}"
+
+
+# 사용자, 엔드포인트, 정렬한 쿼리 파라미터와 데이터 버전을 키로 200 응답 본문을 캐시
+def cache_user_response(view_name, timeout=RESPONSE_CACHE_TIMEOUT):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            response_cache = caches[RESPONSE_CACHE_ALIAS]
+            key = response_cache_key(view_name, request)
+            data = response_cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(key, response.data, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("If-None-Match")
+    return bool(if_none_match) and (
+        if_none_match.strip() == "*" or etag in parse_etags(if_none_match)
+    )
+
+
+def response_etag(view_name, request):
+    digest = hashlib.md5(
+        f"{view_name}:{request.user.pk}:{user_data_version(request)}:{normalized_query(request)}".encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+# 데이터 버전에서 ETag를 만들어 If-None-Match가 같으면 조회/직렬화 없이 304 반환
+# 버전 키가 프로세스 로컬 캐시에 있으면 다른 프로세스(관리 명령)의 변경을 모르고
+# 304를 계속 돌려주게 되므로 ETag를 쓰지 않는다
+def conditional_user_response(view_name):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_shared_cache("default"):
+                return method(self, request, *args, **kwargs)
+            etag = response_etag(view_name, request)
+            if etag_matches(request, etag):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response["ETag"] = etag
+            # 응답이 사용자마다 다르므로 공유 캐시에 저장되지 않게 한다
+            response["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+
+# MySQL ngram 파서의 기본 ngram_token_size와 맞춘다
+NGRAM_SIZE = 2
+FULLTEXT_INDEX_NAME = "expense_description_ngram_idx"
+# BOOLEAN MODE 연산자로 해석되는 문자는 검색어에서 제거
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+# 검색 방식: 설정이 없으면 MySQL은 FULLTEXT, 그 외(SQLite 테스트 등)는 n-gram 역색인
+def get_search_backend():
+    backend = getattr(settings, "EXPENSE_SEARCH_BACKEND", None)
+    if backend:
+        return backend
+    return "fulltext" if connection.vendor == "mysql" else "ngram"
+
+
+def uses_token_index():
+    return get_search_backend() == "ngram"
+
+
+def query_words(text):
+    return BOOLEAN_OPERATORS.sub(" ", text or "").lower().split()
+
+
+# 단어별 n-gram 토큰 (n보다 짧은 단어는 단어 그대로)
+def tokenize(text):
+    tokens = set()
+    for word in query_words(text):
+        if len(word) <= NGRAM_SIZE:
+            tokens.add(word)
+            continue
+        for i in range(len(word) - NGRAM_SIZE + 1):
+            tokens.add(word[i:i + NGRAM_SIZE])
+    return tokens
+
+
+# 지출내역의 검색 토큰을 다시 만든다
+def index_expenses(expenses):
+    from expenses.models import ExpenseSearchToken
+
+    expenses = [expense for expense in expenses if expense.pk is not None]
+    ExpenseSearchToken.objects.filter(expense__in=[e.pk for e in expenses]).delete()
+    ExpenseSearchToken.objects.bulk_create(
+        [
+            ExpenseSearchToken(expense_id=expense.pk, user_id=expense.user_id, token=token)
+            for expense in expenses
+            for token in tokenize(expense.description)
+        ],
+        batch_size=1000,
+    )
+
+
+# description 검색어로 지출내역을 거르고 관련도(search_rank)를 붙인다
+# 각 단어는 접두/부분 일치하며 모든 단어가 포함된 지출만 남는다
+def search_expenses(queryset, user, text):
+    words = query_words(text)
+    if not words:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if get_search_backend() == "fulltext":
+        from expenses.models import Expense
+
+        column = "%s.%s" % (
+            connection.ops.quote_name(Expense._meta.db_table),
+            connection.ops.quote_name("description"),
+        )
+        against = " ".join(f"+{word}*" for word in words)
+        rank = RawSQL(
+            f"MATCH ({column}) AGAINST (%s IN BOOLEAN MODE)",
+            (against,),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).filter(search_rank__gt=0)
+
+    from expenses.models import ExpenseSearchToken
+
+    # n보다 짧은 단어는 토큰으로 접두 일치를 보장할 수 없어 부분 일치로 거른다
+    tokens = set()
+    for word in words:
+        if len(word) < NGRAM_SIZE:
+            queryset = queryset.filter(description__icontains=word)
+        else:
+            tokens |= tokenize(word)
+    if not tokens:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    matched = (
+        ExpenseSearchToken.objects.filter(user=user, token__in=tokens)
+        .values("expense_id")
+        .annotate(hits=Count("token", distinct=True))
+        .filter(hits=len(tokens))
+        .values("expense_id")
+    )
+    # 관련도: 지출내용의 전체 토큰 중 검색 토큰이 차지하는 비율 (짧고 정확한 내용이 우선)
+    token_count = (
+        ExpenseSearchToken.objects.filter(expense_id=OuterRef("pk"))
+        .values("expense_id")
+        .annotate(total=Count("token"))
+        .values("total")
+    )
+    return queryset.filter(Q(expense_id__in=matched)).annotate(
+        search_rank=Value(float(len(tokens)))
+        / Cast(Coalesce(Subquery(token_count), Value(1)), FloatField())
+    )
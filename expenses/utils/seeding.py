@@ -0,0 +1,214 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection, transaction
+
+from accounts.models import UserProfile
+from challenges.utils.totals import recompute_user_challenge_totals
+from expenses.models import Expense, ExpenseSearchToken
+from expenses.utils.category_descriptions import categories_data
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.deltas import reconcile_monthly_rollups
+from expenses.utils.search import index_expenses, uses_token_index
+
+SEED_CHUNK_SIZE = 10000
+SEED_METHODS = ("bulk", "load-data")
+UNCLASSIFIED_DESCRIPTION = "미분류 지출"
+
+
+# 말단 카테고리와 지출내용 후보를 NumPy 배열로 펼친다
+# (카테고리 i의 후보는 descriptions[offsets[i]:offsets[i] + counts[i]])
+def leaf_catalog():
+    tree = get_category_tree()
+    leaves = sorted(
+        (node for node in tree.nodes.values() if not node.children),
+        key=lambda node: node.category_id,
+    )
+    descriptions, offsets, counts = [], [], []
+    for node in leaves:
+        root = tree.get(node.root_id)
+        candidates = categories_data.get(root.name, {}).get(node.name) if root else None
+        if not isinstance(candidates, list) or not candidates:
+            candidates = [f"{node.name} 결제"]
+        offsets.append(len(descriptions))
+        counts.append(len(candidates))
+        descriptions.extend(candidates)
+    return (
+        np.array([node.category_id for node in leaves], dtype=np.int64),
+        np.array([node.root_id for node in leaves], dtype=np.int64),
+        np.array(descriptions + [UNCLASSIFIED_DESCRIPTION], dtype=object),
+        np.array(offsets, dtype=np.int64),
+        np.array(counts, dtype=np.int64),
+    )
+
+
+# 사용자 묶음의 지출을 배열로 생성 (create_expenses와 같은 분포)
+# - 하루 1~3건, 5,000~30,000원(천원 단위), 일정 비율은 미분류
+# - 사용자별 월 지출 합계가 평균수입을 넘지 않도록 넘는 건은 남은 금액으로 줄이고 이후 건은 버림
+# 시드와 샤드의 첫 사용자 id로 난수 생성기를 만들어 워커 수와 관계없이 결과가 같다
+def generate_expenses(user_ids, incomes, start_date, end_date, seed, unclassified_ratio):
+    leaf_ids, leaf_roots, descriptions, offsets, counts = leaf_catalog()
+    rng = np.random.default_rng([seed, int(user_ids[0])])
+    n_users = len(user_ids)
+    n_days = (end_date - start_date).days + 1
+    dates = [start_date + timedelta(days=i) for i in range(n_days)]
+    month_of_day = np.array(
+        [(d.year - start_date.year) * 12 + d.month - start_date.month for d in dates],
+        dtype=np.int64,
+    )
+    n_months = int(month_of_day[-1]) + 1
+
+    per_day = rng.integers(1, 4, size=(n_users, n_days))
+    user_idx = np.repeat(np.arange(n_users), per_day.sum(axis=1))
+    day_idx = np.repeat(np.tile(np.arange(n_days), n_users), per_day.ravel())
+    size = len(user_idx)
+    amounts = rng.integers(5, 31, size=size, dtype=np.int64) * 1000
+    leaf_pick = rng.integers(0, len(leaf_ids), size=size)
+    unclassified = rng.random(size) < unclassified_ratio
+    description_pick = offsets[leaf_pick] + (rng.random(size) * counts[leaf_pick]).astype(np.int64)
+
+    # (사용자, 월) 그룹 안에서 이 건 이전까지의 누적 지출
+    group = user_idx * n_months + month_of_day[day_idx]
+    cumulative = np.cumsum(amounts)
+    group_starts = np.flatnonzero(np.r_[True, np.diff(group) != 0])
+    group_base = np.r_[0, cumulative[group_starts[1:] - 1]]
+    spent_before = cumulative - amounts - np.repeat(group_base, np.diff(np.r_[group_starts, size]))
+    limit = incomes[user_idx]
+    keep = spent_before < limit
+    amounts = np.minimum(amounts, limit - spent_before)
+
+    category_ids = np.where(unclassified, -1, leaf_ids[leaf_pick])
+    root_ids = np.where(unclassified, -1, leaf_roots[leaf_pick])
+    description_pick = np.where(unclassified, len(descriptions) - 1, description_pick)
+    return {
+        "user_id": np.asarray(user_ids, dtype=np.int64)[user_idx[keep]],
+        "category_id": category_ids[keep],
+        "root_category_id": root_ids[keep],
+        "description": descriptions[description_pick[keep]],
+        "amount": amounts[keep],
+        "date": np.array(dates, dtype=object)[day_idx[keep]],
+    }
+
+
+def _nullable(value):
+    return None if value < 0 else int(value)
+
+
+def write_with_bulk_create(columns):
+    size = len(columns["user_id"])
+    for start in range(0, size, SEED_CHUNK_SIZE):
+        end = start + SEED_CHUNK_SIZE
+        Expense.objects.bulk_create(
+            [
+                Expense(
+                    user_id=int(user_id),
+                    category_id=_nullable(category_id),
+                    description=description,
+                    amount=int(amount),
+                    date=expense_date,
+                )
+                for user_id, category_id, description, amount, expense_date in zip(
+                    columns["user_id"][start:end],
+                    columns["category_id"][start:end],
+                    columns["description"][start:end],
+                    columns["amount"][start:end],
+                    columns["date"][start:end],
+                )
+            ],
+            batch_size=SEED_CHUNK_SIZE,
+        )
+
+
+def _tsv_field(value):
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+# MySQL LOAD DATA LOCAL INFILE로 적재 (DATABASES OPTIONS의 local_infile 필요)
+# 저장 훅을 거치지 않으므로 월별 집계와 검색 토큰은 적재 후 사용자 단위로 다시 맞춘다
+def write_with_load_data(columns):
+    if connection.vendor != "mysql":
+        raise ValueError("load-data 방식은 MySQL에서만 사용할 수 있습니다.")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", delete=False) as f:
+        path = f.name
+        for user_id, category_id, root_id, description, amount, expense_date in zip(
+            columns["user_id"],
+            columns["category_id"],
+            columns["root_category_id"],
+            columns["description"],
+            columns["amount"],
+            columns["date"],
+        ):
+            f.write(
+                f"{user_id}\t{'' if category_id < 0 else category_id}\t"
+                f"{'' if root_id < 0 else root_id}\t{_tsv_field(description)}\t"
+                f"{amount}\t{expense_date.isoformat()}\n"
+            )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {Expense._meta.db_table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                "(user_id, @category_id, @root_category_id, description, amount, date) "
+                "SET category_id = NULLIF(@category_id, ''), "
+                "root_category_id = NULLIF(@root_category_id, '')",
+                [path],
+            )
+    finally:
+        os.remove(path)
+
+
+# 기간 안의 기존 지출을 행 단위 시그널 없이 삭제 (집계는 호출한 쪽에서 보정)
+def clear_expenses(user_ids, start_date, end_date):
+    expenses = Expense.objects.filter(user_id__in=user_ids, date__range=[start_date, end_date])
+    user_challenge_ids = set(
+        expenses.exclude(user_challenge__isnull=True)
+        .order_by()
+        .values_list("user_challenge_id", flat=True)
+        .distinct()
+    )
+    ExpenseSearchToken.objects.filter(expense__in=expenses).delete()
+    expenses.raw_delete()
+    return user_challenge_ids
+
+
+# 샤드 하나(사용자 id 목록)의 지출을 생성해 저장하고 생성한 건수를 반환 (seed_expenses)
+def seed_expenses_for_users(
+    user_ids, start_date, end_date, seed, unclassified_ratio=0.05, method="bulk", replace=False
+):
+    incomes = dict(
+        UserProfile.objects.filter(user_id__in=user_ids).values_list("user_id", "average_income")
+    )
+    user_ids = sorted(incomes)
+    if not user_ids:
+        return 0
+
+    columns = generate_expenses(
+        user_ids,
+        np.array([int(incomes[user_id]) for user_id in user_ids], dtype=np.int64),
+        start_date,
+        end_date,
+        seed,
+        unclassified_ratio,
+    )
+    with transaction.atomic():
+        user_challenge_ids = clear_expenses(user_ids, start_date, end_date) if replace else set()
+        if method == "load-data":
+            write_with_load_data(columns)
+            if uses_token_index():
+                index_expenses(
+                    Expense.objects.filter(
+                        user_id__in=user_ids, date__range=[start_date, end_date]
+                    ).only("expense_id", "user_id", "description")
+                )
+        else:
+            write_with_bulk_create(columns)
+        if replace or method == "load-data":
+            reconcile_monthly_rollups(user_ids)
+        if user_challenge_ids:
+            recompute_user_challenge_totals(user_challenge_ids)
+    return len(columns["user_id"])
+
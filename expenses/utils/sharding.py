@@ -0,0 +1,64 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connections
+
+
+# 정렬된 id 목록을 size개씩 나눈 (첫 id, 마지막 id, id 목록) 샤드
+def id_shards(ids, size):
+    ids = sorted(ids)
+    return [
+        (chunk[0], chunk[-1], chunk)
+        for chunk in (ids[start:start + size] for start in range(0, len(ids), size))
+    ]
+
+
+# 완료한 샤드의 id 범위를 JSON 파일에 기록해 중단 후 이어서 실행할 수 있게 한다
+class Checkpoint:
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.completed = []
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("name") == name:
+                self.completed = [tuple(item) for item in data.get("completed", [])]
+
+    def is_done(self, first_id, last_id):
+        return any(start <= first_id and last_id <= end for start, end in self.completed)
+
+    def mark_done(self, first_id, last_id):
+        self.completed.append((first_id, last_id))
+        if not self.path:
+            return
+        # 임시 파일에 쓴 뒤 교체해 기록 도중 중단돼도 파일이 깨지지 않게 한다
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"name": self.name, "completed": self.completed}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.completed = []
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _close_connections():
+    connections.close_all()
+
+
+# 샤드마다 func(ids, **kwargs)를 실행하고 (샤드, 결과)를 완료 순서대로 돌려준다
+# workers > 1이면 프로세스 풀에서 실행 (fork 전후로 DB 연결을 닫아 연결을 공유하지 않게 함)
+def run_shards(func, shards, workers=1, **kwargs):
+    if workers <= 1:
+        for shard in shards:
+            yield shard, func(shard[2], **kwargs)
+        return
+
+    _close_connections()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_close_connections) as executor:
+        futures = {executor.submit(func, shard[2], **kwargs): shard for shard in shards}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -1,22 +1,49 @@
 from collections import defaultdict
 
-def summarize(expenses, all_root_names):
-    amount_dict = defaultdict(float)
-    count_dict = defaultdict(int)
-
-    for expense in expenses:
-        root = expense.category.get_root_category() if expense.category else None
-        root_name = root.name if root and root.name in all_root_names else "미분류"
-        amount_dict[root_name] += float(expense.amount)
-        count_dict[root_name] += 1
-
-    category_summary = []
-    for name in all_root_names:
-        category_summary.append({
-            "parent": name,
-            "amount": round(amount_dict.get(name, 0)),
-            "count": count_dict.get(name, 0),
-        })
-
-    total_amount = round(sum(amount_dict.values()))
-    return total_amount, category_summary
+from django.db.models import Sum
+
+from expenses.models import ExpenseMonthlyRollup
+
+UNCLASSIFIED = "미분류"
+
+
+# 기간 내 월별 집계를 (월, 최상위 카테고리) 단위로 조회
+# 지출내역이 아닌 ExpenseMonthlyRollup을 읽으므로 카테고리 수만큼의 행만 읽는다
+def rollup_summary_rows(user, start_date, end_date):
+    return (
+        ExpenseMonthlyRollup.objects.filter(
+            user=user,
+            month__gte=start_date.replace(day=1),
+            month__lte=end_date,
+        )
+        .values("month", "root_category_id")
+        .annotate(amount=Sum("amount"), count=Sum("count"))
+        .order_by()
+    )
+
+
+# 집계 결과를 월별 카테고리 요약으로 변환
+# all_roots: [(category_id, name), ...] 순서대로 category_summary를 구성
+def summarize(rows, all_roots, months):
+    root_names = dict(all_roots)
+    all_root_names = list(root_names.values()) + [UNCLASSIFIED]
+
+    amount_dict = defaultdict(lambda: defaultdict(int))
+    count_dict = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        root_name = root_names.get(row["root_category_id"], UNCLASSIFIED)
+        amount_dict[row["month"]][root_name] += row["amount"] or 0
+        count_dict[row["month"]][root_name] += row["count"]
+
+    summaries = {}
+    for month in months:
+        category_summary = []
+        for name in all_root_names:
+            category_summary.append({
+                "parent": name,
+                "amount": amount_dict[month].get(name, 0),
+                "count": count_dict[month].get(name, 0),
+            })
+        total_amount = sum(amount_dict[month].values())
+        summaries[month] = (total_amount, category_summary)
+    return summaries
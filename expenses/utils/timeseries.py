@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from rest_framework.exceptions import ValidationError
+
+from expenses.utils.category_tree import get_category_tree
+from expenses.utils.summarize import UNCLASSIFIED
+
+TRUNC_FUNCTIONS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+# 응답 하나에 담는 최대 구간 수 (일 단위로 약 3년)
+MAX_BUCKETS = 1100
+
+
+# 날짜가 속한 구간의 시작일 (주는 월요일 시작 - TruncWeek와 같은 기준)
+def bucket_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == "week":
+        return day + timedelta(days=7)
+    if interval == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+# 기간의 모든 구간 시작일 (빈 구간을 0으로 채우는 데 사용)
+def bucket_dates(start_date, end_date, interval):
+    buckets = []
+    current = bucket_start(start_date, interval)
+    while current <= end_date:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValidationError({
+                "TOO_MANY_BUCKETS": f"구간 수는 {MAX_BUCKETS}개를 넘을 수 없습니다. 기간을 줄이거나 interval을 늘려주세요",
+            })
+        current = next_bucket(current, interval)
+    return buckets
+
+
+def _series(buckets, values):
+    return [
+        {
+            "date": bucket.isoformat(),
+            "amount": values.get(bucket, (0, 0))[0],
+            "count": values.get(bucket, (0, 0))[1],
+        }
+        for bucket in buckets
+    ]
+
+
+# 구간별 지출 합계/건수 (구간 계산과 집계는 GROUP BY 한 번으로 DB에서 처리)
+# split_by_category이면 최상위 카테고리별 시리즈도 함께 반환
+def spending_series(expenses, start_date, end_date, interval, split_by_category=False):
+    buckets = bucket_dates(start_date, end_date, interval)
+    group_fields = ["bucket", "root_category_id"] if split_by_category else ["bucket"]
+    # 보관 지출내역을 합친 조회(ArchiveUnion)는 테이블별로 집계해 더한다
+    rows = [
+        row
+        for part in getattr(expenses, "parts", [expenses])
+        for row in part.filter(date__range=[start_date, end_date])
+        .annotate(bucket=TRUNC_FUNCTIONS[interval]("date", output_field=DateField()))
+        .values(*group_fields)
+        .annotate(amount=Sum("amount"), count=Count("expense_id"))
+        .order_by()
+    ]
+
+    totals = {}
+    by_root = {}
+    for row in rows:
+        amount, count = totals.get(row["bucket"], (0, 0))
+        totals[row["bucket"]] = (amount + (row["amount"] or 0), count + row["count"])
+        if split_by_category:
+            buckets_by_root = by_root.setdefault(row["root_category_id"], {})
+            amount, count = buckets_by_root.get(row["bucket"], (0, 0))
+            buckets_by_root[row["bucket"]] = (amount + (row["amount"] or 0), count + row["count"])
+
+    result = {"series": _series(buckets, totals)}
+    if split_by_category:
+        roots = [(root.category_id, root.name) for root in get_category_tree().roots]
+        result["categories"] = [
+            {
+                "category_id": category_id,
+                "name": name,
+                "series": _series(buckets, by_root.get(category_id, {})),
+            }
+            for category_id, name in roots + [(None, UNCLASSIFIED)]
+        ]
+    return result
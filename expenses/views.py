@@ -1,73 +1,92 @@
-from datetime import date
-from django.db.models import Q
+import csv
+from datetime import date, timedelta
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from .models import Expense, Category
-from .serializers import ExpenseSerializer, ExpenseWriteSerializer, CategorySerializer
-from .pagination import CustomPageNumberPagination
+from .models import CategoryBudget, Expense, ExpenseAnalysis, SpendingAlert
+from .serializers import (
+    ExpenseSerializer,
+    ExpenseWriteSerializer,
+    CategorySerializer,
+    ExpenseAnalysisSerializer,
+    ExpenseBulkSerializer,
+    CategoryBudgetWriteSerializer,
+    SpendingAlertSerializer,
+)
+from .pagination import CustomPageNumberPagination, ExpenseCursorPagination
 
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.http import HttpResponse, StreamingHttpResponse
 
-from expenses.utils.date import validate_and_parse_dates
-from expenses.utils.query import get_ordering, get_category_filter_q
+from expenses.utils.alerts import budget_status, check_budget
+from expenses.utils.archive import with_archive
+from expenses.utils.categorizer import get_categorizer
+from expenses.utils.cohort import cohort_percentiles
+from expenses.utils.category_tree import get_category_tree, get_category_tree_version
+from expenses.utils.challenge_matcher import ChallengeMatcher
+from expenses.utils.date import month_range, validate_and_parse_dates
+from expenses.utils.exporter import EXPORT_FORMATS, iter_expense_values, stream_csv, stream_ndjson
+from expenses.utils.forecast import forecast_summary
+from expenses.utils.importer import ExpenseImporter, SUPPORTED_FORMATS, detect_format, iter_rows
+from expenses.utils.query import get_ordering, filter_expenses
 from expenses.utils.response import success_response, error_response
-from expenses.utils.summarize import summarize
-
-from challenges.models import UserChallenge
+from expenses.utils.response_cache import cache_user_response, conditional_user_response, etag_matches
+from expenses.utils.summarize import rollup_summary_rows, summarize
+from expenses.utils.timeseries import TRUNC_FUNCTIONS, spending_series
+from geumjjoki.db_router import ReplicaReadMixin
 
 class ExpenseBaseView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
-class ExpenseListView(ExpenseBaseView):
+class ExpenseListView(ReplicaReadMixin, ExpenseBaseView):
+    @conditional_user_response("expense_list")
+    @cache_user_response("expense_list")
     def get(self, request):
-        user = request.user
         query = request.query_params
-
-        start_date = query.get("start_date")
-        end_date = query.get("end_date")
-        category_names = query.getlist("category") or query.getlist("category[]")
-        include_null_category = query.get("include_null_category") == "true"
         date_order = query.get("date", "desc")
-        description = query.get("description")
-
-        parsed_start, parsed_end = validate_and_parse_dates(start_date, end_date)
-
-        base_q = Q(user=user)
-        if parsed_start:
-            base_q &= Q(date__gte=parsed_start)
-        if parsed_end:
-            base_q &= Q(date__lte=parsed_end)
-        if description:
-            base_q &= Q(description__icontains=description)
-
-        category_q = Q()
-        if category_names:
-            category_q |= get_category_filter_q(category_names)
-        if include_null_category:
-            category_q |= Q(category__isnull=True)
-
-        if category_q.children:
-            expenses = Expense.objects.filter(base_q & category_q)
-        else:
-            expenses = Expense.objects.filter(base_q)
+        # include_totals=false 이면 합계/건수 집계를 생략
+        include_totals = query.get("include_totals", "true") != "false"
 
         order_field = get_ordering("date", date_order)
-        expenses = expenses.order_by(order_field)
+        # sort=relevance 이면 내용 검색 관련도순 (페이지 번호 방식에서만 지원)
+        sort = query.get("sort", "date")
+        if sort not in ["date", "relevance"]:
+            raise ValidationError({
+                "INVALID_SORT": "정렬 방식은 date 또는 relevance만 허용됩니다",
+            })
+        # 조회 기간이 보관 범위에 닿으면 보관 지출내역도 함께 조회
+        expenses = with_archive(request.user, query, filter_expenses(request.user, query))
+
+        # pagination=cursor 이면 (date, expense_id) 기준 커서 페이지네이션
+        if query.get("pagination") == "cursor":
+            paginator = ExpenseCursorPagination()
+            page = paginator.paginate_queryset(
+                expenses, request, descending=date_order == "desc"
+            )
+            data = {
+                "expenses": ExpenseSerializer(page, many=True).data,
+                "pagination": paginator.get_pagination_data(),
+            }
+            if include_totals:
+                totals = expenses.aggregate(count=Count("expense_id"), sum=Sum("amount"))
+                data["total_amount"] = totals["sum"] or 0
+                data["total_count"] = totals["count"]
+            return success_response(data)
 
-        total_count = expenses.count()
-        total_amount = int(expenses.aggregate(sum=Sum("amount")).get("sum") or 0)
+        if sort == "relevance" and query.get("description"):
+            expenses = expenses.order_by("-search_rank", order_field, "-expense_id")
+        else:
+            expenses = expenses.order_by(order_field)
 
         paginator = CustomPageNumberPagination()
         page = paginator.paginate_queryset(expenses, request)
         serializer = ExpenseSerializer(page, many=True)
 
-        return success_response({
+        data = {
             "expenses": serializer.data,
-            "total_amount": total_amount,
-            "total_count": total_count,
             "pagination": {
                 "current_page": paginator.page.number,
                 "page_size": paginator.page.paginator.per_page,
@@ -75,7 +94,12 @@ class ExpenseListView(ExpenseBaseView):
                 "has_next": paginator.page.has_next(),
                 "has_previous": paginator.page.has_previous(),
             },
-        })
+        }
+        if include_totals:
+            # 건수는 페이지네이터가 이미 센 값을 재사용
+            data["total_amount"] = expenses.aggregate(sum=Sum("amount")).get("sum") or 0
+            data["total_count"] = paginator.page.paginator.count
+        return success_response(data)
         
 class ExpenseDetailView(ExpenseBaseView):
     def get_object(self, expense_id, user):
@@ -124,7 +148,9 @@ class ExpenseDetailView(ExpenseBaseView):
             "message": "지출 내역이 삭제되었습니다."
         })
         
-class ExpenseSummaryView(ExpenseBaseView):
+class ExpenseSummaryView(ReplicaReadMixin, ExpenseBaseView):
+    @conditional_user_response("expense_summary")
+    @cache_user_response("expense_summary")
     def get(self, request):
         user = request.user
         year = int(request.GET.get("year", date.today().year))
@@ -138,17 +164,17 @@ class ExpenseSummaryView(ExpenseBaseView):
             prev_month = month - 1
             prev_year = year
 
-        # 데이터 조회
-        expenses_this = Expense.objects.filter(user=user, date__year=year, date__month=month)
-        expenses_prev = Expense.objects.filter(user=user, date__year=prev_year, date__month=prev_month)
+        this_start, this_end = month_range(year, month)
+        prev_start, _ = month_range(prev_year, prev_month)
 
-        # 루트 카테고리 이름 목록
-        all_roots = Category.objects.filter(parent_category__isnull=True)
-        all_root_names = list(all_roots.values_list("name", flat=True)) + ["미분류"]
+        # 루트 카테고리 목록
+        all_roots = [(root.category_id, root.name) for root in get_category_tree().roots]
 
-        # 요약 계산
-        total_this, category_this = summarize(expenses_this, all_root_names)
-        total_prev, category_prev = summarize(expenses_prev, all_root_names)
+        # 두 달치 월별 집계를 한 번에 조회
+        rows = rollup_summary_rows(user, prev_start, this_end)
+        summaries = summarize(rows, all_roots, [this_start, prev_start])
+        total_this, category_this = summaries[this_start]
+        total_prev, category_prev = summaries[prev_start]
 
         return success_response({
             "current_month": {
@@ -164,8 +190,53 @@ class ExpenseSummaryView(ExpenseBaseView):
                 "category_summary": category_prev,
             }
         })
-        
-        
+
+
+# 일/주/월 단위 지출 추이 (차트용, 지출내역 행을 내려보내지 않고 구간별 합계만 반환)
+class ExpenseTimeSeriesView(ReplicaReadMixin, ExpenseBaseView):
+    # 기간을 주지 않았을 때의 기본 구간 수
+    DEFAULT_SPANS = {"day": 30, "week": 12, "month": 12}
+
+    def get(self, request):
+        query = request.query_params
+        interval = query.get("interval", "day")
+        if interval not in TRUNC_FUNCTIONS:
+            raise ValidationError({
+                "INVALID_INTERVAL": "interval은 day, week, month만 허용됩니다",
+            })
+        start_date, end_date = validate_and_parse_dates(
+            query.get("start_date"), query.get("end_date")
+        )
+        end_date = end_date or date.today()
+        if start_date is None:
+            span = self.DEFAULT_SPANS[interval]
+            if interval == "month":
+                month_index = end_date.year * 12 + end_date.month - span
+                start_date = date(month_index // 12, month_index % 12 + 1, 1)
+            else:
+                start_date = end_date - timedelta(days=span * (7 if interval == "week" else 1) - 1)
+        if start_date > end_date:
+            raise ValidationError({
+                "INVALID_DATE_RANGE": "시작일은 종료일보다 이전이어야 합니다",
+            })
+
+        # 카테고리/내용 등 목록 조회와 같은 조건을 적용
+        expenses = with_archive(request.user, query, filter_expenses(request.user, query))
+        data = spending_series(
+            expenses,
+            start_date,
+            end_date,
+            interval,
+            split_by_category=query.get("split") == "category",
+        )
+        return success_response({
+            "interval": interval,
+            "start_date": start_date,
+            "end_date": end_date,
+            **data,
+        })
+
+
 class ExpenseCreateView(ExpenseBaseView):
     def post(self, request):
         serializer = ExpenseWriteSerializer(data=request.data)
@@ -174,23 +245,21 @@ class ExpenseCreateView(ExpenseBaseView):
             user = request.user
             expense_date = serializer.validated_data.get('date')
 
-            user_challenges = UserChallenge.objects.filter(
-                user=user,
-                status='도전중',
-                start_date__date__lte=expense_date,
-                end_date__date__gte=expense_date,
-            )
-            user_challenge = None
-            if category is not None:
-                from django.db.models import Q
-                root_category = category.get_root_category() if hasattr(category, "get_root_category") else category
-                user_challenges = user_challenges.filter(
-                    Q(challenge__category=category) | Q(challenge__category=root_category) | Q(challenge__category__parent_category=root_category)
+            # 카테고리를 주지 않으면 설명으로 자동 분류 (분류되지 않으면 미분류)
+            category_id = category.pk if category else None
+            if category is None:
+                serializer.validated_data.pop('category', None)
+                category_id = get_categorizer().categorize(
+                    serializer.validated_data.get('description')
                 )
-            if user_challenges.exists():
-                user_challenge = user_challenges.first()
 
-            expense = serializer.save(user=user, user_challenge=user_challenge)
+            # 캐시된 도전중 챌린지 인덱스에서 매칭 (DB 조회 없음)
+            matcher = ChallengeMatcher.for_user(user.pk)
+            user_challenge_id = matcher.match(category_id, expense_date)
+
+            expense = serializer.save(
+                user=user, category_id=category_id, user_challenge_id=user_challenge_id
+            )
             return success_response(ExpenseSerializer(expense).data, status_code=201)
         return error_response(
             message="입력값이 유효하지 않습니다.",
@@ -198,8 +267,237 @@ class ExpenseCreateView(ExpenseBaseView):
             status_code=400
         )
         
+# 지출내역 일괄 수정/삭제
+# 소유권과 챌린지 연결 여부를 한 번에 확인하고, 모두 통과하면 UPDATE/DELETE 한 번으로 처리
+class ExpenseBulkView(ExpenseBaseView):
+    def post(self, request):
+        serializer = ExpenseBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message="입력값이 유효하지 않습니다.",
+                error_code="INVALID_INPUT",
+                status_code=400
+            )
+        ids = serializer.validated_data["ids"]
+        operation = serializer.validated_data["operation"]
+
+        # 소유자/챌린지 연결 확인과 쓰기를 한 트랜잭션에서 하고 대상 행을 잠가
+        # 확인 직후 다른 요청이 챌린지에 연결한 지출내역을 바꾸지 못하게 한다 (교착을 피하려고 식별자 순서로 잠금)
+        with transaction.atomic():
+            rows = (
+                Expense.objects.select_for_update()
+                .filter(expense_id__in=ids)
+                .order_by("expense_id")
+                .values_list("expense_id", "user_id", "user_challenge_id")
+            )
+            owners = {expense_id: (user_id, user_challenge_id) for expense_id, user_id, user_challenge_id in rows}
+            missing = [expense_id for expense_id in ids if expense_id not in owners]
+            if missing:
+                raise NotFound(f"지출 내역을 찾을 수 없습니다: {missing}")
+            if any(user_id != request.user.pk for user_id, _ in owners.values()):
+                raise PermissionDenied("지출 내역에 접근할 권한이 없습니다.")
+            locked = [expense_id for expense_id, (_, user_challenge_id) in owners.items() if user_challenge_id]
+            if locked:
+                action = "수정" if operation == "update" else "삭제"
+                return error_response(
+                    message=f"챌린지에 연결된 지출내역은 {action}할 수 없습니다: {sorted(locked)}",
+                    error_code="CHALLENGE_LOCKED_EXPENSE",
+                    status_code=400
+                )
+
+            expenses = Expense.objects.filter(
+                expense_id__in=ids, user=request.user, user_challenge__isnull=True
+            )
+            if operation == "update":
+                count = expenses.update(**serializer.validated_data["data"])
+                return success_response({"operation": operation, "updated_count": count})
+            count = expenses.bulk_delete()
+            return success_response({"operation": operation, "deleted_count": count})
+
+
 class RootCategoryListView(ExpenseBaseView):
+    @cache_user_response("root_categories")
+    def get(self, request):
+        roots = get_category_tree().roots
+        serializer = CategorySerializer(roots, many=True)
+        return success_response(serializer.data)
+
+
+# 전체 카테고리 트리 (하위 카테고리 포함)
+# 트리 버전마다 한 번 만든 JSON 바이트를 그대로 내려주고, ETag도 트리 버전에서 만든다
+# 카테고리는 create_categories 실행 때만 바뀌므로 버전이 같으면 304로 응답
+class CategoryTreeView(ExpenseBaseView):
+    def get(self, request):
+        etag = f'"category-tree-{get_category_tree_version()}"'
+        if etag_matches(request, etag):
+            response = HttpResponse(status=304)
+        else:
+            tree = get_category_tree()
+            etag = f'"category-tree-{tree.version}"'
+            response = HttpResponse(tree.nested_json, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class ExpenseImportView(ExpenseBaseView):
+    # CSV(date,amount,category,description 헤더) 또는 NDJSON 파일을 스트리밍으로 등록
+    def post(self, request):
+        uploaded_file = request.FILES.get("file")
+        if uploaded_file is None:
+            return error_response(
+                message="업로드할 파일이 없습니다.",
+                error_code="FILE_REQUIRED",
+                status_code=400
+            )
+
+        file_format = detect_format(uploaded_file, request.query_params.get("file_format"))
+        if file_format not in SUPPORTED_FORMATS:
+            return error_response(
+                message=f"지원하지 않는 파일 형식입니다: {SUPPORTED_FORMATS}",
+                error_code="UNSUPPORTED_FORMAT",
+                status_code=400
+            )
+
+        try:
+            result = ExpenseImporter(request.user).run(iter_rows(uploaded_file, file_format))
+        except (UnicodeDecodeError, csv.Error):
+            return error_response(
+                message="파일을 읽을 수 없습니다. UTF-8 CSV/NDJSON 파일인지 확인해주세요.",
+                error_code="INVALID_FILE",
+                status_code=400
+            )
+        return success_response(result)
+
+
+class ExpenseExportView(ReplicaReadMixin, ExpenseBaseView):
+    # ExpenseListView와 같은 필터로 전체 지출내역을 CSV/NDJSON 스트리밍 응답
+    def get(self, request):
+        query = request.query_params
+        file_format = query.get("file_format", "csv")
+        if file_format not in EXPORT_FORMATS:
+            return error_response(
+                message=f"지원하지 않는 파일 형식입니다: {EXPORT_FORMATS}",
+                error_code="UNSUPPORTED_FORMAT",
+                status_code=400
+            )
+        date_order = query.get("date", "desc")
+        get_ordering("date", date_order)
+
+        expenses = with_archive(request.user, query, filter_expenses(request.user, query))
+        rows = iter_expense_values(expenses, descending=date_order == "desc")
+
+        if file_format == "csv":
+            response = StreamingHttpResponse(stream_csv(rows), content_type="text/csv; charset=utf-8")
+        else:
+            response = StreamingHttpResponse(stream_ndjson(rows), content_type="application/x-ndjson")
+        response["Content-Disposition"] = f'attachment; filename="expenses.{file_format}"'
+        return response
+
+
+# 배치(generate_expense_analyses)로 만들어 둔 지출 분석 리포트 조회
+# year/month를 주지 않으면 가장 최근 리포트를 반환 (요청 시 계산하지 않음)
+class ExpenseAnalysisView(ExpenseBaseView):
+    def get(self, request):
+        analyses = ExpenseAnalysis.objects.filter(user=request.user)
+        year = request.query_params.get("year")
+        month = request.query_params.get("month")
+        if year or month:
+            try:
+                analyses = analyses.filter(month=date(int(year), int(month), 1))
+            except (TypeError, ValueError):
+                raise ValidationError({
+                    "INVALID_MONTH": "year와 month를 함께 올바르게 입력해주세요",
+                })
+
+        analysis = analyses.order_by("-month", "-updated_at").first()
+        if analysis is None:
+            raise NotFound("지출 분석 리포트가 없습니다.")
+        return success_response(ExpenseAnalysisSerializer(analysis).data)
+
+
+# 배치(generate_spending_forecasts)로 만들고 지출 저장/삭제 시 갱신한 이번 달 월말 지출 예측과 평균수입 비교
+# (요청 시 예측을 계산하지 않음)
+class ExpenseForecastView(ExpenseBaseView):
+    def get(self, request):
+        summary = forecast_summary(request.user, date.today().replace(day=1))
+        if summary is None:
+            raise NotFound("월말 지출 예측이 없습니다.")
+        return success_response(summary)
+
+
+# 같은 평균수입 구간 사용자 중 카테고리별 지출 순위 (배치로 만든 스케치를 워커 메모리에서 조회)
+# year/month를 주지 않으면 이번 달
+class ExpenseCohortPercentileView(ExpenseBaseView):
+    def get(self, request):
+        month = date.today().replace(day=1)
+        year = request.query_params.get("year")
+        month_param = request.query_params.get("month")
+        if year or month_param:
+            try:
+                month = date(int(year), int(month_param), 1)
+            except (TypeError, ValueError):
+                raise ValidationError({
+                    "INVALID_MONTH": "year와 month를 함께 올바르게 입력해주세요",
+                })
+
+        percentiles = cohort_percentiles(request.user, month)
+        if percentiles is None:
+            raise NotFound("소득구간별 지출 분포가 없습니다.")
+        return success_response(percentiles)
+
+
+# 최상위 카테고리별 월 예산 조회/등록
+# 이번 달 누적금액은 지출 저장 시 갱신되는 월별 집계에서 읽고, 예산 도달 알림은 지출 저장 시 쌓인다
+class CategoryBudgetView(ExpenseBaseView):
+    def get(self, request):
+        root_names = {root.category_id: root.name for root in get_category_tree().roots}
+        budgets = [
+            {
+                "category_id": root_category_id,
+                "name": root_names.get(root_category_id),
+                "amount": amount,
+                "spent_amount": spent,
+                "ratio": round(spent / amount * 100, 1) if amount else None,
+            }
+            for root_category_id, amount, spent in budget_status(request.user.pk)
+        ]
+        return success_response(budgets)
+
+    def post(self, request):
+        serializer = CategoryBudgetWriteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message="입력값이 유효하지 않습니다.",
+                error_code="INVALID_INPUT",
+                status_code=400
+            )
+        root_category_id = serializer.validated_data["category"]
+        amount = serializer.validated_data["amount"]
+        with transaction.atomic():
+            CategoryBudget.objects.update_or_create(
+                user=request.user,
+                root_category_id=root_category_id,
+                defaults={"amount": amount},
+            )
+            check_budget(request.user.pk, root_category_id, amount)
+        return success_response({"category_id": root_category_id, "amount": amount})
+
+
+class CategoryBudgetDetailView(ExpenseBaseView):
+    def delete(self, request, category_id):
+        deleted, _ = CategoryBudget.objects.filter(
+            user=request.user, root_category_id=category_id
+        ).delete()
+        if not deleted:
+            raise NotFound("예산을 찾을 수 없습니다.")
+        return success_response({"category_id": category_id})
+
+
+# 예산/나의챌린지 목표지출 도달 알림 (최근 순)
+class SpendingAlertListView(ExpenseBaseView):
+    MAX_ALERTS = 50
+
     def get(self, request):
-        queryset = Category.objects.filter(parent_category__isnull=True)
-        serializer = CategorySerializer(queryset, many=True)
-        return success_response(serializer.data)
\ No newline at end of file
+        alerts = SpendingAlert.objects.filter(user=request.user).order_by("-created_at", "-spending_alert_id")
+        return success_response(SpendingAlertSerializer(alerts[:self.MAX_ALERTS], many=True).data)
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+# 쓰기 직후 사용자의 조회를 primary로 고정하는 키
+STICKY_KEY = "db:primary_sticky:{user_id}"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+# 이 블록 안의 조회만 replica로 보낸다 (쓰기와 트랜잭션 안의 조회는 항상 primary)
+@contextmanager
+def read_from_replica(enabled=True):
+    token = _use_replica.set(enabled and replica_configured())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+# read-your-writes: 데이터를 바꾼 사용자는 일정 시간 동안 primary에서 읽는다
+def pin_users_to_primary(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids or not replica_configured():
+        return
+    cache.set_many(
+        {STICKY_KEY.format(user_id=user_id): 1 for user_id in user_ids},
+        settings.REPLICA_STICKY_SECONDS,
+    )
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(STICKY_KEY.format(user_id=user_id)) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # DB 캐시 테이블(캐시 버전 키)은 복제 지연 없이 primary에서 읽는다
+        if model._meta.app_label == "django_cache":
+            return DEFAULT_DB_ALIAS
+        if _use_replica.get() and not transaction.get_connection(DEFAULT_DB_ALIAS).in_atomic_block:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    # replica는 primary를 복제하므로 마이그레이션은 primary에만 적용
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# 안전한 조회 요청을 replica로 보내는 APIView 믹스인
+# 인증 이후에 판단해 최근에 데이터를 바꾼 사용자는 primary에서 읽고,
+# 스트리밍 응답은 본문을 만드는 동안에도 replica를 쓴다
+class ReplicaReadMixin:
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            replica_configured()
+            and request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request.user.pk)
+        ):
+            self._replica_token = _use_replica.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._replica_token = None
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._replica_token is not None:
+                _use_replica.reset(self._replica_token)
+        if self._replica_token is not None and getattr(response, "streaming", False):
+            response.streaming_content = _iter_from_replica(response.streaming_content)
+        return response
+
+
+def _iter_from_replica(content):
+    with read_from_replica():
+        yield from content
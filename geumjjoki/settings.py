@@ -119,10 +119,64 @@ DATABASES = {
         "OPTIONS": {
             "init_command": "SET NAMES 'utf8mb4'; SET sql_mode='STRICT_TRANS_TABLES'",
             "charset": "utf8mb4",
+            # seed_expenses --method load-data 사용 시 MYSQL_LOCAL_INFILE=1
+            "local_infile": int(os.getenv("MYSQL_LOCAL_INFILE", "0")),
         },
     }
 }
 
+# 읽기 전용 복제본 (DB_REPLICA_HOST를 지정하면 조회 전용 엔드포인트가 replica alias를 사용)
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["geumjjoki.db_router.ReplicaRouter"]
+# 데이터를 바꾼 사용자의 조회를 primary로 고정하는 시간(초, 복제 지연보다 길게)
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# Cache
+# 카테고리 트리/사용자 데이터/예산 버전은 웹 워커와 manage.py 명령이 함께 보는 값이므로
+# 프로세스마다 따로인 LocMemCache를 쓰면 안 된다 (DEBUG=False에서는 시스템 체크가 막는다)
+# REDIS_URL이 있으면 Redis, 없으면 DB 캐시 테이블 (python manage.py createcachetable 필요)
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    DEFAULT_CACHE_BACKEND = "django.core.cache.backends.redis.RedisCache"
+    DEFAULT_CACHE_LOCATION = REDIS_URL
+    DEFAULT_RESPONSE_CACHE_LOCATION = REDIS_URL
+else:
+    DEFAULT_CACHE_BACKEND = "django.core.cache.backends.db.DatabaseCache"
+    DEFAULT_CACHE_LOCATION = "geumjjoki_cache"
+    DEFAULT_RESPONSE_CACHE_LOCATION = "geumjjoki_response_cache"
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", DEFAULT_CACHE_BACKEND),
+        "LOCATION": os.getenv("CACHE_LOCATION", DEFAULT_CACHE_LOCATION),
+    },
+    # 지출 조회 응답 캐시 (사용자 데이터 버전이 키에 포함되어 변경 시 자연 만료)
+    "responses": {
+        "BACKEND": os.getenv(
+            "RESPONSE_CACHE_BACKEND",
+            os.getenv("CACHE_BACKEND", DEFAULT_CACHE_BACKEND),
+        ),
+        "LOCATION": os.getenv("RESPONSE_CACHE_LOCATION", DEFAULT_RESPONSE_CACHE_LOCATION),
+        "KEY_PREFIX": "responses",
+    },
+}
+
+# 지출내용 검색 방식 ("fulltext": MySQL FULLTEXT ngram, "ngram": 검색 토큰 테이블)
+# 지정하지 않으면 MySQL은 fulltext, 그 외 DB는 ngram을 사용
+EXPENSE_SEARCH_BACKEND = os.getenv("EXPENSE_SEARCH_BACKEND")
+
+# 지출내역 보관 기준 (이번 달로부터 N개월 이전 지출은 archive_expenses가 보관 테이블로 이동)
+EXPENSE_ARCHIVE_MONTHS = int(os.getenv("EXPENSE_ARCHIVE_MONTHS", "24"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators